@@ -1,12 +1,23 @@
-from typing import List
+import hmac
+import os
+from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
 
-from app.ml import predict_true_confidence
+from app.ml import predict_true_confidence, predict_true_confidence_batch
+from app.ml.batching import batcher
+from app.ml.confidence_model import MODEL_NAME
+from app.ml.prediction_cache import prediction_cache
+from app.ml.registry import registry
+from app.ml.streaming import stream_store
 
 router = APIRouter()
 
+MAX_BATCH_SESSIONS = 10000
+ADMIN_TOKEN = os.getenv("SIMCO_ADMIN_TOKEN", "")
+
 
 class TrueConfidenceRequest(BaseModel):
     self_confidence: float = Field(..., ge=0.0, le=1.0)
@@ -18,6 +29,43 @@ class TrueConfidenceResponse(BaseModel):
     true_confidence: float
     input_summary: dict
     model: str
+    model_version: Optional[str] = None
+
+
+class TrueConfidenceBatchRequest(BaseModel):
+    sessions: List[TrueConfidenceRequest] = Field(..., max_length=MAX_BATCH_SESSIONS)
+
+
+class TrueConfidenceBatchResponse(BaseModel):
+    count: int
+    results: List[TrueConfidenceResponse]
+
+
+class TrueConfidenceStreamUpdate(BaseModel):
+    self_confidence: Optional[float] = Field(None, ge=0.0, le=1.0)
+    face_confidence: Optional[float] = Field(None, ge=0.0, le=1.0)
+
+
+class TrueConfidenceStreamResponse(BaseModel):
+    session_id: str
+    true_confidence_normalized: float
+    true_confidence: float
+    questions_count: int
+    self_confidence_normalized: float
+    model: str
+    model_version: Optional[str] = None
+
+
+class ModelSelection(BaseModel):
+    model_id: Optional[str] = None
+
+
+def _require_admin(token: Optional[str]) -> None:
+    if not ADMIN_TOKEN:
+        # No token configured: the admin routes stay closed rather than open to anyone.
+        raise HTTPException(status_code=503, detail="Model admin routes are disabled (SIMCO_ADMIN_TOKEN is not set)")
+    if not hmac.compare_digest(token or "", ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
 
 
 @router.get("/health")
@@ -30,22 +78,156 @@ def root() -> dict:
     return {"message": "Welcome to SIMCO Logic API"}
 
 
+@router.get("/metrics")
+def metrics() -> dict:
+    return {
+        "micro_batching": batcher.metrics(),
+        "streaming": stream_store.metrics(),
+        "shadow": registry.shadow_metrics(),
+        "prediction_cache": prediction_cache.metrics(),
+    }
+
+
+@router.get("/models")
+def list_models() -> dict:
+    return registry.describe()
+
+
+@router.post("/models/reload")
+def reload_models(x_admin_token: Optional[str] = Header(None)) -> dict:
+    """Load new or retrained artifacts from the model directory without a restart."""
+    _require_admin(x_admin_token)
+    outcome = registry.reload()
+    if outcome["loaded"]:
+        prediction_cache.clear()
+    return {**outcome, "active": registry.active.model_id}
+
+
+@router.post("/models/active")
+def activate_model(payload: ModelSelection, x_admin_token: Optional[str] = Header(None)) -> dict:
+    _require_admin(x_admin_token)
+    if payload.model_id is None:
+        raise HTTPException(status_code=422, detail="model_id is required")
+    try:
+        entry = registry.activate(payload.model_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown model: {payload.model_id}")
+    prediction_cache.clear()
+    return {"active": entry.model_id}
+
+
+@router.post("/models/shadow")
+def select_shadow_model(payload: ModelSelection, x_admin_token: Optional[str] = Header(None)) -> dict:
+    """Shadow ``model_id`` on live traffic; ``null`` turns shadowing off."""
+    _require_admin(x_admin_token)
+    try:
+        entry = registry.set_shadow(payload.model_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown model: {payload.model_id}")
+    return {"shadow": entry.model_id if entry is not None else None}
+
+
 @router.post("/analyze/true-confidence", response_model=TrueConfidenceResponse)
-def analyze_true_confidence(payload: TrueConfidenceRequest):
+async def analyze_true_confidence(payload: TrueConfidenceRequest):
     if payload.self_confidence is None:
         raise HTTPException(status_code=400, detail="self_confidence is required")
 
+    for value in payload.face_confidence_per_question:
+        if not 0.0 <= value <= 1.0:
+            raise HTTPException(
+                status_code=422,
+                detail="face_confidence_per_question values must be normalized in [0,1]",
+            )
+
     try:
-        for value in payload.face_confidence_per_question:
-            if value < 0.0 or value > 1.0:
-                raise HTTPException(
-                    status_code=422,
-                    detail="face_confidence_per_question values must be normalized in [0,1]",
+        key = None
+        entry = None
+        if prediction_cache.enabled:
+            entry = registry.active
+            key = prediction_cache.key(
+                entry.cache_identity, payload.self_confidence, payload.face_confidence_per_question
+            )
+            cached = prediction_cache.get(key)
+            if cached is not None:
+                # Cached traffic is still live traffic for the shadow evaluator.
+                registry.observe(
+                    entry, (payload.self_confidence,), (payload.face_confidence_per_question,), (cached[0],)
                 )
+                return {
+                    "true_confidence_normalized": cached[0],
+                    "true_confidence": cached[1],
+                    "input_summary": {
+                        "self_confidence_normalized": round(payload.self_confidence, 4),
+                        "questions_count": len(payload.face_confidence_per_question),
+                    },
+                    "model": MODEL_NAME,
+                    "model_version": entry.model_id,
+                }
 
-        return predict_true_confidence(
-            self_confidence=payload.self_confidence,
-            face_confidence_per_question=payload.face_confidence_per_question,
-        )
+        if batcher.enabled:
+            result = await batcher.submit(payload.self_confidence, payload.face_confidence_per_question)
+        else:
+            result = await run_in_threadpool(
+                predict_true_confidence,
+                self_confidence=payload.self_confidence,
+                face_confidence_per_question=payload.face_confidence_per_question,
+            )
+        if key is not None and registry.active is entry:
+            prediction_cache.put(key, result["true_confidence_normalized"], result["true_confidence"])
+        return result
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"True confidence inference failed: {exc}") from exc
+
+
+@router.post("/analyze/true-confidence/batch", response_model=TrueConfidenceBatchResponse)
+def analyze_true_confidence_batch(payload: TrueConfidenceBatchRequest):
+    self_confidences = [item.self_confidence for item in payload.sessions]
+    face_lists = [item.face_confidence_per_question for item in payload.sessions]
+
+    for index, faces in enumerate(face_lists):
+        if not all(0.0 <= value <= 1.0 for value in faces):
+            raise HTTPException(
+                status_code=422,
+                detail=f"sessions[{index}].face_confidence_per_question values must be normalized in [0,1]",
+            )
+
+    try:
+        results = predict_true_confidence_batch(self_confidences, face_lists)
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f"True confidence inference failed: {exc}") from exc
+
+    return {"count": len(results), "results": results}
+
+
+@router.post("/analyze/true-confidence/stream/{session_id}", response_model=TrueConfidenceStreamResponse)
+def update_true_confidence_stream(session_id: str, payload: TrueConfidenceStreamUpdate):
+    """Add one answer's face confidence (and/or self confidence) and return the live estimate."""
+    return stream_store.update(
+        session_id,
+        self_confidence=payload.self_confidence,
+        face_confidence=payload.face_confidence,
+    )
+
+
+@router.put("/analyze/true-confidence/stream/{session_id}", response_model=TrueConfidenceStreamResponse)
+def replace_true_confidence_stream(session_id: str, payload: TrueConfidenceRequest):
+    """Rebuild the live estimate from the session's full answer history."""
+    if not all(0.0 <= value <= 1.0 for value in payload.face_confidence_per_question):
+        raise HTTPException(
+            status_code=422,
+            detail="face_confidence_per_question values must be normalized in [0,1]",
+        )
+    return stream_store.replace(session_id, payload.self_confidence, payload.face_confidence_per_question)
+
+
+@router.get("/analyze/true-confidence/stream/{session_id}", response_model=TrueConfidenceStreamResponse)
+def get_true_confidence_stream(session_id: str):
+    result = stream_store.get(session_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired session")
+    return result
+
+
+@router.delete("/analyze/true-confidence/stream/{session_id}")
+def delete_true_confidence_stream(session_id: str) -> dict:
+    return {"deleted": stream_store.delete(session_id)}
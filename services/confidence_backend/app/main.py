@@ -1,6 +1,8 @@
 from fastapi import FastAPI
 
 from app.api.routes import router
+from app.ml.batching import batcher
+from app.ml.confidence_model import _get_model
 
 app = FastAPI(
     title="SIMCO Logic",
@@ -9,3 +11,14 @@ app = FastAPI(
 )
 
 app.include_router(router)
+
+
+@app.on_event("startup")
+def load_model_on_startup() -> None:
+    # Load persisted weights (or train once) before serving the first request.
+    _get_model()
+
+
+@app.on_event("shutdown")
+async def stop_batcher() -> None:
+    await batcher.stop()
@@ -1 +1 @@
-from .confidence_model import predict_true_confidence
+from .confidence_model import predict_true_confidence, predict_true_confidence_batch
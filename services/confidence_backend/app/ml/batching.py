@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from typing import List, Optional
+
+from .confidence_model import predict_true_confidence, predict_true_confidence_batch
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-session requests into one forward pass.
+
+    The first queued request opens a batch. The worker then lets other
+    ready handlers run and takes whatever they queued, and stops as soon as
+    a round brings nothing new, after ``max_delay_ms`` or at
+    ``max_batch_size`` requests. Callers are usually waiting on their own
+    response, so sleeping to a deadline would only add latency. The batch
+    runs through ``predict_true_confidence_batch`` in the default executor
+    while the next one queues up. A request that finds nothing else queued
+    runs alone through ``predict_true_confidence`` and its single-row
+    ``CompiledMLP`` path.
+    """
+
+    def __init__(self, max_batch_size: int = 64, max_delay_ms: float = 2.0, enabled: bool = True):
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_delay = max(0.0, max_delay_ms) / 1000.0
+        self.enabled = enabled
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reset_metrics()
+
+    def _reset_metrics(self) -> None:
+        self._batches = 0
+        self._requests = 0
+        self._max_batch_seen = 0
+        self._batch_size_counts: dict[int, int] = {}
+        self._queue_delay_total = 0.0
+        self._queue_delay_max = 0.0
+        self._inference_total = 0.0
+
+    def _ensure_worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, self_confidence: float, face_confidence_per_question: List[float]) -> dict:
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((self_confidence, face_confidence_per_question, time.perf_counter(), future))
+        return await future
+
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_delay
+        while len(batch) < self.max_batch_size:
+            # Let other ready handlers enqueue, then take what they added.
+            await asyncio.sleep(0)
+            collected = len(batch)
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            if len(batch) == collected or self._loop.time() >= deadline:
+                break
+        return batch
+
+    @staticmethod
+    def _predict(batch: list) -> List[dict]:
+        if len(batch) == 1:
+            return [predict_true_confidence(batch[0][0], batch[0][1])]
+        return predict_true_confidence_batch(
+            [item[0] for item in batch],
+            [item[1] for item in batch],
+        )
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            started = time.perf_counter()
+            try:
+                if len(batch) == 1:
+                    # ~40 us on the single-row path: cheaper than an executor hop.
+                    results = self._predict(batch)
+                else:
+                    # Off the event loop, so handlers keep queueing the next batch meanwhile.
+                    results = await self._loop.run_in_executor(None, self._predict, batch)
+            except Exception as exc:
+                for *_, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            finished = time.perf_counter()
+
+            for (_, _, enqueued_at, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+                delay = started - enqueued_at
+                self._queue_delay_total += delay
+                self._queue_delay_max = max(self._queue_delay_max, delay)
+
+            size = len(batch)
+            self._batches += 1
+            self._requests += size
+            self._max_batch_seen = max(self._max_batch_seen, size)
+            self._batch_size_counts[size] = self._batch_size_counts.get(size, 0) + 1
+            self._inference_total += finished - started
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    def metrics(self) -> dict:
+        batches = self._batches or 1
+        requests = self._requests or 1
+        return {
+            "enabled": self.enabled,
+            "max_batch_size": self.max_batch_size,
+            "max_delay_ms": round(self.max_delay * 1000.0, 3),
+            "batches": self._batches,
+            "requests": self._requests,
+            "avg_batch_size": round(self._requests / batches, 2),
+            "max_batch_size_seen": self._max_batch_seen,
+            "batch_size_counts": dict(sorted(self._batch_size_counts.items())),
+            "avg_queue_delay_ms": round(self._queue_delay_total / requests * 1000.0, 3),
+            "max_queue_delay_ms": round(self._queue_delay_max * 1000.0, 3),
+            "avg_inference_ms": round(self._inference_total / batches * 1000.0, 3),
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+
+batcher = MicroBatcher(
+    max_batch_size=int(os.getenv("SIMCO_BATCH_MAX_SIZE", "64")),
+    max_delay_ms=float(os.getenv("SIMCO_BATCH_MAX_DELAY_MS", "2")),
+    enabled=_env_flag("SIMCO_MICRO_BATCHING", True),
+)
@@ -1,10 +1,30 @@
 from __future__ import annotations
 
 from functools import lru_cache
-from typing import List
+from itertools import chain
+from typing import List, Sequence
 
 import numpy as np
 
+from .fast_inference import CompiledMLP
+
+# Bump when the feature layout or network architecture changes: persisted
+# weights from another version are never loaded.
+MODEL_VERSION = "1"
+MODEL_NAME = "numpy_mlp_regressor"
+
+TRAINING_CONFIG = {
+    "n_samples": 20000,
+    "seed": 42,
+    "hidden_dim": 16,
+    "optimizer": "adam",
+    "learning_rate": 0.01,
+    "batch_size": 512,
+    "max_epochs": 60,
+    "patience": 5,
+    "validation_fraction": 0.1,
+}
+
 
 def _clamp01(value: float) -> float:
     return float(max(0.0, min(1.0, value)))
@@ -44,90 +64,185 @@ def _feature_vector(self_confidence: float, face_confidence_per_question: List[f
     return features
 
 
-def _generate_synthetic_training_data(n_samples: int = 3000, seed: int = 42):
-    rng = np.random.default_rng(seed)
+def _feature_matrix(
+    self_confidences: Sequence[float],
+    face_confidence_lists: Sequence[Sequence[float]],
+) -> np.ndarray:
+    """Vectorized ``_feature_vector`` for many sessions at once.
+
+    The ragged face lists are flattened into one array and reduced per segment
+    with ``ufunc.reduceat``, so the cost is a handful of NumPy passes over all
+    values instead of one small array per session.
+    """
+    self_n = np.clip(np.asarray(self_confidences, dtype=np.float64), 0.0, 1.0)
+    n_rows = self_n.shape[0]
+    if n_rows == 0:
+        return np.empty((0, 7), dtype=np.float32)
+
+    lengths = np.fromiter((len(faces) for faces in face_confidence_lists), dtype=np.int64, count=n_rows)
+    # Sessions without face data fall back to a single value equal to self confidence.
+    empty = lengths == 0
+    segments = chain.from_iterable(
+        faces if faces else (self_n[i],) for i, faces in enumerate(face_confidence_lists)
+    )
+    lengths = np.where(empty, 1, lengths)
+    total = int(lengths.sum())
+    flat = np.clip(np.fromiter(segments, dtype=np.float64, count=total), 0.0, 1.0)
+
+    ends = np.cumsum(lengths)
+    offsets = ends - lengths
+    mean = np.add.reduceat(flat, offsets) / lengths
+    centered = flat - np.repeat(mean, lengths)
+    std = np.sqrt(np.add.reduceat(centered * centered, offsets) / lengths)
+
+    features = np.empty((n_rows, 7), dtype=np.float32)
+    features[:, 0] = self_n
+    features[:, 1] = mean
+    features[:, 2] = std
+    features[:, 3] = np.minimum.reduceat(flat, offsets)
+    features[:, 4] = np.maximum.reduceat(flat, offsets)
+    features[:, 5] = flat[ends - 1]
+    features[:, 6] = lengths / 50.0
+    return features
+
 
-    X = []
-    y = []
+def _generate_synthetic_training_data(n_samples: int = 3000, seed: int = 42, max_questions: int = 30):
+    """Generate a synthetic regression set in whole-batch NumPy operations.
 
-    for _ in range(n_samples):
-        n_questions = int(rng.integers(5, 31))
-        self_n = float(rng.uniform(0, 1))
+    Face confidences are drawn into a padded ``(n_samples, max_questions)``
+    matrix; a mask marks the ``n_questions`` valid entries of each row and the
+    features are masked reductions over it, matching ``_feature_vector``.
+    """
+    rng = np.random.default_rng(seed)
 
-        # Face confidence centered around self confidence with some variation
-        faces = np.clip(
-            rng.normal(loc=self_n, scale=float(rng.uniform(0.06, 0.22)), size=n_questions),
-            0,
-            1,
-        )
+    n_questions = rng.integers(5, max_questions + 1, size=n_samples)
+    self_n = rng.uniform(0, 1, size=n_samples)
+    spread = rng.uniform(0.06, 0.22, size=n_samples)
 
-        # Target "true confidence": weighted blend penalized by inconsistency
-        face_mean = float(np.mean(faces))
-        face_std = float(np.std(faces))
-        target = (0.58 * self_n) + (0.42 * face_mean) - (0.12 * face_std)
-        target = _clamp01(target)
+    # Face confidence centered around self confidence with some variation
+    faces = np.clip(
+        self_n[:, None] + spread[:, None] * rng.standard_normal((n_samples, max_questions)),
+        0,
+        1,
+    )
+    mask = np.arange(max_questions)[None, :] < n_questions[:, None]
+    counts = n_questions.astype(np.float64)
 
-        features = _feature_vector(self_n, faces.tolist())
-        X.append(features)
-        y.append(target)
+    face_mean = np.where(mask, faces, 0.0).sum(axis=1) / counts
+    centered = np.where(mask, faces - face_mean[:, None], 0.0)
+    face_std = np.sqrt((centered * centered).sum(axis=1) / counts)
 
-    return np.array(X, dtype=np.float32), np.array(y, dtype=np.float32)
+    # Target "true confidence": weighted blend penalized by inconsistency
+    target = np.clip((0.58 * self_n) + (0.42 * face_mean) - (0.12 * face_std), 0.0, 1.0)
+
+    X = np.empty((n_samples, 7), dtype=np.float32)
+    X[:, 0] = self_n
+    X[:, 1] = face_mean
+    X[:, 2] = face_std
+    X[:, 3] = np.where(mask, faces, np.inf).min(axis=1)
+    X[:, 4] = np.where(mask, faces, -np.inf).max(axis=1)
+    X[:, 5] = faces[np.arange(n_samples), n_questions - 1]
+    X[:, 6] = counts / 50.0
+    return X, target.astype(np.float32)
 
 
 def _sigmoid(x: np.ndarray) -> np.ndarray:
     return 1.0 / (1.0 + np.exp(-x))
 
 
-def _train_numpy_mlp(X: np.ndarray, y: np.ndarray, seed: int = 42):
-    """Train a tiny 1-hidden-layer neural network regressor using NumPy only."""
-    rng = np.random.default_rng(seed)
-    n_samples, in_dim = X.shape
-    hidden_dim = 16
-
+def _init_params(in_dim: int, hidden_dim: int, rng: np.random.Generator) -> dict:
     # Xavier-like init
-    W1 = rng.normal(0, np.sqrt(1 / in_dim), size=(in_dim, hidden_dim)).astype(np.float32)
-    b1 = np.zeros((1, hidden_dim), dtype=np.float32)
-    W2 = rng.normal(0, np.sqrt(1 / hidden_dim), size=(hidden_dim, 1)).astype(np.float32)
-    b2 = np.zeros((1, 1), dtype=np.float32)
-
-    y = y.reshape(-1, 1).astype(np.float32)
-    lr = 0.03
-    epochs = 700
-
-    for _ in range(epochs):
-        # Forward
-        z1 = X @ W1 + b1
-        a1 = np.tanh(z1)
-        z2 = a1 @ W2 + b2
-        y_hat = _sigmoid(z2)
+    return {
+        "W1": rng.normal(0, np.sqrt(1 / in_dim), size=(in_dim, hidden_dim)).astype(np.float32),
+        "b1": np.zeros((1, hidden_dim), dtype=np.float32),
+        "W2": rng.normal(0, np.sqrt(1 / hidden_dim), size=(hidden_dim, 1)).astype(np.float32),
+        "b2": np.zeros((1, 1), dtype=np.float32),
+    }
 
-        # MSE loss gradient
-        dL_dyhat = (2.0 / n_samples) * (y_hat - y)
-        dyhat_dz2 = y_hat * (1.0 - y_hat)
-        dL_dz2 = dL_dyhat * dyhat_dz2
 
-        dW2 = a1.T @ dL_dz2
-        db2 = np.sum(dL_dz2, axis=0, keepdims=True)
+def _mse_gradients(params: dict, X: np.ndarray, y: np.ndarray) -> dict:
+    """Gradients of the MSE loss w.r.t. every parameter for one batch."""
+    z1 = X @ params["W1"] + params["b1"]
+    a1 = np.tanh(z1)
+    z2 = a1 @ params["W2"] + params["b2"]
+    y_hat = _sigmoid(z2)
 
-        dL_da1 = dL_dz2 @ W2.T
-        da1_dz1 = 1.0 - (a1 ** 2)
-        dL_dz1 = dL_da1 * da1_dz1
+    dL_dz2 = (2.0 / X.shape[0]) * (y_hat - y) * y_hat * (1.0 - y_hat)
+    dL_dz1 = (dL_dz2 @ params["W2"].T) * (1.0 - (a1 ** 2))
+    return {
+        "W1": X.T @ dL_dz1,
+        "b1": np.sum(dL_dz1, axis=0, keepdims=True),
+        "W2": a1.T @ dL_dz2,
+        "b2": np.sum(dL_dz2, axis=0, keepdims=True),
+    }
 
-        dW1 = X.T @ dL_dz1
-        db1 = np.sum(dL_dz1, axis=0, keepdims=True)
 
-        # Update
-        W1 -= lr * dW1
-        b1 -= lr * db1
-        W2 -= lr * dW2
-        b2 -= lr * db2
+def _train_numpy_mlp_adam(
+    X: np.ndarray,
+    y: np.ndarray,
+    seed: int = 42,
+    hidden_dim: int = 16,
+    lr: float = 0.01,
+    batch_size: int = 256,
+    max_epochs: int = 100,
+    patience: int = 5,
+    validation_fraction: float = 0.1,
+):
+    """Mini-batch Adam with early stopping on a held-out split.
+
+    Returns ``(model, stats)``; the model holds the weights of the epoch with
+    the lowest validation MSE.
+    """
+    rng = np.random.default_rng(seed)
+    y = y.reshape(-1, 1).astype(np.float32)
 
-    return {
-        "W1": W1,
-        "b1": b1,
-        "W2": W2,
-        "b2": b2,
+    order = rng.permutation(X.shape[0])
+    n_val = max(1, int(round(X.shape[0] * validation_fraction)))
+    X_val, y_val = X[order[:n_val]], y[order[:n_val]]
+    X_train, y_train = X[order[n_val:]], y[order[n_val:]]
+    n_train = X_train.shape[0]
+
+    params = _init_params(X.shape[1], hidden_dim, rng)
+    m = {key: np.zeros_like(value) for key, value in params.items()}
+    v = {key: np.zeros_like(value) for key, value in params.items()}
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    step = 0
+
+    best_params = {key: value.copy() for key, value in params.items()}
+    best_val_mse = float("inf")
+    best_epoch = 0
+    epochs_run = 0
+
+    for epoch in range(1, max_epochs + 1):
+        epochs_run = epoch
+        batch_order = rng.permutation(n_train)
+        for start in range(0, n_train, batch_size):
+            idx = batch_order[start:start + batch_size]
+            grads = _mse_gradients(params, X_train[idx], y_train[idx])
+            step += 1
+            correction1 = 1.0 - beta1 ** step
+            correction2 = 1.0 - beta2 ** step
+            for key, grad in grads.items():
+                m[key] = beta1 * m[key] + (1.0 - beta1) * grad
+                v[key] = beta2 * v[key] + (1.0 - beta2) * (grad * grad)
+                params[key] -= (lr * (m[key] / correction1) / (np.sqrt(v[key] / correction2) + eps)).astype(np.float32)
+
+        val_mse = float(np.mean((_predict_numpy_mlp(params, X_val) - y_val) ** 2))
+        if val_mse < best_val_mse:
+            best_val_mse = val_mse
+            best_epoch = epoch
+            best_params = {key: value.copy() for key, value in params.items()}
+        elif epoch - best_epoch >= patience:
+            break
+
+    stats = {
+        "epochs_run": epochs_run,
+        "best_epoch": best_epoch,
+        "validation_mse": round(best_val_mse, 8),
+        "train_samples": n_train,
+        "validation_samples": n_val,
     }
+    return best_params, stats
 
 
 def _predict_numpy_mlp(model: dict, X: np.ndarray) -> np.ndarray:
@@ -137,17 +252,45 @@ def _predict_numpy_mlp(model: dict, X: np.ndarray) -> np.ndarray:
     return _sigmoid(z2)
 
 
+def train_model(config: dict = TRAINING_CONFIG) -> tuple[dict, dict]:
+    """Train the regressor from scratch; returns ``(model, training stats)``."""
+    X, y = _generate_synthetic_training_data(n_samples=config["n_samples"], seed=config["seed"])
+    return _train_numpy_mlp_adam(
+        X,
+        y,
+        seed=config["seed"],
+        hidden_dim=config["hidden_dim"],
+        lr=config["learning_rate"],
+        batch_size=config["batch_size"],
+        max_epochs=config["max_epochs"],
+        patience=config["patience"],
+        validation_fraction=config["validation_fraction"],
+    )
+
+
 @lru_cache(maxsize=1)
+def _get_registry():
+    # Imported here to avoid a circular import (the registry needs this module's constants).
+    from .registry import registry
+
+    return registry
+
+
 def _get_model() -> dict:
-    X, y = _generate_synthetic_training_data()
-    return _train_numpy_mlp(X, y)
+    """Weights of the currently active model."""
+    return _get_registry().active.weights
+
+
+def _get_compiled_model() -> CompiledMLP:
+    """Single-row fast path of the currently active model."""
+    return _get_registry().active.compiled
 
 
 def predict_true_confidence(self_confidence: float, face_confidence_per_question: List[float]) -> dict:
-    model = _get_model()
-    features = _feature_vector(self_confidence, face_confidence_per_question).reshape(1, -1)
-    pred = float(_predict_numpy_mlp(model, features)[0, 0])
-    pred = _clamp01(pred)
+    registry = _get_registry()
+    entry = registry.active
+    pred = _clamp01(entry.compiled.predict_one(self_confidence, face_confidence_per_question))
+    registry.observe(entry, (self_confidence,), (face_confidence_per_question,), (pred,))
 
     return {
         "true_confidence_normalized": round(pred, 4),
@@ -156,5 +299,39 @@ def predict_true_confidence(self_confidence: float, face_confidence_per_question
             "self_confidence_normalized": round(_normalize_self_confidence(self_confidence), 4),
             "questions_count": len(face_confidence_per_question),
         },
-        "model": "numpy_mlp_regressor",
+        "model": MODEL_NAME,
+        "model_version": entry.model_id,
     }
+
+
+def predict_true_confidence_batch(
+    self_confidences: Sequence[float],
+    face_confidence_lists: Sequence[Sequence[float]],
+) -> List[dict]:
+    """Score many sessions with one feature pass and one forward pass.
+
+    Each result has the same shape as ``predict_true_confidence``.
+    """
+    registry = _get_registry()
+    entry = registry.active
+    features = _feature_matrix(self_confidences, face_confidence_lists)
+    preds = np.clip(_predict_numpy_mlp(entry.weights, features)[:, 0], 0.0, 1.0).astype(np.float64)
+    registry.observe(entry, self_confidences, face_confidence_lists, preds)
+
+    normalized = np.round(preds, 4).tolist()
+    percent = np.round(preds * 100.0, 2).tolist()
+    self_n = np.round(np.clip(np.asarray(self_confidences, dtype=np.float64), 0.0, 1.0), 4).tolist()
+
+    return [
+        {
+            "true_confidence_normalized": normalized[i],
+            "true_confidence": percent[i],
+            "input_summary": {
+                "self_confidence_normalized": self_n[i],
+                "questions_count": len(face_confidence_lists[i]),
+            },
+            "model": MODEL_NAME,
+            "model_version": entry.model_id,
+        }
+        for i in range(len(normalized))
+    ]
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import math
+import threading
+from typing import Sequence
+
+import numpy as np
+
+N_FEATURES = 7
+
+
+def summary_stats(self_confidence: float, faces: Sequence[float]) -> tuple:
+    """``(self_n, mean, std, min, max, last, count)`` as used by ``_feature_vector``.
+
+    One pass over ``faces`` (Welford's update for the variance), so no list of
+    clamped values is built.
+    """
+    self_n = min(1.0, max(0.0, float(self_confidence)))
+    if len(faces) == 0:
+        return self_n, self_n, 0.0, self_n, self_n, self_n, 1
+    count = 0
+    mean = m2 = 0.0
+    low, high = 1.0, 0.0
+    for value in faces:
+        value = min(1.0, max(0.0, float(value)))
+        count += 1
+        delta = value - mean
+        mean += delta / count
+        m2 += delta * (value - mean)
+        if value < low:
+            low = value
+        if value > high:
+            high = value
+    return self_n, mean, math.sqrt(m2 / count), low, high, value, count
+
+
+class CompiledMLP:
+    """Single-row inference for the 1-hidden-layer MLP without temporaries.
+
+    Weights are stored once as contiguous float32 arrays. Each thread gets its
+    own preallocated feature/hidden/output buffers, and the matrix products run
+    through ``out=`` operations, so a prediction allocates no arrays. The
+    output bias and sigmoid are applied to the single output as a Python float.
+    """
+
+    def __init__(self, model: dict):
+        self.W1 = np.ascontiguousarray(model["W1"], dtype=np.float32)
+        self.b1 = np.ascontiguousarray(model["b1"], dtype=np.float32).reshape(1, -1)
+        self.W2 = np.ascontiguousarray(model["W2"], dtype=np.float32)
+        # One output unit: its bias and sigmoid run on a Python float, since
+        # ufuncs on a (1, 1) array allocate even with out=.
+        self.b2 = float(np.asarray(model["b2"], dtype=np.float32).reshape(-1)[0])
+        self.hidden_dim = self.W1.shape[1]
+        self._local = threading.local()
+
+    def _scratch(self):
+        scratch = getattr(self._local, "buffers", None)
+        if scratch is None:
+            scratch = (
+                np.empty((1, N_FEATURES), dtype=np.float32),
+                np.empty((1, self.hidden_dim), dtype=np.float32),
+                np.empty((1, 1), dtype=np.float32),
+            )
+            self._local.buffers = scratch
+        return scratch
+
+    @staticmethod
+    def fill_features(x: np.ndarray, self_confidence: float, faces: Sequence[float]) -> None:
+        """Write the ``_feature_vector`` features into row 0 of ``x`` in place."""
+        CompiledMLP.fill_stats(x, *summary_stats(self_confidence, faces))
+
+    @staticmethod
+    def fill_stats(
+        x: np.ndarray,
+        self_n: float,
+        mean: float,
+        std: float,
+        low: float,
+        high: float,
+        last: float,
+        count: int,
+    ) -> None:
+        """Write precomputed summary statistics into row 0 of ``x``."""
+        x[0, 0] = self_n
+        x[0, 1] = mean
+        x[0, 2] = std
+        x[0, 3] = low
+        x[0, 4] = high
+        x[0, 5] = last
+        x[0, 6] = count / 50.0
+
+    def predict_one(self, self_confidence: float, faces: Sequence[float]) -> float:
+        x, hidden, out = self._scratch()
+        self.fill_features(x, self_confidence, faces)
+        return self._forward(x, hidden, out)
+
+    def predict_stats(
+        self,
+        self_n: float,
+        mean: float,
+        std: float,
+        low: float,
+        high: float,
+        last: float,
+        count: int,
+    ) -> float:
+        """Predict from running statistics (see ``app.ml.streaming``)."""
+        x, hidden, out = self._scratch()
+        self.fill_stats(x, self_n, mean, std, low, high, last, count)
+        return self._forward(x, hidden, out)
+
+    def _forward(self, x: np.ndarray, hidden: np.ndarray, out: np.ndarray) -> float:
+        # np.dot with out= writes straight into the buffer; np.matmul sets up a
+        # gufunc iterator that allocates on every call for these tiny shapes.
+        np.dot(x, self.W1, out=hidden)
+        np.add(hidden, self.b1, out=hidden)
+        np.tanh(hidden, out=hidden)
+        np.dot(hidden, self.W2, out=out)
+        z = out.item() + self.b2
+        # Sigmoid, split so math.exp never overflows.
+        if z >= 0.0:
+            return 1.0 / (1.0 + math.exp(-z))
+        e = math.exp(z)
+        return e / (1.0 + e)
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from .confidence_model import MODEL_NAME, MODEL_VERSION, TRAINING_CONFIG, train_model
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_DIR = Path(__file__).resolve().parents[1] / "models"
+WEIGHT_KEYS = ("W1", "b1", "W2", "b2")
+ARTIFACT_PREFIX = "confidence_mlp-"
+N_FEATURES = 7
+
+
+def model_dir() -> Path:
+    return Path(os.getenv("SIMCO_MODEL_DIR", str(DEFAULT_MODEL_DIR)))
+
+
+def config_fingerprint(config: dict = TRAINING_CONFIG) -> str:
+    """Hash of everything that determines the trained weights."""
+    payload = json.dumps({"model_version": MODEL_VERSION, "config": config}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def default_model_id(tag: Optional[str] = None) -> str:
+    """Registry ID of an artifact: ``v1`` for the default, ``v1-<tag>`` otherwise."""
+    return f"v{MODEL_VERSION}-{tag}" if tag else f"v{MODEL_VERSION}"
+
+
+def artifact_paths(directory: Optional[Path] = None, tag: Optional[str] = None) -> tuple[Path, Path]:
+    directory = directory or model_dir()
+    stem = f"{ARTIFACT_PREFIX}{default_model_id(tag)}"
+    return directory / f"{stem}.npz", directory / f"{stem}.json"
+
+
+def list_artifacts(directory: Optional[Path] = None) -> list[tuple[str, Path, Path]]:
+    """All ``(model_id, weights_path, meta_path)`` artifacts in ``directory``."""
+    directory = directory or model_dir()
+    found = []
+    for weights_path in sorted(directory.glob(f"{ARTIFACT_PREFIX}*.npz")):
+        if weights_path.name.endswith(".tmp.npz"):
+            continue
+        meta_path = weights_path.with_suffix(".json")
+        if meta_path.exists():
+            found.append((weights_path.stem[len(ARTIFACT_PREFIX):], weights_path, meta_path))
+    return found
+
+
+def _read_weights(weights_path: Path) -> dict:
+    with np.load(weights_path) as data:
+        return {key: np.ascontiguousarray(data[key], dtype=np.float32) for key in WEIGHT_KEYS}
+
+
+def load_artifact(weights_path: Path, meta_path: Path) -> tuple[dict, dict]:
+    """Load any artifact compatible with the current feature layout.
+
+    Unlike ``load_model`` this does not require the default training config,
+    so differently trained models can be registered side by side. Raises
+    ``ValueError`` if the artifact is for another model version or malformed.
+    """
+    metadata = json.loads(meta_path.read_text(encoding="utf-8"))
+    if metadata.get("model_version") != MODEL_VERSION:
+        raise ValueError(f"model_version {metadata.get('model_version')!r} != {MODEL_VERSION!r}")
+    config = metadata.get("training_config")
+    if config is None or metadata.get("fingerprint") != config_fingerprint(config):
+        raise ValueError("fingerprint does not match training_config")
+
+    weights = _read_weights(weights_path)
+    if weights["W1"].shape[0] != N_FEATURES or weights["W2"].shape[1] != 1:
+        raise ValueError(f"unexpected weight shapes W1={weights['W1'].shape} W2={weights['W2'].shape}")
+    return weights, metadata
+
+
+def save_model(model: dict, metadata: dict, directory: Optional[Path] = None, tag: Optional[str] = None) -> Path:
+    weights_path, meta_path = artifact_paths(directory, tag)
+    weights_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Write to temp files first so a concurrent reader never sees a partial artifact.
+    tmp_weights = weights_path.with_suffix(".tmp.npz")
+    np.savez(tmp_weights, **{key: model[key] for key in WEIGHT_KEYS})
+    tmp_meta = meta_path.with_suffix(".tmp.json")
+    tmp_meta.write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+    os.replace(tmp_weights, weights_path)
+    os.replace(tmp_meta, meta_path)
+    return weights_path
+
+
+def load_model(
+    directory: Optional[Path] = None,
+    tag: Optional[str] = None,
+    config: dict = TRAINING_CONFIG,
+) -> Optional[dict]:
+    """Load persisted weights, or None if missing or stale for the current code."""
+    weights_path, meta_path = artifact_paths(directory, tag)
+    if not weights_path.exists() or not meta_path.exists():
+        return None
+
+    try:
+        metadata = json.loads(meta_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        logger.warning("Unreadable model metadata %s: %s", meta_path, exc)
+        return None
+
+    if metadata.get("fingerprint") != config_fingerprint(config):
+        logger.info("Model artifact %s is stale (training config changed)", weights_path)
+        return None
+
+    return _read_weights(weights_path)
+
+
+def train_and_save(
+    directory: Optional[Path] = None,
+    config: dict = TRAINING_CONFIG,
+    tag: Optional[str] = None,
+) -> tuple[dict, dict]:
+    """Train from scratch and persist weights plus metadata.
+
+    If the artifact cannot be written (e.g. read-only filesystem) the trained
+    model is still returned, with ``metadata["saved_to"]`` set to None.
+    """
+    start = time.perf_counter()
+    model, stats = train_model(config)
+    metadata = {
+        "model": MODEL_NAME,
+        "model_id": default_model_id(tag),
+        "model_version": MODEL_VERSION,
+        "fingerprint": config_fingerprint(config),
+        "training_config": config,
+        "training_seconds": round(time.perf_counter() - start, 3),
+        "training_stats": stats,
+        "trained_at": datetime.now(timezone.utc).isoformat(),
+        "numpy_version": np.__version__,
+    }
+    try:
+        metadata["saved_to"] = str(save_model(model, metadata, directory, tag))
+    except OSError as exc:
+        logger.warning("Could not persist model artifact: %s", exc)
+        metadata["saved_to"] = None
+    return model, metadata
+
+
+def load_or_train(directory: Optional[Path] = None) -> dict:
+    """Startup path: reuse the persisted artifact, retrain only if missing or stale."""
+    model = load_model(directory)
+    if model is not None:
+        return model
+
+    logger.info("No usable model artifact found, training from scratch")
+    model, _ = train_and_save(directory)
+    return model
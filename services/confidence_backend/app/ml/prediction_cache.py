@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional, Sequence
+
+from .batching import _env_flag
+from .fast_inference import summary_stats
+
+
+class PredictionCache:
+    """LRU of true-confidence predictions keyed on quantized model features.
+
+    The key is the identity of the active model's loaded weights (see
+    ``ModelEntry.cache_identity``) plus the seven summary features rounded to
+    ``decimals`` places (the question count stays exact). A retrained
+    artifact reloaded under the same model ID therefore never hits entries
+    computed with the old weights. Requests whose
+    features fall in the same bucket share one prediction, so a hit may differ
+    from the exact path by the model's sensitivity over half a quantization
+    step. ``python -m benchmarks.prediction_cache`` reports that error.
+    """
+
+    def __init__(self, max_entries: int = 4096, decimals: int = 3, enabled: bool = True):
+        self.max_entries = max(1, max_entries)
+        self.decimals = decimals
+        self.enabled = enabled
+        self._scale = 10.0 ** decimals
+        self._entries: "OrderedDict[tuple, tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, model_identity: Hashable, self_confidence: float, faces: Sequence[float]) -> tuple:
+        self_n, mean, std, low, high, last, count = summary_stats(self_confidence, faces)
+        scale = self._scale
+        return (
+            model_identity,
+            round(self_n * scale),
+            round(mean * scale),
+            round(std * scale),
+            round(low * scale),
+            round(high * scale),
+            round(last * scale),
+            count,
+        )
+
+    def get(self, key: tuple) -> Optional[tuple[float, float]]:
+        """``(true_confidence_normalized, true_confidence)`` or None on a miss."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: tuple, normalized: float, percent: float) -> None:
+        with self._lock:
+            self._entries[key] = (normalized, percent)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "decimals": self.decimals,
+                "max_entries": self.max_entries,
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+prediction_cache = PredictionCache(
+    max_entries=int(os.getenv("SIMCO_PREDICTION_CACHE_SIZE", "4096")),
+    decimals=int(os.getenv("SIMCO_PREDICTION_CACHE_DECIMALS", "3")),
+    enabled=_env_flag("SIMCO_PREDICTION_CACHE", True),
+)
@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+from .confidence_model import _feature_matrix, _predict_numpy_mlp
+from .fast_inference import CompiledMLP
+from .model_store import default_model_id, list_artifacts, load_artifact, load_or_train, model_dir
+
+logger = logging.getLogger(__name__)
+
+
+class ModelEntry:
+    """One loaded model: raw weights for batch scoring plus a compiled single-row path."""
+
+    __slots__ = ("model_id", "weights", "compiled", "metadata", "source_mtime", "loaded_at")
+
+    def __init__(self, model_id: str, weights: dict, metadata: dict, source_mtime: Optional[float] = None):
+        self.model_id = model_id
+        self.weights = weights
+        self.compiled = CompiledMLP(weights)
+        self.metadata = metadata
+        self.source_mtime = source_mtime
+        self.loaded_at = time.time()
+
+    @property
+    def cache_identity(self) -> tuple:
+        """Distinguishes these weights from a later reload under the same model ID."""
+        return (self.model_id, self.source_mtime, self.loaded_at)
+
+    def describe(self) -> dict:
+        stats = self.metadata.get("training_stats") or {}
+        return {
+            "model_id": self.model_id,
+            "hidden_dim": int(self.weights["W1"].shape[1]),
+            "trained_at": self.metadata.get("trained_at"),
+            "validation_mse": stats.get("validation_mse"),
+            "loaded_at": self.loaded_at,
+        }
+
+
+class ShadowEvaluator:
+    """Score live traffic with a second model off the request path.
+
+    Requests hand their inputs and primary predictions to a bounded queue
+    without blocking; a daemon thread re-scores them with the shadow model and
+    records how far the two disagree. When the queue is full the sample is
+    dropped (and counted) rather than slowing the caller down.
+    """
+
+    def __init__(self, threshold: float = 0.05, queue_size: int = 1024):
+        self.threshold = threshold
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._stats_lock:
+            self.compared = 0
+            self.diverged = 0
+            self.dropped = 0
+            self.errors = 0
+            self._abs_diff_total = 0.0
+            self.max_abs_diff = 0.0
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            with self._start_lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="shadow-evaluator", daemon=True)
+                    self._thread.start()
+
+    def submit(
+        self,
+        primary: ModelEntry,
+        shadow: ModelEntry,
+        self_confidences: Sequence[float],
+        face_lists: Sequence[Sequence[float]],
+        primary_preds: Sequence[float],
+    ) -> None:
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((primary, shadow, self_confidences, face_lists, primary_preds))
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += len(primary_preds)
+
+    def _run(self) -> None:
+        while True:
+            primary, shadow, self_confidences, face_lists, primary_preds = self._queue.get()
+            try:
+                self._compare(primary, shadow, self_confidences, face_lists, primary_preds)
+            except Exception:
+                logger.exception("Shadow evaluation with %s failed", shadow.model_id)
+                with self._stats_lock:
+                    self.errors += 1
+            finally:
+                self._queue.task_done()
+
+    def _compare(self, primary, shadow, self_confidences, face_lists, primary_preds) -> None:
+        features = _feature_matrix(self_confidences, face_lists)
+        shadow_preds = np.clip(_predict_numpy_mlp(shadow.weights, features)[:, 0], 0.0, 1.0)
+        diffs = np.abs(shadow_preds - np.asarray(primary_preds, dtype=np.float64))
+        worst = int(np.argmax(diffs))
+        worst_diff = float(diffs[worst])
+        over = int(np.count_nonzero(diffs > self.threshold))
+
+        with self._stats_lock:
+            self.compared += len(diffs)
+            self.diverged += over
+            self._abs_diff_total += float(diffs.sum())
+            self.max_abs_diff = max(self.max_abs_diff, worst_diff)
+
+        if over:
+            logger.warning(
+                "Shadow model %s diverged from %s by %.4f (primary=%.4f shadow=%.4f, questions=%d)",
+                shadow.model_id,
+                primary.model_id,
+                worst_diff,
+                float(primary_preds[worst]),
+                float(shadow_preds[worst]),
+                len(face_lists[worst]),
+            )
+
+    def join(self) -> None:
+        """Block until every queued sample has been compared (for tests and benchmarks)."""
+        self._queue.join()
+
+    def metrics(self) -> dict:
+        with self._stats_lock:
+            compared = self.compared or 1
+            return {
+                "threshold": self.threshold,
+                "compared": self.compared,
+                "diverged": self.diverged,
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "mean_abs_diff": round(self._abs_diff_total / compared, 6),
+                "max_abs_diff": round(self.max_abs_diff, 6),
+                "queue_depth": self._queue.qsize(),
+            }
+
+
+class ModelRegistry:
+    """Versioned confidence models with an atomically switchable active model.
+
+    Every artifact in the model directory (see ``model_store.list_artifacts``)
+    is loaded under its model ID. Request handlers read ``active`` once and use
+    that entry for the whole prediction, so ``activate`` and ``reload`` can
+    swap models under live traffic without a restart or a half-switched
+    request. An optional shadow model is evaluated by ``ShadowEvaluator``.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Path] = None,
+        active_id: Optional[str] = None,
+        shadow_id: Optional[str] = None,
+        shadow_threshold: float = 0.05,
+        shadow_queue_size: int = 1024,
+    ):
+        self._directory = directory
+        self._initial_active_id = active_id
+        self._initial_shadow_id = shadow_id
+        self._lock = threading.RLock()
+        self._models: dict[str, ModelEntry] = {}
+        self._active: Optional[ModelEntry] = None
+        self._shadow: Optional[ModelEntry] = None
+        self.shadow_evaluator = ShadowEvaluator(shadow_threshold, shadow_queue_size)
+
+    @property
+    def directory(self) -> Path:
+        return self._directory or model_dir()
+
+    def _ensure_loaded(self) -> None:
+        if self._active is not None:
+            return
+        with self._lock:
+            if self._active is not None:
+                return
+            # Train the default model once if its artifact is missing or stale.
+            default_weights = load_or_train(self._directory)
+            self._scan()
+            default_id = default_model_id()
+            if default_id not in self._models:
+                # Artifact could not be written (read-only filesystem); serve from memory.
+                self._models[default_id] = ModelEntry(default_id, default_weights, {})
+
+            active_id = self._initial_active_id or default_id
+            if active_id not in self._models:
+                logger.warning("Configured model %s not found, falling back to %s", active_id, default_id)
+                active_id = default_id
+            self._active = self._models[active_id]
+
+            if self._initial_shadow_id:
+                if self._initial_shadow_id in self._models:
+                    self._shadow = self._models[self._initial_shadow_id]
+                else:
+                    logger.warning("Configured shadow model %s not found", self._initial_shadow_id)
+
+    def _scan(self) -> dict:
+        """Load new or modified artifacts; returns a per-ID outcome."""
+        outcome = {"loaded": [], "unchanged": [], "failed": {}}
+        for model_id, weights_path, meta_path in list_artifacts(self.directory):
+            mtime = max(weights_path.stat().st_mtime, meta_path.stat().st_mtime)
+            current = self._models.get(model_id)
+            if current is not None and current.source_mtime == mtime:
+                outcome["unchanged"].append(model_id)
+                continue
+            try:
+                weights, metadata = load_artifact(weights_path, meta_path)
+            except (OSError, ValueError, KeyError) as exc:
+                logger.warning("Skipping model artifact %s: %s", weights_path, exc)
+                outcome["failed"][model_id] = str(exc)
+                continue
+
+            entry = ModelEntry(model_id, weights, metadata, mtime)
+            self._models[model_id] = entry
+            # A retrained artifact under the same ID replaces the live model too.
+            if self._active is not None and self._active.model_id == model_id:
+                self._active = entry
+            if self._shadow is not None and self._shadow.model_id == model_id:
+                self._shadow = entry
+            outcome["loaded"].append(model_id)
+        return outcome
+
+    @property
+    def active(self) -> ModelEntry:
+        self._ensure_loaded()
+        return self._active
+
+    @property
+    def shadow(self) -> Optional[ModelEntry]:
+        self._ensure_loaded()
+        return self._shadow
+
+    def reload(self) -> dict:
+        """Pick up new or retrained artifacts from the model directory."""
+        self._ensure_loaded()
+        with self._lock:
+            outcome = self._scan()
+        if outcome["loaded"]:
+            logger.info("Model registry reloaded: %s", ", ".join(outcome["loaded"]))
+        return outcome
+
+    def activate(self, model_id: str) -> ModelEntry:
+        """Make ``model_id`` the active model. Raises ``KeyError`` if unknown."""
+        self._ensure_loaded()
+        with self._lock:
+            entry = self._models[model_id]
+            previous = self._active
+            self._active = entry
+        logger.info("Active model switched from %s to %s", previous.model_id, model_id)
+        return entry
+
+    def set_shadow(self, model_id: Optional[str]) -> Optional[ModelEntry]:
+        """Start shadowing ``model_id`` (None stops). Raises ``KeyError`` if unknown."""
+        self._ensure_loaded()
+        with self._lock:
+            self._shadow = None if model_id is None else self._models[model_id]
+            self.shadow_evaluator.reset()
+        return self._shadow
+
+    def observe(
+        self,
+        primary: ModelEntry,
+        self_confidences: Sequence[float],
+        face_lists: Sequence[Sequence[float]],
+        primary_preds: Sequence[float],
+    ) -> None:
+        """Queue live predictions for shadow comparison, if a shadow model is set."""
+        shadow = self._shadow
+        if shadow is None or shadow is primary:
+            return
+        self.shadow_evaluator.submit(primary, shadow, self_confidences, face_lists, primary_preds)
+
+    def describe(self) -> dict:
+        self._ensure_loaded()
+        with self._lock:
+            return {
+                "directory": str(self.directory),
+                "active": self._active.model_id,
+                "shadow": self._shadow.model_id if self._shadow is not None else None,
+                "models": [entry.describe() for _, entry in sorted(self._models.items())],
+            }
+
+    def shadow_metrics(self) -> dict:
+        shadow = self._shadow
+        metrics = self.shadow_evaluator.metrics()
+        metrics["model_id"] = shadow.model_id if shadow is not None else None
+        return metrics
+
+
+def _optional_env(name: str) -> Optional[str]:
+    value = os.getenv(name, "").strip()
+    return value or None
+
+
+registry = ModelRegistry(
+    active_id=_optional_env("SIMCO_ACTIVE_MODEL"),
+    shadow_id=_optional_env("SIMCO_SHADOW_MODEL"),
+    shadow_threshold=float(os.getenv("SIMCO_SHADOW_DIVERGENCE", "0.05")),
+    shadow_queue_size=int(os.getenv("SIMCO_SHADOW_QUEUE_SIZE", "1024")),
+)
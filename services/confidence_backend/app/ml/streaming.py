@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Sequence
+
+from .confidence_model import MODEL_NAME, _clamp01, _get_registry
+from .fast_inference import CompiledMLP
+
+
+class StreamingState:
+    """Running summary of one session's face confidences.
+
+    Mean and variance use Welford's update, so adding an answer is O(1) and
+    the per-session footprint does not grow with the number of questions.
+    """
+
+    __slots__ = ("self_confidence", "count", "mean", "m2", "low", "high", "last", "updated_at")
+
+    def __init__(self, self_confidence: float = 0.5):
+        self.self_confidence = _clamp01(self_confidence)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.low = 1.0
+        self.high = 0.0
+        self.last = 0.0
+        self.updated_at = 0.0
+
+    def add(self, face_confidence: float) -> None:
+        value = _clamp01(face_confidence)
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.low = min(self.low, value)
+        self.high = max(self.high, value)
+        self.last = value
+
+    def predict(self, model: CompiledMLP) -> float:
+        if self.count == 0:
+            # Same fallback as the batch path: no face data means a single
+            # face value equal to self confidence.
+            s = self.self_confidence
+            return _clamp01(model.predict_stats(s, s, 0.0, s, s, s, 1))
+        std = math.sqrt(max(0.0, self.m2) / self.count)
+        return _clamp01(
+            model.predict_stats(self.self_confidence, self.mean, std, self.low, self.high, self.last, self.count)
+        )
+
+    def to_response(self, session_id: str) -> dict:
+        entry = _get_registry().active
+        pred = self.predict(entry.compiled)
+        return {
+            "session_id": session_id,
+            "true_confidence_normalized": round(pred, 4),
+            "true_confidence": round(pred * 100.0, 2),
+            "questions_count": self.count,
+            "self_confidence_normalized": round(self.self_confidence, 4),
+            "model": MODEL_NAME,
+            "model_version": entry.model_id,
+        }
+
+
+class StreamingStore:
+    """Bounded, TTL-evicting map of session ID -> StreamingState.
+
+    Entries are kept in last-update order, so expired sessions are always at
+    the front and eviction is amortized O(1) per update.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 10000,
+        ttl_seconds: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_sessions = max(1, max_sessions)
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._states: "OrderedDict[str, StreamingState]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evicted_expired = 0
+        self.evicted_capacity = 0
+
+    def _evict(self, now: float) -> None:
+        while self._states:
+            session_id, state = next(iter(self._states.items()))
+            if now - state.updated_at < self.ttl_seconds:
+                break
+            del self._states[session_id]
+            self.evicted_expired += 1
+        while len(self._states) > self.max_sessions:
+            self._states.popitem(last=False)
+            self.evicted_capacity += 1
+
+    def update(
+        self,
+        session_id: str,
+        self_confidence: Optional[float] = None,
+        face_confidence: Optional[float] = None,
+    ) -> dict:
+        with self._lock:
+            now = self._clock()
+            self._evict(now)
+            state = self._states.get(session_id)
+            if state is None:
+                state = StreamingState(0.5 if self_confidence is None else self_confidence)
+                self._states[session_id] = state
+            elif self_confidence is not None:
+                state.self_confidence = _clamp01(self_confidence)
+            if face_confidence is not None:
+                state.add(face_confidence)
+            state.updated_at = now
+            self._states.move_to_end(session_id)
+            self._evict(now)
+            return state.to_response(session_id)
+
+    def replace(
+        self,
+        session_id: str,
+        self_confidence: float,
+        face_confidences: Sequence[float],
+    ) -> dict:
+        """Rebuild a session's state from its full history, e.g. after a lost update."""
+        state = StreamingState(self_confidence)
+        for value in face_confidences:
+            state.add(value)
+        with self._lock:
+            now = self._clock()
+            state.updated_at = now
+            self._states.pop(session_id, None)
+            self._states[session_id] = state
+            self._evict(now)
+            return state.to_response(session_id)
+
+    def get(self, session_id: str) -> Optional[dict]:
+        with self._lock:
+            self._evict(self._clock())
+            state = self._states.get(session_id)
+            return None if state is None else state.to_response(session_id)
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._states.pop(session_id, None) is not None
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "sessions": len(self._states),
+                "max_sessions": self.max_sessions,
+                "ttl_seconds": self.ttl_seconds,
+                "evicted_expired": self.evicted_expired,
+                "evicted_capacity": self.evicted_capacity,
+            }
+
+
+stream_store = StreamingStore(
+    max_sessions=int(os.getenv("SIMCO_STREAM_MAX_SESSIONS", "10000")),
+    ttl_seconds=float(os.getenv("SIMCO_STREAM_TTL_SECONDS", "3600")),
+)
@@ -0,0 +1,53 @@
+"""
+Train the true-confidence model and write versioned weights.
+
+Usage (from services/confidence_backend):
+
+    python -m app.ml.train            # train only if missing or stale
+    python -m app.ml.train --force    # always retrain
+    python -m app.ml.train --tag seed7 --seed 7
+                                      # side-by-side candidate for the registry
+"""
+import argparse
+import json
+import re
+from pathlib import Path
+
+from .confidence_model import TRAINING_CONFIG
+from .model_store import artifact_paths, load_model, model_dir, train_and_save
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train the SIMCO Logic confidence model.")
+    parser.add_argument("--output-dir", type=Path, default=None,
+                        help="Artifact directory (default: $SIMCO_MODEL_DIR or app/models)")
+    parser.add_argument("--force", action="store_true", help="Retrain even if a valid artifact exists")
+    parser.add_argument("--tag", default=None,
+                        help="Write a tagged candidate (confidence_mlp-v<N>-<tag>) instead of the default model")
+    parser.add_argument("--seed", type=int, default=None, help="Override the training seed")
+    parser.add_argument("--hidden-dim", type=int, default=None, help="Override the hidden layer width")
+    args = parser.parse_args()
+
+    if args.tag is not None and not re.fullmatch(r"[A-Za-z0-9_.-]+", args.tag):
+        parser.error("--tag may only contain letters, digits, '.', '_' and '-'")
+
+    config = dict(TRAINING_CONFIG)
+    if args.seed is not None:
+        config["seed"] = args.seed
+    if args.hidden_dim is not None:
+        config["hidden_dim"] = args.hidden_dim
+    if config != TRAINING_CONFIG and not args.tag:
+        parser.error("--seed/--hidden-dim require --tag; the default artifact always uses TRAINING_CONFIG")
+
+    directory = args.output_dir or model_dir()
+    weights_path, _ = artifact_paths(directory, args.tag)
+    if not args.force and load_model(directory, args.tag, config) is not None:
+        print(f"Model artifact is up to date: {weights_path}")
+        return
+
+    _, metadata = train_and_save(directory, config, args.tag)
+    print(json.dumps(metadata, indent=2))
+
+
+if __name__ == "__main__":
+    main()
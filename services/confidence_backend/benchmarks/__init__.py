@@ -0,0 +1 @@
+"""SIMCO Logic benchmarks. Run from services/confidence_backend, e.g. ``python -m benchmarks.training``."""
@@ -0,0 +1,85 @@
+"""
+Single-request inference microbenchmark: reference path vs CompiledMLP.
+
+The reference path is ``_feature_vector`` + ``_predict_numpy_mlp`` (fresh
+arrays for features, z1, a1, z2 and the sigmoid). The fast path is
+``CompiledMLP.predict_one`` with per-thread scratch buffers. Reports p50/p99
+latency and the peak transient memory (tracemalloc) above baseline during a
+call. Numpy data buffers show up there: the reference path creates ~8 arrays
+per call, the compiled path none (what remains is Python floats and call
+overhead, see the ``noop`` floor).
+
+    python -m benchmarks.inference [--calls 20000] [--questions 10]
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from app.ml.confidence_model import _feature_vector, _get_compiled_model, _get_model, _predict_numpy_mlp
+
+
+def _reference(model, self_confidence, faces):
+    features = _feature_vector(self_confidence, faces).reshape(1, -1)
+    return float(_predict_numpy_mlp(model, features)[0, 0])
+
+
+def _latencies_us(func, calls: int) -> list:
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter_ns()
+        func()
+        samples.append((time.perf_counter_ns() - start) / 1000.0)
+    samples.sort()
+    return samples
+
+
+def _temporary_bytes_per_call(func, calls: int = 200) -> float:
+    """Peak traced memory above baseline during one call, averaged."""
+    func()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    peak_total = 0
+    for _ in range(calls):
+        tracemalloc.reset_peak()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        peak_total += peak - base
+    tracemalloc.stop()
+    return peak_total / calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark single-request confidence inference.")
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--questions", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    faces = [rng.random() for _ in range(args.questions)]
+    self_confidence = 0.6
+    model = _get_model()
+    compiled = _get_compiled_model()
+
+    paths = {
+        "noop": lambda: None,
+        "reference": lambda: _reference(model, self_confidence, faces),
+        "compiled": lambda: compiled.predict_one(self_confidence, faces),
+    }
+    diff = abs(paths["reference"]() - paths["compiled"]())
+    # "noop" is the harness floor: call overhead and tracemalloc's own bookkeeping.
+    print(f"max |reference - compiled| = {diff:.2e}")
+    print(f"{'path':>10} | {'p50 us':>8} | {'p99 us':>8} | {'peak transient bytes':>20}")
+    for name, func in paths.items():
+        for _ in range(1000):
+            func()
+        samples = _latencies_us(func, args.calls)
+        p50 = samples[len(samples) // 2]
+        p99 = samples[int(len(samples) * 0.99)]
+        temp_bytes = _temporary_bytes_per_call(func)
+        print(f"{name:>10} | {p50:>8.2f} | {p99:>8.2f} | {temp_bytes:>20.0f}")
+
+
+if __name__ == "__main__":
+    main()
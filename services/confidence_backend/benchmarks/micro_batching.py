@@ -0,0 +1,82 @@
+"""
+Throughput benchmark: micro-batched vs per-request true-confidence inference.
+
+Drives ``POST /analyze/true-confidence`` through an in-process ASGI client at
+several concurrency levels, once with the micro-batcher enabled and once with
+the per-request threadpool path, and prints requests/second plus the
+batcher's own batch-size, queue-delay and per-batch inference metrics (at
+concurrency 1 every batch is a lone request on the single-row path).
+
+    python -m benchmarks.micro_batching [--requests 2000] [--concurrency 1 4 16 64 256]
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+
+from app.main import app
+from app.ml.batching import batcher
+from app.ml.confidence_model import _get_model
+from app.ml.prediction_cache import prediction_cache
+
+
+def _payloads(n: int, seed: int = 3) -> list:
+    rng = random.Random(seed)
+    return [
+        {
+            "self_confidence": round(rng.random(), 2),
+            "face_confidence_per_question": [round(rng.random(), 2) for _ in range(rng.randint(0, 20))],
+        }
+        for _ in range(n)
+    ]
+
+
+async def _drive(payloads: list, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        queue = list(payloads)
+
+        async def worker():
+            while queue:
+                response = await client.post("/analyze/true-confidence", json=queue.pop())
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return time.perf_counter() - start
+
+
+async def _run(n_requests: int, levels: list) -> None:
+    _get_model()
+    # Every level replays the same payloads; measure inference, not cache hits.
+    prediction_cache.enabled = False
+    payloads = _payloads(n_requests)
+    print(f"{'concurrency':>11} | {'per-request rps':>15} | {'batched rps':>11} | "
+          f"{'avg batch':>9} | {'avg queue ms':>12} | {'max queue ms':>12} | {'avg infer ms':>12}")
+    for concurrency in levels:
+        batcher.enabled = False
+        per_request = n_requests / await _drive(payloads, concurrency)
+
+        batcher.enabled = True
+        batcher._reset_metrics()
+        batched = n_requests / await _drive(payloads, concurrency)
+        stats = batcher.metrics()
+        await batcher.stop()
+
+        print(f"{concurrency:>11} | {per_request:>15.0f} | {batched:>11.0f} | "
+              f"{stats['avg_batch_size']:>9.1f} | {stats['avg_queue_delay_ms']:>12.3f} | "
+              f"{stats['max_queue_delay_ms']:>12.3f} | {stats['avg_inference_ms']:>12.3f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark micro-batched inference throughput.")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64, 256])
+    args = parser.parse_args()
+    asyncio.run(_run(args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Quantized prediction cache: hit rate, error vs the exact path, and latency.
+
+Replays a synthetic request mix through ``PredictionCache`` the same way the
+``/analyze/true-confidence`` route does (key -> get -> predict and put on a
+miss) for several quantization precisions. By default 60% of sessions have no
+webcam data (empty face list) and self confidence arrives in 0.01 steps. For
+every request it also computes the exact prediction and reports the largest
+and mean absolute difference of what the cached path returned.
+
+    python -m benchmarks.prediction_cache [--requests 50000] [--no-face-share 0.6] [--decimals 2 3 4]
+"""
+import argparse
+import random
+import time
+
+from app.ml.confidence_model import _get_registry, predict_true_confidence
+from app.ml.prediction_cache import PredictionCache
+
+
+def _requests(n: int, no_face_share: float, seed: int = 11) -> list:
+    rng = random.Random(seed)
+    requests = []
+    for _ in range(n):
+        self_confidence = rng.randint(0, 100) / 100.0
+        if rng.random() < no_face_share:
+            faces = []
+        else:
+            faces = [rng.random() for _ in range(rng.randint(1, 10))]
+        requests.append((self_confidence, faces))
+    return requests
+
+
+def _replay(cache: PredictionCache, model_id: str, requests: list, exact: list) -> dict:
+    max_err = 0.0
+    err_total = 0.0
+    for (self_confidence, faces), truth in zip(requests, exact):
+        key = cache.key(model_id, self_confidence, faces)
+        cached = cache.get(key)
+        if cached is None:
+            result = predict_true_confidence(self_confidence, faces)
+            value = result["true_confidence_normalized"]
+            cache.put(key, value, result["true_confidence"])
+        else:
+            value = cached[0]
+        err = abs(value - truth)
+        max_err = max(max_err, err)
+        err_total += err
+    stats = cache.metrics()
+    stats["max_abs_err"] = max_err
+    stats["mean_abs_err"] = err_total / len(requests)
+    return stats
+
+
+def _p50_us(func, calls: int = 20000) -> float:
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter_ns()
+        func()
+        samples.append(time.perf_counter_ns() - start)
+    samples.sort()
+    return samples[len(samples) // 2] / 1000.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the quantized prediction cache.")
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--no-face-share", type=float, default=0.6)
+    parser.add_argument("--decimals", type=int, nargs="+", default=[2, 3, 4])
+    parser.add_argument("--max-entries", type=int, default=4096)
+    args = parser.parse_args()
+
+    model_id = _get_registry().active.model_id
+    requests = _requests(args.requests, args.no_face_share)
+    exact = [predict_true_confidence(s, f)["true_confidence_normalized"] for s, f in requests]
+
+    print(f"{args.requests} requests, {args.no_face_share:.0%} without face data, "
+          f"max_entries={args.max_entries}, model {model_id}")
+    print(f"{'decimals':>8} | {'hit rate':>8} | {'entries':>7} | {'max abs err':>11} | {'mean abs err':>12}")
+    for decimals in args.decimals:
+        stats = _replay(PredictionCache(args.max_entries, decimals), model_id, requests, exact)
+        print(f"{decimals:>8} | {stats['hit_rate']:>8.1%} | {stats['size']:>7} | "
+              f"{stats['max_abs_err']:>11.2e} | {stats['mean_abs_err']:>12.2e}")
+
+    cache = PredictionCache(args.max_entries, 3)
+    self_confidence, faces = 0.71, []
+    key = cache.key(model_id, self_confidence, faces)
+    cache.put(key, 0.5, 50.0)
+    hit = _p50_us(lambda: cache.get(cache.key(model_id, self_confidence, faces)))
+    miss = _p50_us(lambda: predict_true_confidence(self_confidence, faces))
+    print(f"p50 latency, no face data: cache hit {hit:.2f} us, predict_true_confidence {miss:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
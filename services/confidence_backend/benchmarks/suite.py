@@ -0,0 +1,281 @@
+"""
+SIMCO Logic benchmark suite with JSON output for regression comparison.
+
+Measures, in one process:
+
+- ``model``:  training time, artifact load time and registry cold start
+- ``single``: ``predict_true_confidence`` latency percentiles per question count
+- ``batch``:  ``predict_true_confidence_batch`` sessions/s per batch size and
+  question count
+- ``http``:   end-to-end requests/s and client-side latency through an
+  in-process ASGI client at several concurrency levels (prediction cache off)
+
+Write a baseline on one commit and compare another against it:
+
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --output current.json --compare baseline.json [--threshold 10]
+
+``--quick`` shrinks every section for a smoke run. Numbers are only
+comparable between runs on the same machine.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+from app.main import app
+from app.ml.batching import batcher
+from app.ml.confidence_model import TRAINING_CONFIG, _get_model, predict_true_confidence, predict_true_confidence_batch
+from app.ml.model_store import load_model, train_and_save
+from app.ml.prediction_cache import prediction_cache
+from app.ml.registry import ModelRegistry
+
+HIGHER_IS_BETTER = ("_rps", "_per_s")
+LOWER_IS_BETTER = ("_us", "_ms", "_seconds")
+
+
+def _percentiles(samples: list, scale: float = 1.0) -> dict:
+    samples = sorted(samples)
+    pick = lambda q: round(samples[min(len(samples) - 1, int(len(samples) * q))] * scale, 3)
+    return {"p50": pick(0.50), "p90": pick(0.90), "p99": pick(0.99)}
+
+
+def _faces(rng: random.Random, questions: int) -> list:
+    return [round(rng.random(), 3) for _ in range(questions)]
+
+
+def bench_model() -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        start = time.perf_counter()
+        train_and_save(directory)
+        train_s = time.perf_counter() - start
+
+        load_samples = []
+        for _ in range(20):
+            start = time.perf_counter()
+            load_model(directory)
+            load_samples.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        ModelRegistry(directory=directory).active
+        registry_s = time.perf_counter() - start
+
+    return {
+        "train_seconds": round(train_s, 4),
+        "training_samples": TRAINING_CONFIG["n_samples"],
+        "artifact_load_ms": round(sorted(load_samples)[len(load_samples) // 2] * 1000.0, 3),
+        "registry_cold_start_ms": round(registry_s * 1000.0, 3),
+    }
+
+
+def bench_single(question_counts: list, calls: int) -> list:
+    rng = random.Random(7)
+    rows = []
+    for questions in question_counts:
+        faces = _faces(rng, questions)
+        for _ in range(500):
+            predict_true_confidence(0.6, faces)
+        samples = []
+        for _ in range(calls):
+            start = time.perf_counter_ns()
+            predict_true_confidence(0.6, faces)
+            samples.append(time.perf_counter_ns() - start)
+        stats = _percentiles(samples, 1e-3)
+        rows.append({
+            "questions": questions,
+            "p50_us": stats["p50"],
+            "p90_us": stats["p90"],
+            "p99_us": stats["p99"],
+        })
+    return rows
+
+
+def bench_batch(batch_sizes: list, question_counts: list, min_seconds: float) -> list:
+    rng = random.Random(8)
+    rows = []
+    for questions in question_counts:
+        for size in batch_sizes:
+            selfs = [rng.random() for _ in range(size)]
+            faces = [_faces(rng, questions) for _ in range(size)]
+            predict_true_confidence_batch(selfs, faces)
+            calls = 0
+            start = time.perf_counter()
+            while True:
+                predict_true_confidence_batch(selfs, faces)
+                calls += 1
+                elapsed = time.perf_counter() - start
+                if elapsed >= min_seconds:
+                    break
+            rows.append({
+                "batch_size": size,
+                "questions": questions,
+                "sessions_per_s": round(calls * size / elapsed, 1),
+                "batch_ms": round(elapsed / calls * 1000.0, 4),
+            })
+    return rows
+
+
+async def _drive(client: httpx.AsyncClient, path: str, payloads: list, concurrency: int) -> dict:
+    queue = list(payloads)
+    latencies = []
+
+    async def worker():
+        while queue:
+            payload = queue.pop()
+            start = time.perf_counter()
+            response = await client.post(path, json=payload)
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stats = _percentiles(latencies, 1000.0)
+    return {
+        "requests_rps": round(len(payloads) / elapsed, 1),
+        "p50_ms": stats["p50"],
+        "p99_ms": stats["p99"],
+    }
+
+
+async def _bench_http(levels: list, n_requests: int, batch_size: int) -> list:
+    rng = random.Random(9)
+    singles = [
+        {"self_confidence": round(rng.random(), 2), "face_confidence_per_question": _faces(rng, rng.randint(0, 20))}
+        for _ in range(n_requests)
+    ]
+    batches = [{"sessions": singles[i:i + batch_size]} for i in range(0, n_requests, batch_size)]
+
+    cache_enabled = prediction_cache.enabled
+    prediction_cache.enabled = False
+    rows = []
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await _drive(client, "/analyze/true-confidence", singles[:200], 8)
+            for concurrency in levels:
+                row = await _drive(client, "/analyze/true-confidence", singles, concurrency)
+                rows.append({"endpoint": "single", "concurrency": concurrency, "micro_batching": batcher.enabled, **row})
+            for concurrency in levels:
+                row = await _drive(client, "/analyze/true-confidence/batch", batches, concurrency)
+                row["sessions_per_s"] = round(row["requests_rps"] * batch_size, 1)
+                rows.append({"endpoint": "batch", "concurrency": concurrency, "batch_size": batch_size, **row})
+    finally:
+        prediction_cache.enabled = cache_enabled
+        await batcher.stop()
+    return rows
+
+
+def bench_http(levels: list, n_requests: int, batch_size: int) -> list:
+    return asyncio.run(_bench_http(levels, n_requests, batch_size))
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _metadata() -> dict:
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def _flatten(results: dict) -> dict:
+    """``{"section[dim=value,...].metric": number}`` for every directional metric."""
+    flat = {}
+    for section, value in results.items():
+        rows = value if isinstance(value, list) else [value]
+        for row in rows:
+            dims = ",".join(
+                f"{k}={v}" for k, v in row.items() if not k.endswith(HIGHER_IS_BETTER + LOWER_IS_BETTER)
+            )
+            prefix = f"{section}[{dims}]" if isinstance(value, list) else section
+            for key, metric in row.items():
+                if key.endswith(HIGHER_IS_BETTER + LOWER_IS_BETTER):
+                    flat[f"{prefix}.{key}"] = metric
+    return flat
+
+
+def compare(current: dict, baseline: dict, threshold_pct: float) -> int:
+    """Print per-metric change; returns the number of regressions beyond the threshold."""
+    now = _flatten(current["results"])
+    before = _flatten(baseline["results"])
+    print(f"\nComparison vs {baseline['meta'].get('commit', '?')} (threshold {threshold_pct:.0f}%)")
+    regressions = 0
+    for name in sorted(now):
+        if name not in before or not before[name]:
+            continue
+        change = (now[name] - before[name]) / before[name] * 100.0
+        worse = -change if name.endswith(HIGHER_IS_BETTER) else change
+        flag = ""
+        if worse > threshold_pct:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif worse < -threshold_pct:
+            flag = "  improved"
+        print(f"  {name:<72} {before[name]:>12} -> {now[name]:>12} ({change:+6.1f}%){flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the SIMCO Logic benchmark suite.")
+    parser.add_argument("--output", type=Path, default=None, help="Write results JSON here")
+    parser.add_argument("--compare", type=Path, default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent")
+    parser.add_argument("--sections", nargs="+", default=["model", "single", "batch", "http"],
+                        choices=["model", "single", "batch", "http"])
+    parser.add_argument("--quick", action="store_true", help="Small sizes for a smoke run")
+    args = parser.parse_args()
+
+    questions = [0, 10, 30]
+    if args.quick:
+        calls, batch_sizes, min_seconds, levels, n_requests = 2000, [1, 64, 1024], 0.1, [1, 16], 400
+    else:
+        calls, batch_sizes, min_seconds, levels, n_requests = 20000, [1, 16, 256, 4096], 1.0, [1, 16, 64, 256], 4000
+
+    _get_model()
+    results = {}
+    if "model" in args.sections:
+        results["model"] = bench_model()
+    if "single" in args.sections:
+        results["single"] = bench_single(questions, calls)
+    if "batch" in args.sections:
+        results["batch"] = bench_batch(batch_sizes, questions, min_seconds)
+    if "http" in args.sections:
+        results["http"] = bench_http(levels, n_requests, batch_size=64)
+
+    report = {"meta": _metadata(), "results": results}
+    print(json.dumps(report, indent=2))
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        if compare(report, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Training benchmark: data generation time, training time and test MSE.
+
+Compares the original pipeline (per-sample Python loop + 700 full-batch
+gradient descent epochs) with the vectorized generator and mini-batch Adam
+trainer at several training-set sizes. Every run is seeded and evaluated on
+the same held-out test set, so results are reproducible on a given machine.
+
+    python -m benchmarks.training [--sizes 3000 20000 50000] [--json]
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from app.ml.confidence_model import (
+    TRAINING_CONFIG,
+    _clamp01,
+    _feature_vector,
+    _generate_synthetic_training_data,
+    _init_params,
+    _mse_gradients,
+    _predict_numpy_mlp,
+    _train_numpy_mlp_adam,
+)
+
+TEST_SEED = 2024
+TEST_SAMPLES = 20000
+
+
+def _legacy_generate(n_samples: int, seed: int = 42):
+    """The original per-sample loop generator, kept here as the baseline."""
+    rng = np.random.default_rng(seed)
+    X, y = [], []
+    for _ in range(n_samples):
+        n_questions = int(rng.integers(5, 31))
+        self_n = float(rng.uniform(0, 1))
+        faces = np.clip(
+            rng.normal(loc=self_n, scale=float(rng.uniform(0.06, 0.22)), size=n_questions), 0, 1
+        )
+        target = _clamp01((0.58 * self_n) + (0.42 * float(np.mean(faces))) - (0.12 * float(np.std(faces))))
+        X.append(_feature_vector(self_n, faces.tolist()))
+        y.append(target)
+    return np.array(X, dtype=np.float32), np.array(y, dtype=np.float32)
+
+
+def _legacy_train(X: np.ndarray, y: np.ndarray, seed: int = 42, hidden_dim: int = 16,
+                  lr: float = 0.03, epochs: int = 700) -> dict:
+    """The original full-batch gradient descent trainer, kept here as the baseline."""
+    params = _init_params(X.shape[1], hidden_dim, np.random.default_rng(seed))
+    y = y.reshape(-1, 1).astype(np.float32)
+    for _ in range(epochs):
+        grads = _mse_gradients(params, X, y)
+        for name in params:
+            params[name] -= lr * grads[name]
+    return params
+
+
+def _test_mse(model: dict, X_test: np.ndarray, y_test: np.ndarray) -> float:
+    return float(np.mean((_predict_numpy_mlp(model, X_test)[:, 0] - y_test) ** 2))
+
+
+def run(sizes) -> list:
+    X_test, y_test = _generate_synthetic_training_data(n_samples=TEST_SAMPLES, seed=TEST_SEED)
+    results = []
+
+    start = time.perf_counter()
+    X, y = _legacy_generate(3000)
+    gen_s = time.perf_counter() - start
+    start = time.perf_counter()
+    model = _legacy_train(X, y, lr=0.03, epochs=700)
+    train_s = time.perf_counter() - start
+    results.append({
+        "pipeline": "legacy_loop_fullbatch_gd",
+        "n_samples": 3000,
+        "generate_seconds": round(gen_s, 4),
+        "train_seconds": round(train_s, 4),
+        "epochs": 700,
+        "test_mse": _test_mse(model, X_test, y_test),
+    })
+
+    for n_samples in sizes:
+        start = time.perf_counter()
+        X, y = _generate_synthetic_training_data(n_samples=n_samples, seed=TRAINING_CONFIG["seed"])
+        gen_s = time.perf_counter() - start
+        start = time.perf_counter()
+        model, stats = _train_numpy_mlp_adam(
+            X,
+            y,
+            seed=TRAINING_CONFIG["seed"],
+            hidden_dim=TRAINING_CONFIG["hidden_dim"],
+            lr=TRAINING_CONFIG["learning_rate"],
+            batch_size=TRAINING_CONFIG["batch_size"],
+            max_epochs=TRAINING_CONFIG["max_epochs"],
+            patience=TRAINING_CONFIG["patience"],
+            validation_fraction=TRAINING_CONFIG["validation_fraction"],
+        )
+        train_s = time.perf_counter() - start
+        results.append({
+            "pipeline": "vectorized_minibatch_adam",
+            "n_samples": n_samples,
+            "generate_seconds": round(gen_s, 4),
+            "train_seconds": round(train_s, 4),
+            "epochs": stats["epochs_run"],
+            "test_mse": _test_mse(model, X_test, y_test),
+        })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark confidence model training.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[3000, TRAINING_CONFIG["n_samples"], 50000])
+    parser.add_argument("--json", action="store_true", help="Print raw JSON instead of a table")
+    args = parser.parse_args()
+
+    results = run(args.sizes)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'pipeline':<28} {'samples':>8} {'gen s':>8} {'train s':>8} {'epochs':>7} {'test MSE':>11}")
+    for row in results:
+        print(f"{row['pipeline']:<28} {row['n_samples']:>8} {row['generate_seconds']:>8.3f} "
+              f"{row['train_seconds']:>8.3f} {row['epochs']:>7} {row['test_mse']:>11.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Face backend benchmarks. Run from services/face_backend, e.g. ``python -m src.benchmarks.batched_inference``."""
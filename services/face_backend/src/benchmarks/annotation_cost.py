@@ -0,0 +1,97 @@
+"""
+CPU cost of annotating and encoding the result image.
+
+Runs detection and inference once per sample image, then times only the work
+that follows inference, per frame, in CPU seconds (``time.process_time``):
+
+- ``legacy``:  BGR->RGB, draw, RGB->BGR, PNG encode (the previous path)
+- ``png``:     draw on the BGR frame, PNG encode
+- ``jpeg``/``webp``: draw on the BGR frame, lossy encode at ``--quality``
+- ``none``:    the annotation-free path used when no image is returned
+
+Also reports end-to-end ``classify_image`` CPU time with and without
+annotation.
+
+    python -m src.benchmarks.annotation_cost [--images images/test_image.jpg ...] [--repeats 20] [--quality 85]
+"""
+import argparse
+import time
+from pathlib import Path
+
+import cv2
+
+from ..web import emotion_gender_processor as eg_processor
+
+IMAGES_DIR = Path(__file__).resolve().parents[2] / 'images'
+DEFAULT_IMAGES = [IMAGES_DIR / 'test_image.jpg', IMAGES_DIR / 'solvay_conference.jpg']
+
+
+def _legacy(bgr_image, faces, predictions, quality):
+    rgb_image = cv2.cvtColor(bgr_image, cv2.COLOR_BGR2RGB)
+    for face_coordinates, prediction in zip(faces, predictions):
+        eg_processor._annotate(rgb_image, face_coordinates, prediction)
+    cv2.imencode('.png', cv2.cvtColor(rgb_image, cv2.COLOR_RGB2BGR))
+
+
+def _annotated(image_format):
+    def run(bgr_image, faces, predictions, quality):
+        for face_coordinates, prediction in zip(faces, predictions):
+            eg_processor._annotate(bgr_image, face_coordinates, prediction)
+        eg_processor.encode_image(bgr_image, image_format, quality)
+    return run
+
+
+def _none(bgr_image, faces, predictions, quality):
+    return None
+
+
+VARIANTS = [
+    ('legacy', _legacy),
+    ('png', _annotated('png')),
+    ('jpeg', _annotated('jpeg')),
+    ('webp', _annotated('webp')),
+    ('none', _none),
+]
+
+
+def _cpu_ms(func, repeats):
+    start = time.process_time()
+    for _ in range(repeats):
+        func()
+    return (time.process_time() - start) / repeats * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark annotation and encoding cost per frame.')
+    parser.add_argument('--images', type=Path, nargs='+', default=DEFAULT_IMAGES)
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--quality', type=int, default=eg_processor.DEFAULT_IMAGE_QUALITY)
+    args = parser.parse_args()
+
+    eg_processor._load_resources()
+    for path in args.images:
+        image_bytes = path.read_bytes()
+        bgr_image = eg_processor._decode_image(image_bytes)
+        gray_image = cv2.cvtColor(bgr_image, cv2.COLOR_BGR2GRAY)
+        faces, crops = eg_processor._extract_faces(gray_image)
+        predictions = [
+            eg_processor._build_prediction(face_coordinates, emotion_prediction)
+            for face_coordinates, emotion_prediction in zip(faces, eg_processor._predict_emotions(crops))
+        ]
+
+        print('{} ({}x{}, {} faces)'.format(path.name, bgr_image.shape[1], bgr_image.shape[0], len(faces)))
+        print('  post-inference CPU ms/frame:')
+        for name, func in VARIANTS:
+            frames = [bgr_image.copy() for _ in range(args.repeats)]
+            frame_iter = iter(frames)
+            cpu_ms = _cpu_ms(lambda: func(next(frame_iter), faces, predictions, args.quality), args.repeats)
+            print('    {:>6}: {:8.2f}'.format(name, cpu_ms))
+
+        with_image = _cpu_ms(lambda: eg_processor.classify_image(image_bytes), args.repeats)
+        without_image = _cpu_ms(lambda: eg_processor.classify_image(image_bytes, annotate=False), args.repeats)
+        print('  classify_image CPU ms/frame: annotated PNG {:.2f}, no annotation {:.2f} (saves {:.2f})'.format(
+            with_image, without_image, with_image - without_image))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Latency of ``model.predict`` vs the traced ``BucketedPredictor`` path.
+
+Times the emotion classifier on random preprocessed 64x64 crops at several
+batch sizes (including sizes that need padding to a bucket) with:
+
+- ``predict``:  ``model.predict(x, verbose=0)`` (the previous path)
+- ``eager``:    ``model(x, training=False)`` without tf.function
+- ``compiled``: ``BucketedPredictor.predict`` (concrete function per bucket)
+
+and checks that the compiled outputs match ``predict``.
+
+Runs with the Keras emotion runtime (``FACE_EMOTION_RUNTIME=keras``, the default).
+
+    python -m src.benchmarks.compiled_inference [--batch-sizes 1 3 8 17 64] [--calls 200]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from ..web import emotion_gender_processor as eg_processor
+from ..web.compiled_inference import BucketedPredictor
+
+
+def _latencies_ms(func, calls):
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    samples.sort()
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark compiled emotion inference.')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 3, 8, 17, 64])
+    parser.add_argument('--calls', type=int, default=200)
+    args = parser.parse_args()
+
+    eg_processor._load_resources()
+    model = eg_processor._emotion_runtime.model
+    start = time.perf_counter()
+    predictor = BucketedPredictor(model)
+    print('traced {} buckets {} in {:.2f} s'.format(
+        len(predictor.buckets), predictor.buckets, time.perf_counter() - start))
+
+    rng = np.random.default_rng(0)
+    print('{:>5} | {:>9} | {:>9} | {:>9} | {:>9} | {:>10} | {:>10} | {:>9}'.format(
+        'batch', 'predict50', 'predict99', 'eager50', 'eager99', 'compiled50', 'compiled99', 'max diff'))
+    for batch_size in args.batch_sizes:
+        batch = rng.uniform(-1.0, 1.0, size=(batch_size,) + predictor.input_shape).astype(np.float32)
+        paths = {
+            'predict': lambda: model.predict(batch, batch_size=batch_size, verbose=0),
+            'eager': lambda: model(batch, training=False),
+            'compiled': lambda: predictor.predict(batch),
+        }
+        for func in paths.values():
+            for _ in range(5):
+                func()
+        timings = {name: _latencies_ms(func, args.calls) for name, func in paths.items()}
+        diff = float(np.max(np.abs(paths['predict']() - paths['compiled']())))
+        print('{:>5} | {:>9.2f} | {:>9.2f} | {:>9.2f} | {:>9.2f} | {:>10.2f} | {:>10.2f} | {:>9.1e}'.format(
+            batch_size,
+            timings['predict'][0], timings['predict'][1],
+            timings['eager'][0], timings['eager'][1],
+            timings['compiled'][0], timings['compiled'][1],
+            diff))
+
+
+if __name__ == '__main__':
+    main()
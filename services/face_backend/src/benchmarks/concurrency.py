@@ -0,0 +1,118 @@
+"""
+Concurrency benchmark for the face API executor layer.
+
+For each executor configuration, sends ``--requests`` ``/api/classify`` calls
+from ``--concurrency`` concurrent clients through an in-process ASGI client.
+Meanwhile a probe calls ``/api/health`` every 20 ms. It reports:
+
+- classify requests/s
+- classify p50/p99 latency
+- health-probe p50/p99 latency
+- 503 rejections
+
+With ``inline`` (the previous behaviour) the probe waits behind every
+classification because inference blocks the event loop.
+
+    python -m src.benchmarks.concurrency [--image images/test_image.jpg] [--requests 48] \\
+        [--concurrency 1 8 32] [--executors inline thread:1 thread:4 process:2]
+"""
+import argparse
+import asyncio
+import time
+from pathlib import Path
+
+import httpx
+
+from ..web import faces
+from ..web import inference_pool as pool_module
+
+DEFAULT_IMAGE = Path(__file__).resolve().parents[2] / 'images' / 'test_image.jpg'
+PROBE_INTERVAL_SECONDS = 0.02
+
+
+def _percentile(samples, q):
+    if not samples:
+        return float('nan')
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))] * 1000.0
+
+
+async def _run(image_bytes, n_requests, concurrency):
+    transport = httpx.ASGITransport(app=faces.app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=None) as client:
+        remaining = [n_requests]
+        classify_latencies = []
+        probe_latencies = []
+        rejected = [0]
+        done = asyncio.Event()
+
+        async def worker():
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                start = time.perf_counter()
+                response = await client.post('/api/classify', files={'image': ('frame.jpg', image_bytes)})
+                if response.status_code == 503:
+                    rejected[0] += 1
+                    continue
+                response.raise_for_status()
+                classify_latencies.append(time.perf_counter() - start)
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                (await client.get('/api/health')).raise_for_status()
+                probe_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(PROBE_INTERVAL_SECONDS)
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+
+    return {
+        'rps': len(classify_latencies) / elapsed,
+        'p50_ms': _percentile(classify_latencies, 0.50),
+        'p99_ms': _percentile(classify_latencies, 0.99),
+        'health_p50_ms': _percentile(probe_latencies, 0.50),
+        'health_p99_ms': _percentile(probe_latencies, 0.99),
+        'rejected': rejected[0],
+    }
+
+
+def _parse_executor(spec):
+    kind, _, workers = spec.partition(':')
+    return kind, int(workers) if workers else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark /api/classify under concurrent load per executor.')
+    parser.add_argument('--image', type=Path, default=DEFAULT_IMAGE)
+    parser.add_argument('--requests', type=int, default=48)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--executors', nargs='+', default=['inline', 'thread:1', 'thread:4', 'process:2'],
+                        help='kind[:workers], kind in {}'.format(', '.join(pool_module.EXECUTOR_KINDS)))
+    args = parser.parse_args()
+
+    image_bytes = args.image.read_bytes()
+    print('{:>10} | {:>5} | {:>7} | {:>8} | {:>8} | {:>10} | {:>10} | {:>4}'.format(
+        'executor', 'conc', 'req/s', 'p50 ms', 'p99 ms', 'health p50', 'health p99', '503'))
+    for spec in args.executors:
+        kind, workers = _parse_executor(spec)
+        pool = pool_module.InferencePool(kind=kind, workers=workers)
+        pool.start()
+        faces.pool_module.inference_pool = pool
+        try:
+            asyncio.run(_run(image_bytes, min(args.requests, 4), 2))
+            for concurrency in args.concurrency:
+                row = asyncio.run(_run(image_bytes, args.requests, concurrency))
+                print('{:>10} | {:>5} | {:>7.1f} | {:>8.1f} | {:>8.1f} | {:>10.1f} | {:>10.1f} | {:>4}'.format(
+                    spec, concurrency, row['rps'], row['p50_ms'], row['p99_ms'],
+                    row['health_p50_ms'], row['health_p99_ms'], row['rejected']))
+        finally:
+            pool.shutdown()
+
+
+if __name__ == '__main__':
+    main()
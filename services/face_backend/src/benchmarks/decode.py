@@ -0,0 +1,96 @@
+"""
+Decode benchmark for unannotated uploads: full BGR + cvtColor vs direct grayscale vs reduced grayscale.
+
+Builds webcam-like JPEG frames (quality 80) from the sample images,
+center-cropped to 16:9 and resized to each ``--sizes`` entry. Reports:
+
+- decode ms per frame for each path
+- decode + face detection ms per frame
+- box recall of the reduced path against the full-resolution path (IoU >= 0.5)
+
+Reduced-path boxes are scaled back to frame coordinates before the
+comparison.
+
+    python -m src.benchmarks.decode [--sizes 1280x720 1920x1080] [--repeats 20]
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from ..web import emotion_gender_processor as eg_processor
+from .face_detection import IMAGES_DIR, _iou
+
+SOURCE_IMAGES = ['test_image.jpg', '12_angry_men.jpg', 'solvay_conference.jpg', 'robocup_team.png']
+
+
+def _webcam_jpeg(path, width, height):
+    image = cv2.imread(str(path), cv2.IMREAD_COLOR)
+    source_height, source_width = image.shape[:2]
+    crop_height = min(source_height, int(source_width * height / width))
+    top = (source_height - crop_height) // 2
+    frame = cv2.resize(image[top:top + crop_height], (width, height), interpolation=cv2.INTER_AREA)
+    return cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes()
+
+
+def _decode_color(image_bytes):
+    return cv2.cvtColor(eg_processor._decode_image(image_bytes), cv2.COLOR_BGR2GRAY), 1
+
+
+def _decode_grayscale(image_bytes):
+    return cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_GRAYSCALE), 1
+
+
+PATHS = [
+    ('color+cvtColor', _decode_color),
+    ('grayscale', _decode_grayscale),
+    ('reduced', eg_processor._decode_gray),
+]
+
+
+def _ms(func, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) / repeats * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark grayscale / reduced JPEG decode for unannotated frames.')
+    parser.add_argument('--sizes', nargs='+', default=['1280x720', '1920x1080'])
+    parser.add_argument('--repeats', type=int, default=20)
+    args = parser.parse_args()
+
+    eg_processor._load_resources()
+    print('{:>9} | {:<15} | {:>6} | {:>9} | {:>16} | {:>10}'.format(
+        'size', 'path', 'factor', 'decode ms', 'decode+detect ms', 'box recall'))
+    for size in args.sizes:
+        width, height = [int(v) for v in size.split('x')]
+        frames = [_webcam_jpeg(IMAGES_DIR / name, width, height) for name in SOURCE_IMAGES]
+        reference = None
+        for name, decode in PATHS:
+            decode_ms = np.mean([_ms(lambda: decode(frame), args.repeats) for frame in frames])
+
+            def decode_and_detect(frame):
+                gray_image, factor = decode(frame)
+                faces, _ = eg_processor._extract_faces(gray_image)
+                return [tuple(box) for box in eg_processor._scale_boxes(faces, factor)], factor
+
+            total_ms = np.mean([_ms(lambda: decode_and_detect(frame), max(1, args.repeats // 4)) for frame in frames])
+            outputs = [decode_and_detect(frame) for frame in frames]
+            boxes = [found for found, _ in outputs]
+            if reference is None:
+                reference = boxes
+            truth = sum(len(found) for found in reference)
+            matched = sum(
+                sum(1 for box in expected if any(_iou(box, other) >= 0.5 for other in found))
+                for expected, found in zip(reference, boxes)
+            )
+            factors = sorted(set(factor for _, factor in outputs))
+            print('{:>9} | {:<15} | {:>6} | {:>9.2f} | {:>16.1f} | {:>10.1%}'.format(
+                size, name, '/'.join(str(f) for f in factors), decode_ms, total_ms, matched / float(max(1, truth))))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+Face detector harness: per-frame latency and agreement on a local image folder.
+
+Runs every detector backend in ``--detectors`` over each image in
+``--images``. Frames are grayscale, as in the API. Reports mean/p50/p95
+latency per frame. Agreement is measured against the ``--reference``
+detector:
+
+- frame recall: reference frames with a face where at least one face is found
+- box recall: reference boxes matched at IoU >= 0.5
+- box precision: found boxes that match a reference box
+
+It finishes by naming the fastest detector whose box recall meets
+``--recall-target``. Backends whose model files are missing are listed and
+skipped.
+
+    python -m src.benchmarks.detectors [--images images] [--detectors haar dnn] [--reference dnn] \\
+        [--recall-target 0.9] [--repeats 3]
+"""
+import argparse
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from ..web.face_detection import DETECTOR_BACKENDS, create_detector
+from .face_detection import IMAGE_SUFFIXES, IMAGES_DIR, SKIPPED_NAME_PARTS, _iou
+
+
+def _load_frames(images_dir):
+    frames = []
+    for path in sorted(images_dir.iterdir()):
+        if path.suffix.lower() not in IMAGE_SUFFIXES or any(part in path.name for part in SKIPPED_NAME_PARTS):
+            continue
+        gray_image = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+        if gray_image is not None:
+            frames.append((path.name, gray_image))
+    return frames
+
+
+def _run(detector, frames, repeats):
+    times, outputs = [], []
+    for _, frame in frames:
+        detector.detect(frame)
+        samples = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            faces = detector.detect(frame)
+            samples.append((time.perf_counter() - start) * 1000.0)
+        times.append(min(samples))
+        outputs.append([tuple(int(v) for v in face) for face in faces])
+    return np.asarray(times), outputs
+
+
+def _agreement(reference, outputs):
+    frames_with_truth = frames_hit = truth_boxes = truth_hit = found_boxes = found_hit = 0
+    for truth, found in zip(reference, outputs):
+        found_boxes += len(found)
+        found_hit += sum(1 for box in found if any(_iou(box, other) >= 0.5 for other in truth))
+        if not truth:
+            continue
+        frames_with_truth += 1
+        frames_hit += bool(found)
+        truth_boxes += len(truth)
+        truth_hit += sum(1 for box in truth if any(_iou(box, other) >= 0.5 for other in found))
+    return {
+        'frame_recall': frames_hit / float(max(1, frames_with_truth)),
+        'box_recall': truth_hit / float(max(1, truth_boxes)),
+        'box_precision': found_hit / float(max(1, found_boxes)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare face detector backends on a folder of images.')
+    parser.add_argument('--images', type=Path, default=IMAGES_DIR)
+    parser.add_argument('--detectors', nargs='+', default=sorted(DETECTOR_BACKENDS),
+                        choices=sorted(DETECTOR_BACKENDS))
+    parser.add_argument('--reference', default='dnn', choices=sorted(DETECTOR_BACKENDS),
+                        help='Detector treated as ground truth for agreement')
+    parser.add_argument('--recall-target', type=float, default=0.9)
+    parser.add_argument('--repeats', type=int, default=3, help='Timed runs per frame (the fastest counts)')
+    args = parser.parse_args()
+
+    frames = _load_frames(args.images)
+    names = list(dict.fromkeys([args.reference] + args.detectors))
+    results = {}
+    for name in names:
+        try:
+            detector = create_detector(name)
+        except FileNotFoundError as err:
+            print('skipping {}: {}'.format(name, err))
+            continue
+        results[name] = _run(detector, frames, args.repeats)
+
+    if args.reference not in results:
+        print('Reference detector {!r} is unavailable; agreement is not reported.'.format(args.reference))
+    reference = results[args.reference][1] if args.reference in results else None
+
+    print('{} frames from {}, reference: {}'.format(len(frames), args.images, args.reference))
+    print('{:<6} | {:>8} | {:>8} | {:>8} | {:>6} | {:>12} | {:>10} | {:>13}'.format(
+        'name', 'mean ms', 'p50 ms', 'p95 ms', 'faces', 'frame recall', 'box recall', 'box precision'))
+    candidates = []
+    for name, (times, outputs) in results.items():
+        agreement = _agreement(reference, outputs) if reference is not None else None
+        print('{:<6} | {:>8.1f} | {:>8.1f} | {:>8.1f} | {:>6} | {:>12} | {:>10} | {:>13}'.format(
+            name, times.mean(), np.percentile(times, 50), np.percentile(times, 95),
+            sum(len(found) for found in outputs),
+            '{:.1%}'.format(agreement['frame_recall']) if agreement else '-',
+            '{:.1%}'.format(agreement['box_recall']) if agreement else '-',
+            '{:.1%}'.format(agreement['box_precision']) if agreement else '-'))
+        if agreement and agreement['box_recall'] >= args.recall_target:
+            candidates.append((times.mean(), name))
+
+    if candidates:
+        print('Fastest detector with box recall >= {:.0%}: {}'.format(args.recall_target, min(candidates)[1]))
+    elif reference is not None:
+        print('No detector reaches box recall {:.0%}.'.format(args.recall_target))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+Face detection latency vs recall: the old unbounded ladder vs ``DetectionStrategy``.
+
+The face set contains every sample image in ``--images`` resized so that its
+longer side is 320, 640, 1280 and 1920 px. The no-face set contains the same
+frames rotated by 180 degrees (the frontal cascade does not fire on
+upside-down faces), plus flat, gradient and noise frames.
+
+Ground truth is what the old ladder finds on each face frame. Reported per
+configuration:
+
+- mean / p95 / max ms per frame on each set
+- frame recall: face frames where at least one face is still found
+- box recall: old boxes matched at IoU >= 0.5
+- detections on no-face frames
+
+    python -m src.benchmarks.face_detection [--images images] [--max-side 480 640 960] [--budget-ms 150]
+"""
+import argparse
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from ..web.face_detection import DETECTOR_LADDER, DetectionStrategy, HaarDetector
+
+IMAGES_DIR = Path(__file__).resolve().parents[2] / 'images'
+IMAGE_SUFFIXES = ('.jpg', '.jpeg', '.png', '.webp')
+# Rendered outputs in images/, not source photos.
+SKIPPED_NAME_PARTS = ('_with_emotion', 'demo_results', 'gradcam_results')
+FRAME_SIDES = (320, 640, 1280, 1920)
+
+
+def _legacy_detect(detector, gray_image):
+    """The previous ``_detect_faces_robust``: eight passes, 2x upscale, no size limits."""
+    gray_equalized = cv2.equalizeHist(gray_image)
+    for scale_factor, min_neighbors in DETECTOR_LADDER:
+        faces = detector.detectMultiScale(gray_equalized, scale_factor, min_neighbors)
+        if len(faces) > 0:
+            return faces
+    upscaled = cv2.resize(gray_equalized, None, fx=2.0, fy=2.0, interpolation=cv2.INTER_CUBIC)
+    for scale_factor, min_neighbors in DETECTOR_LADDER:
+        faces = detector.detectMultiScale(upscaled, scale_factor, min_neighbors)
+        if len(faces) > 0:
+            return np.asarray([[int(v / 2) for v in face] for face in faces])
+    return []
+
+
+def _resize_longest(gray_image, side):
+    scale = side / float(max(gray_image.shape[:2]))
+    interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_CUBIC
+    return cv2.resize(gray_image, None, fx=scale, fy=scale, interpolation=interpolation)
+
+
+def _frame_sets(images_dir):
+    face_frames, no_face_frames = [], []
+    paths = sorted(
+        path for path in images_dir.iterdir()
+        if path.suffix.lower() in IMAGE_SUFFIXES and not any(part in path.name for part in SKIPPED_NAME_PARTS)
+    )
+    for path in paths:
+        gray_image = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+        if gray_image is None:
+            continue
+        for side in FRAME_SIDES:
+            frame = _resize_longest(gray_image, side)
+            face_frames.append(('{}@{}'.format(path.name, side), frame))
+            no_face_frames.append(('{}@{}-rot180'.format(path.name, side), cv2.rotate(frame, cv2.ROTATE_180)))
+
+    rng = np.random.default_rng(3)
+    for width, height in ((640, 480), (1280, 720), (1920, 1080)):
+        gradient = np.tile(np.linspace(0, 255, width, dtype=np.float32), (height, 1)).astype(np.uint8)
+        no_face_frames.append(('flat@{}'.format(width), np.full((height, width), 128, np.uint8)))
+        no_face_frames.append(('gradient@{}'.format(width), gradient))
+        no_face_frames.append(('noise@{}'.format(width), rng.integers(0, 256, (height, width), dtype=np.uint8)))
+    return face_frames, no_face_frames
+
+
+def _iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = ix * iy
+    union = aw * ah + bw * bh - inter
+    return inter / float(union) if union else 0.0
+
+
+def _run(detect, frames):
+    times, outputs = [], []
+    for _, frame in frames:
+        start = time.perf_counter()
+        faces = detect(frame)
+        times.append((time.perf_counter() - start) * 1000.0)
+        outputs.append([tuple(int(v) for v in face) for face in faces])
+    return np.asarray(times), outputs
+
+
+def _recall(reference, outputs):
+    frames_with_truth = frames_hit = boxes_truth = boxes_hit = 0
+    for truth, found in zip(reference, outputs):
+        if not truth:
+            continue
+        frames_with_truth += 1
+        frames_hit += bool(found)
+        boxes_truth += len(truth)
+        boxes_hit += sum(1 for box in truth if any(_iou(box, other) >= 0.5 for other in found))
+    return frames_hit / float(max(1, frames_with_truth)), boxes_hit / float(max(1, boxes_truth))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark bounded face detection against the old ladder.')
+    parser.add_argument('--images', type=Path, default=IMAGES_DIR)
+    parser.add_argument('--max-side', type=int, nargs='+', default=[480, 640, 960])
+    parser.add_argument('--budget-ms', type=float, default=150.0)
+    args = parser.parse_args()
+
+    detector = HaarDetector().cascade()
+    face_frames, no_face_frames = _frame_sets(args.images)
+    configs = [('legacy', lambda frame: _legacy_detect(detector, frame), None)]
+    for max_side in args.max_side:
+        for budget_ms in (float('inf'), args.budget_ms):
+            strategy = DetectionStrategy(max_side=max_side, budget_ms=budget_ms)
+            name = 'max_side={} budget={}'.format(max_side, 'none' if budget_ms == float('inf') else int(budget_ms))
+            configs.append((name, lambda frame, strategy=strategy: strategy.detect(detector, frame), strategy))
+
+    print('{} face frames, {} no-face frames'.format(len(face_frames), len(no_face_frames)))
+    print('{:<26} | {:>22} | {:>12} | {:>10} | {:>22} | {:>9} | {:>12}'.format(
+        'config', 'face ms mean/p95/max', 'frame recall', 'box recall',
+        'no-face ms mean/p95/max', 'false pos', 'budget stops'))
+    reference = None
+    for name, detect, strategy in configs:
+        face_times, face_outputs = _run(detect, face_frames)
+        no_face_times, no_face_outputs = _run(detect, no_face_frames)
+        if reference is None:
+            reference = face_outputs
+        frame_recall, box_recall = _recall(reference, face_outputs)
+        false_positives = sum(1 for found in no_face_outputs if found)
+        print('{:<26} | {:>6.1f} {:>7.1f} {:>7.1f} | {:>12.1%} | {:>10.1%} | {:>6.1f} {:>7.1f} {:>7.1f} | {:>9} | {:>12}'.format(
+            name, face_times.mean(), np.percentile(face_times, 95), face_times.max(),
+            frame_recall, box_recall,
+            no_face_times.mean(), np.percentile(no_face_times, 95), no_face_times.max(),
+            '{}/{}'.format(false_positives, len(no_face_frames)),
+            strategy.budget_stops if strategy is not None else '-'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Temporal tracking benchmark: full-frame detection on every frame vs ``FaceTracker``.
+
+Builds a burst of frames like the ones the frontend sends for one question:
+the same sample image shifted by a few pixels with small brightness changes.
+It then detects faces on every frame both ways and reports:
+
+- ms per frame for each
+- how many frames the tracker served from the ROI
+- box recall of the tracker against full detection (IoU >= 0.5)
+
+    python -m src.benchmarks.face_tracking [--images images/test_image.jpg ...] [--frames 30] [--max-shift 12]
+"""
+import argparse
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from ..web.face_detection import create_detector
+from ..web.face_tracking import FaceTracker
+from .face_detection import IMAGES_DIR, _iou
+
+DEFAULT_IMAGES = [IMAGES_DIR / 'test_image.jpg', IMAGES_DIR / '12_angry_men.jpg', IMAGES_DIR / 'solvay_conference.jpg']
+
+
+def _burst(gray_image, n_frames, max_shift, seed=5):
+    rng = np.random.default_rng(seed)
+    height, width = gray_image.shape[:2]
+    frames = []
+    for _ in range(n_frames):
+        dx, dy = rng.integers(-max_shift, max_shift + 1, size=2)
+        shift = np.float32([[1, 0, dx], [0, 1, dy]])
+        frame = cv2.warpAffine(gray_image, shift, (width, height), borderMode=cv2.BORDER_REPLICATE)
+        frames.append(cv2.convertScaleAbs(frame, alpha=1.0, beta=float(rng.integers(-10, 11))))
+    return frames
+
+
+def _timed(detect, frames):
+    outputs = []
+    start = time.perf_counter()
+    for frame in frames:
+        outputs.append([tuple(int(v) for v in face) for face in detect(frame)])
+    return (time.perf_counter() - start) / len(frames) * 1000.0, outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark temporal face tracking against per-frame detection.')
+    parser.add_argument('--images', type=Path, nargs='+', default=DEFAULT_IMAGES)
+    parser.add_argument('--frames', type=int, default=30)
+    parser.add_argument('--max-shift', type=int, default=12, help='Max per-frame translation in pixels')
+    parser.add_argument('--detector', default=None, help='Detector backend (default: FACE_DETECTOR or haar)')
+    args = parser.parse_args()
+
+    detector = create_detector(args.detector)
+    print('{:<24} | {:>6} | {:>13} | {:>13} | {:>7} | {:>8} | {:>10}'.format(
+        'image', 'frames', 'full ms/frame', 'track ms/frame', 'speedup', 'ROI hits', 'box recall'))
+    for path in args.images:
+        gray_image = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+        frames = _burst(gray_image, args.frames, args.max_shift)
+        detector.detect(frames[0])
+
+        full_ms, full_outputs = _timed(detector.detect, frames)
+        tracker = FaceTracker.from_env()
+        track_ms, track_outputs = _timed(lambda frame: tracker.detect(detector, frame), frames)
+
+        truth_boxes = matched = 0
+        for truth, found in zip(full_outputs, track_outputs):
+            truth_boxes += len(truth)
+            matched += sum(1 for box in truth if any(_iou(box, other) >= 0.5 for other in found))
+        print('{:<24} | {:>6} | {:>13.1f} | {:>13.1f} | {:>6.1f}x | {:>8} | {:>10.1%}'.format(
+            path.name[:24], len(frames), full_ms, track_ms, full_ms / track_ms,
+            tracker.roi_hits, matched / float(max(1, truth_boxes))))
+
+
+if __name__ == '__main__':
+    main()
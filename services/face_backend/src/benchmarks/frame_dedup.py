@@ -0,0 +1,143 @@
+"""
+Result reuse benchmark: exact result cache + near-duplicate face reuse vs classifying every frame.
+
+Builds a session of webcam-like JPEG frames per sample image: a burst of
+slightly shifted frames with small brightness changes (see
+``face_tracking._burst``), where every ``--resend-every``-th upload repeats
+the previous bytes as a client retry would. The frames go through
+``classify_image`` one by one, first with both caches off, then with them
+on. Both runs use a session token, so the face tracker is active in both.
+Reports:
+
+- ms per frame for each run
+- face crops that went through the CNN, and how many the caches saved
+- exact cache and near-duplicate hit rates
+- dHash distance between each face and the closest face of the previous
+  (non-resent) frame
+- frames whose top emotion differs between the two runs, and the largest
+  change of the top score
+
+    python -m src.benchmarks.frame_dedup [--frames 30] [--max-shift 2] [--resend-every 5]
+"""
+import argparse
+import time
+from collections import Counter
+
+import cv2
+import numpy as np
+
+from ..web import emotion_gender_processor as eg_processor
+from ..web import result_cache as cache_module
+from .face_detection import IMAGES_DIR
+from .face_tracking import _burst
+
+DEFAULT_IMAGES = ['test_image.jpg', '12_angry_men.jpg', 'solvay_conference.jpg']
+
+
+def _session(path, n_frames, max_shift, resend_every):
+    gray_image = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+    uploads = []
+    for frame in _burst(gray_image, n_frames, max_shift):
+        if uploads and resend_every and len(uploads) % resend_every == 0:
+            uploads.append(uploads[-1])
+            continue
+        uploads.append(cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes())
+    return uploads
+
+
+def _run(uploads, session_token):
+    """Classify every upload; returns (ms per frame, CNN crops, per-frame predictions)."""
+    cnn_crops = [0]
+    predict = eg_processor._predict_emotions
+
+    def counting_predict(crops):
+        cnn_crops[0] += len(crops)
+        return predict(crops)
+
+    eg_processor._predict_emotions = counting_predict
+    try:
+        start = time.perf_counter()
+        results = [eg_processor.classify_image(upload, annotate=False, session_token=session_token)['predictions']
+                   for upload in uploads]
+        elapsed = time.perf_counter() - start
+    finally:
+        eg_processor._predict_emotions = predict
+    return elapsed / len(uploads) * 1000.0, cnn_crops[0], results
+
+
+def _distances(uploads):
+    """dHash distance of every face to the closest face of the previous frame, resends skipped."""
+    distances = []
+    previous = []
+    for index, upload in enumerate(uploads):
+        if index and upload == uploads[index - 1]:
+            continue
+        gray_image, _ = eg_processor._decode_gray(upload)
+        _, crops = eg_processor._extract_faces(gray_image)
+        hashes = [cache_module.dhash(crop) for crop in crops]
+        for face_hash in hashes:
+            if previous:
+                distances.append(min(bin(face_hash ^ other).count('1') for other in previous))
+        previous = hashes
+    return distances
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark exact and near-duplicate result reuse on frame bursts.')
+    parser.add_argument('--images', nargs='+', default=DEFAULT_IMAGES)
+    parser.add_argument('--frames', type=int, default=30)
+    parser.add_argument('--max-shift', type=int, default=2, help='Max per-frame translation in pixels')
+    parser.add_argument('--resend-every', type=int, default=5, help='Repeat the previous upload every N frames (0: never)')
+    args = parser.parse_args()
+
+    eg_processor._load_resources()
+    result_cache = cache_module.result_cache
+    print('{:<24} | {:>10} | {:>11} | {:>8} | {:>9} | {:>9} | {:>13} | {:>9} | {:>9}'.format(
+        'image', 'off ms/fr', 'reuse ms/fr', 'CNN off', 'CNN reuse', 'exact hit', 'near-dup hit', 'top1 diff',
+        'max delta'))
+    all_distances = []
+    for name in args.images:
+        uploads = _session(IMAGES_DIR / name, args.frames, args.max_shift, args.resend_every)
+        eg_processor.classify_image(uploads[0], annotate=False)
+
+        result_cache.enabled = False
+        cache_module.near_duplicate_store.get('frame-dedup-off-{}'.format(name)).max_distance = -1
+        off_ms, off_crops, off_results = _run(uploads, 'frame-dedup-off-{}'.format(name))
+
+        result_cache.enabled = True
+        exact_before = result_cache.metrics()
+        near_before = cache_module.near_duplicate_hits.metrics()
+        reuse_ms, reuse_crops, reuse_results = _run(uploads, 'frame-dedup-{}'.format(name))
+        exact_after = result_cache.metrics()
+        near_after = cache_module.near_duplicate_hits.metrics()
+
+        exact_hits = exact_after['hits'] - exact_before['hits']
+        near_lookups = near_after['lookups'] - near_before['lookups']
+        near_hits = near_after['hits'] - near_before['hits']
+        top1_diff = 0
+        max_score_change = 0.0
+        for fresh, reused in zip(off_results, reuse_results):
+            if not fresh or not reused:
+                top1_diff += bool(fresh) != bool(reused)
+                continue
+            fresh_top = max(fresh, key=lambda item: item['confidence'])
+            reused_top = max(reused, key=lambda item: item['confidence'])
+            top1_diff += fresh_top['emotion'] != reused_top['emotion']
+            max_score_change = max(max_score_change, abs(fresh_top['confidence'] - reused_top['confidence']))
+        print('{:<24} | {:>10.1f} | {:>11.1f} | {:>8} | {:>9} | {:>9.1%} | {:>13.1%} | {:>9} | {:>9.3f}'.format(
+            name[:24], off_ms, reuse_ms, off_crops, reuse_crops, exact_hits / float(len(uploads)),
+            near_hits / float(max(1, near_lookups)), top1_diff, max_score_change))
+        all_distances.extend(_distances(uploads))
+
+    if all_distances:
+        counts = Counter(min(distance, 16) for distance in all_distances)
+        print('dHash distance to the previous frame (16 = 16+), max reuse distance {}:'.format(
+            cache_module.NearDuplicateIndex.from_env().max_distance))
+        print('  ' + '  '.join('{}:{}'.format(distance, counts[distance]) for distance in sorted(counts)))
+        print('  median {:.0f}, {:.1%} within the threshold'.format(
+            np.median(all_distances),
+            np.mean(np.asarray(all_distances) <= cache_module.NearDuplicateIndex.from_env().max_distance)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Server cost per frame: full detection path vs client-provided boxes vs pre-cropped face patches.
+
+Uses 1280x720 webcam-like JPEGs built from the sample images. The boxes and
+patches are the ones the full path finds, as a client-side detector would
+send them. Reports ms per frame for:
+
+- ``classify_image`` (decode + detection + inference)
+- ``classify_face_boxes`` (grayscale decode + crop + inference)
+- ``classify_face_patches`` with raw 64x64 uint8 patches
+- ``classify_face_patches`` with PNG-encoded patches
+
+    python -m src.benchmarks.precropped [--size 1280x720] [--repeats 10]
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from ..web import emotion_gender_processor as eg_processor
+from .decode import SOURCE_IMAGES, _webcam_jpeg
+from .face_detection import IMAGES_DIR
+
+
+def _ms(func, repeats):
+    func()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) / repeats * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the pre-cropped face endpoints against full detection.')
+    parser.add_argument('--size', default='1280x720')
+    parser.add_argument('--repeats', type=int, default=10)
+    args = parser.parse_args()
+
+    eg_processor._load_resources()
+    width, height = [int(v) for v in args.size.split('x')]
+    target_height, target_width = eg_processor._emotion_target_size
+    totals = {'detection': [], 'boxes': [], 'raw patches': [], 'png patches': []}
+    faces_total = 0
+    for name in SOURCE_IMAGES:
+        image_bytes = _webcam_jpeg(IMAGES_DIR / name, width, height)
+        predictions = eg_processor.classify_image(image_bytes, annotate=False)['predictions']
+        boxes = [[prediction['box'][key] for key in ('x', 'y', 'w', 'h')] for prediction in predictions]
+        gray_image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+        patches = [cv2.resize(gray_image[y:y + h, x:x + w], (target_width, target_height)) for x, y, w, h in boxes]
+        raw_patches = [patch.tobytes() for patch in patches]
+        png_patches = [cv2.imencode('.png', patch)[1].tobytes() for patch in patches]
+        faces_total += len(boxes)
+
+        totals['detection'].append(_ms(lambda: eg_processor.classify_image(image_bytes, annotate=False), args.repeats))
+        totals['boxes'].append(_ms(lambda: eg_processor.classify_face_boxes(image_bytes, boxes), args.repeats))
+        totals['raw patches'].append(_ms(lambda: eg_processor.classify_face_patches(raw_patches), args.repeats))
+        totals['png patches'].append(_ms(lambda: eg_processor.classify_face_patches(png_patches), args.repeats))
+
+    print('{} frames at {}, {} faces'.format(len(SOURCE_IMAGES), args.size, faces_total))
+    baseline = np.mean(totals['detection'])
+    for name, samples in totals.items():
+        print('{:<12} {:>8.2f} ms/frame  ({:.1f}x)'.format(name, np.mean(samples), baseline / np.mean(samples)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Emotion runtime parity harness: Keras vs TFLite vs ONNX Runtime exports on local face crops.
+
+Detects faces in every image of ``--images`` (as the API does) and
+classifies the crops with each ``--runtimes`` entry (``runtime`` or
+``runtime:quantization``, see ``src.export_emotion_model``). Against the
+Keras model it reports:
+
+- top-1 agreement and max / mean absolute score difference
+- load time and model file size
+- p50 / p99 latency per call at each ``--batch-sizes`` entry
+
+Entries whose export or runtime package is missing are listed and skipped.
+
+    python -m src.benchmarks.runtimes [--images images] [--runtimes keras tflite tflite:float16 onnx] \\
+        [--batch-sizes 1 16] [--calls 100]
+"""
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+
+from ..web import emotion_gender_processor as eg_processor
+from ..web.emotion_runtimes import create_runtime, exported_model_path
+from .detectors import _load_frames
+from .face_detection import IMAGES_DIR
+
+DEFAULT_RUNTIMES = ['keras', 'tflite', 'tflite:float16', 'tflite:dynamic', 'tflite:int8',
+                    'onnx', 'onnx:dynamic', 'onnx:int8']
+
+
+def _crops(images_dir):
+    crops = []
+    for _, gray_image in _load_frames(images_dir):
+        crops.extend(eg_processor._extract_faces(gray_image)[1])
+    return np.expand_dims(np.stack(crops), -1).astype(np.float32)
+
+
+def _predict_all(runtime, batch, chunk=64):
+    return np.concatenate([runtime.predict(batch[start:start + chunk]) for start in range(0, len(batch), chunk)])
+
+
+def _latencies_ms(runtime, batch, calls):
+    for _ in range(5):
+        runtime.predict(batch)
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        runtime.predict(batch)
+        samples.append((time.perf_counter() - start) * 1000.0)
+    samples.sort()
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.99)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare emotion runtimes against the Keras model.')
+    parser.add_argument('--images', type=Path, default=IMAGES_DIR)
+    parser.add_argument('--runtimes', nargs='+', default=DEFAULT_RUNTIMES)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 16])
+    parser.add_argument('--calls', type=int, default=100)
+    args = parser.parse_args()
+
+    eg_processor._load_resources()
+    crops = _crops(args.images)
+    print('{} face crops from {}'.format(len(crops), args.images))
+    reference = None
+
+    header = '{:<15} | {:>7} | {:>8} | {:>6} | {:>8} | {:>9}'.format(
+        'runtime', 'load s', 'size KB', 'top-1', 'max diff', 'mean diff')
+    for batch_size in args.batch_sizes:
+        header += ' | {:>8} | {:>8}'.format('p50@{}'.format(batch_size), 'p99@{}'.format(batch_size))
+    print(header)
+    for spec in args.runtimes:
+        name, _, quantization = spec.partition(':')
+        quantization = quantization or 'none'
+        start = time.perf_counter()
+        try:
+            runtime = create_runtime(name, quantization, model_path=str(exported_model_path(name, quantization)))
+        except (ImportError, IOError, ValueError) as err:
+            print('{:<15} | skipped: {}'.format(spec, err))
+            continue
+        load_s = time.perf_counter() - start
+
+        scores = _predict_all(runtime, crops)
+        if reference is None:
+            if name != 'keras':
+                print('(no keras reference: comparing against {})'.format(spec))
+            reference = scores
+        top1 = np.mean(np.argmax(scores, axis=1) == np.argmax(reference, axis=1))
+        diff = np.abs(scores - reference)
+        row = '{:<15} | {:>7.2f} | {:>8.1f} | {:>6.1%} | {:>8.4f} | {:>9.5f}'.format(
+            spec, load_s, runtime.model_path.stat().st_size / 1024.0, top1, diff.max(), diff.mean())
+        for batch_size in args.batch_sizes:
+            batch = np.resize(crops, (batch_size,) + crops.shape[1:])
+            row += ' | {:>8.2f} | {:>8.2f}'.format(*_latencies_ms(runtime, batch, args.calls))
+        print(row)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Export the emotion model to TFLite and/or ONNX for the lighter CPU runtimes.
+
+Writes next to the .hdf5 file, with the names ``create_runtime`` looks for
+(``<name>.tflite``, ``<name>.float16.tflite``, ``<name>.onnx``, ...):
+
+- ``--quantize none``:    float32
+- ``--quantize float16``: float16 weights (TFLite only)
+- ``--quantize dynamic``: int8 weights, float activations
+- ``--quantize int8``:    int8 weights and activations, calibrated on face crops
+                          from ``--calibration-images``; inputs/outputs stay float32
+
+Needs TensorFlow, plus ``tf2onnx`` for ONNX and ``onnxruntime`` for quantized
+ONNX models. The API only needs the runtime it serves with.
+
+    python -m src.export_emotion_model [--model trained_models/emotion_models/<name>.hdf5] \\
+        [--formats tflite onnx] [--quantize none float16 dynamic int8] [--calibration-images images]
+"""
+import argparse
+import logging
+from pathlib import Path
+
+import cv2
+import numpy as np
+import tensorflow as tf
+from keras.models import load_model
+
+from .utils.preprocessor import preprocess_input
+from .web.emotion_runtimes import EMOTION_MODEL_PATH, QUANTIZATIONS, exported_model_path
+from .web.face_detection import create_detector
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+CALIBRATION_IMAGES_DIR = BASE_DIR / 'images'
+IMAGE_SUFFIXES = ('.jpg', '.jpeg', '.png', '.webp')
+ONNX_OPSET = 13
+
+
+def calibration_crops(images_dir, input_shape, max_crops=500):
+    """Preprocessed face crops found in ``images_dir``, shaped like model inputs."""
+    detector = create_detector()
+    height, width = input_shape[:2]
+    crops = []
+    for path in sorted(Path(images_dir).iterdir()):
+        if path.suffix.lower() not in IMAGE_SUFFIXES:
+            continue
+        gray_image = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+        if gray_image is None:
+            continue
+        for x, y, w, h in detector.detect(gray_image):
+            gray_face = cv2.resize(gray_image[y:y + h, x:x + w], (width, height))
+            crops.append(np.expand_dims(preprocess_input(gray_face, True), -1).astype(np.float32))
+            if len(crops) >= max_crops:
+                return np.stack(crops)
+    if not crops:
+        raise ValueError('No faces found in {} for int8 calibration.'.format(images_dir))
+    return np.stack(crops)
+
+
+def export_tflite(model, output_path, quantization, crops=None, float_path=None):
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantization != 'none':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantization == 'float16':
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == 'int8':
+        converter.representative_dataset = lambda: ([crop[np.newaxis]] for crop in crops)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    Path(output_path).write_bytes(converter.convert())
+
+
+class _CalibrationReader(object):
+    """``onnxruntime.quantization.CalibrationDataReader`` over the calibration crops."""
+
+    def __init__(self, input_name, crops):
+        self._batches = iter([{input_name: crop[np.newaxis]} for crop in crops])
+
+    def get_next(self):
+        return next(self._batches, None)
+
+
+def export_onnx(model, output_path, quantization, crops=None, float_path=None):
+    """Convert with tf2onnx; quantized variants are made from the float32 export at ``float_path``."""
+    import tf2onnx
+    spec = (tf.TensorSpec((None,) + tuple(model.input_shape[1:]), tf.float32, name='input'),)
+    if quantization == 'none':
+        tf2onnx.convert.from_keras(model, input_signature=spec, opset=ONNX_OPSET, output_path=str(output_path))
+        return
+
+    from onnxruntime import quantization as ort_quantization
+    if not float_path.is_file():
+        tf2onnx.convert.from_keras(model, input_signature=spec, opset=ONNX_OPSET, output_path=str(float_path))
+    if quantization == 'dynamic':
+        ort_quantization.quantize_dynamic(str(float_path), str(output_path),
+                                          weight_type=ort_quantization.QuantType.QInt8)
+    else:
+        ort_quantization.quantize_static(str(float_path), str(output_path), _CalibrationReader('input', crops),
+                                         quant_format=ort_quantization.QuantFormat.QDQ,
+                                         activation_type=ort_quantization.QuantType.QInt8,
+                                         weight_type=ort_quantization.QuantType.QInt8)
+
+
+EXPORTERS = {
+    'tflite': export_tflite,
+    'onnx': export_onnx,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the emotion model to TFLite / ONNX.')
+    parser.add_argument('--model', type=Path, default=EMOTION_MODEL_PATH)
+    parser.add_argument('--formats', nargs='+', choices=sorted(EXPORTERS), default=['tflite', 'onnx'])
+    parser.add_argument('--quantize', nargs='+', choices=QUANTIZATIONS, default=['none'])
+    parser.add_argument('--calibration-images', type=Path, default=CALIBRATION_IMAGES_DIR)
+    args = parser.parse_args()
+
+    model = load_model(str(args.model), compile=False)
+    crops = None
+    if 'int8' in args.quantize:
+        crops = calibration_crops(args.calibration_images, model.input_shape[1:])
+        print('int8 calibration on {} face crops from {}'.format(len(crops), args.calibration_images))
+
+    for runtime in args.formats:
+        for quantization in args.quantize:
+            if runtime == 'onnx' and quantization == 'float16':
+                logging.error('Skipping onnx/float16: ONNX Runtime has no float16 CPU kernels for this model.')
+                continue
+            output_path = exported_model_path(runtime, quantization, args.model)
+            EXPORTERS[runtime](model, output_path, quantization, crops,
+                               float_path=exported_model_path(runtime, 'none', args.model))
+            print('{:<7} {:<8} -> {} ({:.1f} KB)'.format(
+                runtime, quantization, output_path, output_path.stat().st_size / 1024.0))
+
+
+if __name__ == '__main__':
+    main()
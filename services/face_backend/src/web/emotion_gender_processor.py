@@ -1,9 +1,9 @@
 import os
 import logging
+import threading
 from pathlib import Path
 
 import cv2
-from keras.models import load_model
 import numpy as np
 
 try:
@@ -12,26 +12,54 @@ try:
     from ..utils.inference import draw_text
     from ..utils.inference import draw_bounding_box
     from ..utils.inference import apply_offsets
-    from ..utils.inference import load_detection_model
     from ..utils.preprocessor import preprocess_input
+    from .emotion_runtimes import create_runtime
+    from .face_detection import create_detector
+    from .face_tracking import FaceTracker, tracker_store
+    from .result_cache import NearDuplicateIndex, dhash, near_duplicate_hits, near_duplicate_store, result_cache
 except ImportError:
     from utils.datasets import get_labels
     from utils.inference import detect_faces
     from utils.inference import draw_text
     from utils.inference import draw_bounding_box
     from utils.inference import apply_offsets
-    from utils.inference import load_detection_model
     from utils.preprocessor import preprocess_input
+    from web.emotion_runtimes import create_runtime
+    from web.face_detection import create_detector
+    from web.face_tracking import FaceTracker, tracker_store
+    from web.result_cache import NearDuplicateIndex, dhash, near_duplicate_hits, near_duplicate_store, result_cache
 
 BASE_DIR = Path(__file__).resolve().parents[2]
-DETECTION_MODEL_PATH = BASE_DIR / 'trained_models' / 'detection_models' / 'haarcascade_frontalface_default.xml'
-EMOTION_MODEL_PATH = BASE_DIR / 'trained_models' / 'emotion_models' / 'fer2013_mini_XCEPTION.102-0.66.hdf5'
 RESULT_DIR = BASE_DIR / 'result'
 EMOTION_OFFSETS = (0, 0)
 NO_FACE_CONFIDENCE = 0.2
+# Decode unannotated uploads straight to grayscale, with JPEG DCT scaling
+# (1/2, 1/4, 1/8) as long as the longer side stays >= DECODE_MIN_SIDE.
+REDUCED_DECODE = os.getenv('FACE_REDUCED_DECODE', '1').strip().lower() not in ('0', 'false', 'no', 'off')
+DECODE_MIN_SIDE = int(os.getenv('FACE_DECODE_MIN_SIDE', '640'))
+GRAYSCALE_DECODE_MODES = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+# Track faces across the frames of one /api/classify/frames request.
+FRAME_TRACKING = os.getenv('FACE_TRACKING', '1').strip().lower() not in ('0', 'false', 'no', 'off')
+
+# Annotated image encoders: format -> (extension, MIME type, quality flag).
+# PNG is lossless and ignores ``image_quality``.
+IMAGE_ENCODERS = {
+    'png': ('.png', 'image/png', None),
+    'jpeg': ('.jpg', 'image/jpeg', cv2.IMWRITE_JPEG_QUALITY),
+    'webp': ('.webp', 'image/webp', cv2.IMWRITE_WEBP_QUALITY),
+}
+DEFAULT_IMAGE_QUALITY = 85
+# Upper bound for client-provided faces (patches or boxes) in one request.
+MAX_FACES_PER_REQUEST = 256
 
-_face_detection = None
-_emotion_classifier = None
+_resources_lock = threading.Lock()
+_face_detector = None
+_emotion_runtime = None
 _emotion_target_size = None
 _emotion_labels = get_labels('fer2013')
 
@@ -120,16 +148,73 @@ def get_primary_prediction(predictions, belief_confidence=None):
     }
 
 
-def classify_images(image_bytes_list, belief_confidence=None):
-    """Analyze many frames and return one final aggregated confidence."""
+def _tracker_for(session_token, within_request):
+    if session_token:
+        return tracker_store.get(session_token)
+    if within_request and FRAME_TRACKING:
+        return FaceTracker.from_env()
+    return None
+
+
+def _near_duplicates_for(session_token, within_request):
+    if session_token:
+        return near_duplicate_store.get(session_token)
+    if within_request:
+        return NearDuplicateIndex.from_env()
+    return None
+
+
+def classify_images(image_bytes_list, belief_confidence=None, session_token=None):
+    """Analyze many frames and return one final aggregated confidence.
+
+    Faces are detected frame by frame, then the crops from every frame are
+    classified together in a single model call. After the first detection,
+    later frames are searched around the previous faces (see ``FaceTracker``).
+    Frames already seen byte for byte reuse their cached result, and face
+    crops that are near-duplicates of earlier ones reuse their scores (see
+    ``result_cache``). With ``session_token`` the tracker and the
+    near-duplicate index carry over to the session's next request.
+    """
+    _load_resources()
+    tracker = _tracker_for(session_token, within_request=True)
+
+    frames = []
+    all_crops = []
+    detected_in_request = {}
+    for image_bytes in image_bytes_list:
+        key = result_cache.key(image_bytes)
+        if key in detected_in_request:
+            frames.append((key, None, detected_in_request[key]))
+            continue
+        cached = result_cache.get(key)
+        if cached is not None:
+            frames.append((key, cached, None))
+            continue
+        gray_image, factor = _decode_gray(image_bytes)
+        faces, crops = _extract_faces(gray_image, tracker, factor)
+        detected_in_request[key] = (_scale_boxes(faces, factor), len(all_crops))
+        frames.append((key, None, detected_in_request[key]))
+        all_crops.extend(crops)
+
+    emotion_predictions = _predict_emotions_reusing(
+        all_crops, _near_duplicates_for(session_token, within_request=True))
+
     frame_predictions = []
-    for frame_index, image_bytes in enumerate(image_bytes_list):
-        result = classify_image(image_bytes)
-        primary = get_primary_prediction(result['predictions'],
+    for frame_index, (key, cached, detected) in enumerate(frames):
+        if cached is None:
+            faces, offset = detected
+            cached = (faces, emotion_predictions[offset:offset + len(faces)].copy())
+            result_cache.put(key, cached)
+        faces, frame_emotions = cached
+        predictions = [
+            _build_prediction(face_coordinates, emotion_prediction)
+            for face_coordinates, emotion_prediction in zip(faces, frame_emotions)
+        ]
+        primary = get_primary_prediction(predictions,
                                          belief_confidence=belief_confidence)
         primary['frame_index'] = frame_index
-        primary['faces_detected'] = result['faces_detected']
-        if result['faces_detected'] == 0 and belief_confidence is None:
+        primary['faces_detected'] = len(predictions)
+        if not predictions and belief_confidence is None:
             primary['confidence'] = NO_FACE_CONFIDENCE
         frame_predictions.append(primary)
 
@@ -176,51 +261,98 @@ def classify_images(image_bytes_list, belief_confidence=None):
 
 
 def _load_resources():
-    global _face_detection, _emotion_classifier, _emotion_target_size
-    if _face_detection is None:
-        _face_detection = load_detection_model(str(DETECTION_MODEL_PATH))
-    if _emotion_classifier is None:
-        _emotion_classifier = load_model(str(EMOTION_MODEL_PATH), compile=False)
-        _emotion_target_size = _emotion_classifier.input_shape[1:3]
+    global _face_detector, _emotion_runtime, _emotion_target_size
+    if _emotion_runtime is not None:
+        return
+    with _resources_lock:
+        if _emotion_runtime is None:
+            _face_detector = create_detector()
+            runtime = create_runtime()
+            _emotion_target_size = runtime.input_shape[:2]
+            _emotion_runtime = runtime
 
 
 def _detect_faces_robust(gray_image):
-    gray_equalized = cv2.equalizeHist(gray_image)
-    detector_settings = [(1.3, 5), (1.2, 5), (1.1, 4), (1.05, 3)]
-    for scale_factor, min_neighbors in detector_settings:
-        faces = _face_detection.detectMultiScale(gray_equalized, scale_factor, min_neighbors)
-        if len(faces) > 0:
-            return faces
-
-    upscaled = cv2.resize(gray_equalized, None, fx=2.0, fy=2.0,
-                          interpolation=cv2.INTER_CUBIC)
-    for scale_factor, min_neighbors in detector_settings:
-        upscaled_faces = _face_detection.detectMultiScale(upscaled,
-                                                           scale_factor,
-                                                           min_neighbors)
-        if len(upscaled_faces) > 0:
-            return np.asarray([
-                [int(x / 2), int(y / 2), int(w / 2), int(h / 2)]
-                for (x, y, w, h) in upscaled_faces
-            ])
-    return []
-
-
-def classify_image(image_bytes):
-    _load_resources()
+    return _face_detector.detect(gray_image)
+
 
+def _decode_image(image_bytes):
     image_array = np.frombuffer(image_bytes, np.uint8)
     bgr_image = cv2.imdecode(image_array, cv2.IMREAD_COLOR)
     if bgr_image is None:
         raise ValueError('Invalid image payload.')
+    return bgr_image
+
+
+def _jpeg_size(image_bytes):
+    """``(width, height)`` from the JPEG frame header, or None for other formats."""
+    if image_bytes[:2] != b'\xff\xd8':
+        return None
+    index = 2
+    length = len(image_bytes)
+    while index + 9 < length:
+        if image_bytes[index] != 0xFF:
+            return None
+        marker = image_bytes[index + 1]
+        if marker == 0xFF:
+            index += 1
+            continue
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            index += 2
+            continue
+        # SOF0-SOF15, except DHT (C4), JPG (C8) and DAC (CC).
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height = int.from_bytes(image_bytes[index + 5:index + 7], 'big')
+            width = int.from_bytes(image_bytes[index + 7:index + 9], 'big')
+            return width, height
+        index += 2 + int.from_bytes(image_bytes[index + 2:index + 4], 'big')
+    return None
+
+
+def _decode_gray(image_bytes):
+    """Decode straight to grayscale; returns ``(gray_image, factor)``.
+
+    Large JPEGs are decoded at 1/``factor`` of their size by libjpeg, so
+    coordinates in ``gray_image`` are multiplied by ``factor`` to get back to
+    the uploaded frame (see ``_scale_boxes``).
+    """
+    factor = 1
+    size = _jpeg_size(image_bytes) if REDUCED_DECODE else None
+    if size is not None:
+        for candidate in (8, 4, 2):
+            if max(size) // candidate >= DECODE_MIN_SIDE:
+                factor = candidate
+                break
+    gray_image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), GRAYSCALE_DECODE_MODES[factor])
+    if gray_image is None:
+        raise ValueError('Invalid image payload.')
+    return gray_image, factor
+
+
+def _scale_boxes(faces, factor):
+    if factor == 1:
+        return faces
+    return [[int(v) * factor for v in face_coordinates] for face_coordinates in faces]
+
+
+def _extract_faces(gray_image, tracker=None, factor=1):
+    """Detect faces; return their coordinates and preprocessed model-size crops.
 
-    rgb_image = cv2.cvtColor(bgr_image, cv2.COLOR_BGR2RGB)
-    gray_image = cv2.cvtColor(bgr_image, cv2.COLOR_BGR2GRAY)
+    ``factor`` is how much ``gray_image`` was reduced on decode; the tracker
+    needs it to keep its boxes in upload coordinates.
+    """
+    if tracker is not None:
+        detected = tracker.detect(_face_detector, gray_image, scale=factor)
+    else:
+        detected = _detect_faces_robust(gray_image)
+    return _crop_faces(gray_image, detected)
 
-    faces = _detect_faces_robust(gray_image)
-    predictions = []
 
-    for face_coordinates in faces:
+def _crop_faces(gray_image, face_boxes):
+    """Cut boxes out of a grayscale frame; return the usable boxes and their model-size crops."""
+    faces = []
+    crops = []
+    for face_coordinates in face_boxes:
         x1, x2, y1, y2 = apply_offsets(face_coordinates, EMOTION_OFFSETS)
         gray_face = gray_image[y1:y2, x1:x2]
 
@@ -229,58 +361,248 @@ def classify_image(image_bytes):
         except Exception:
             continue
 
-        gray_face = preprocess_input(gray_face, True)
-        gray_face = np.expand_dims(gray_face, 0)
-        gray_face = np.expand_dims(gray_face, -1)
-
-        emotion_prediction = _emotion_classifier.predict(gray_face)
-        emotion_probability = float(np.max(emotion_prediction))
-        emotion_label_arg = int(np.argmax(emotion_prediction))
-        emotion_text = _emotion_labels[emotion_label_arg]
-        confidence_level = _get_confidence_level(emotion_probability)
-        profile = _get_emotion_profile(emotion_text)
-
-        if emotion_text == 'angry':
-            color = emotion_probability * np.asarray((255, 0, 0))
-        elif emotion_text == 'sad':
-            color = emotion_probability * np.asarray((0, 0, 255))
-        elif emotion_text == 'happy':
-            color = emotion_probability * np.asarray((255, 255, 0))
-        elif emotion_text == 'surprise':
-            color = emotion_probability * np.asarray((0, 255, 255))
-        else:
-            color = emotion_probability * np.asarray((0, 255, 0))
-        color = color.astype(int).tolist()
+        faces.append(face_coordinates)
+        crops.append(preprocess_input(gray_face, True))
+    return faces, crops
+
+
+def _predict_emotions(crops):
+    """Classify every crop in one model call; returns an (n_faces, n_emotions) array."""
+    if not crops:
+        return np.empty((0, len(_emotion_labels)), dtype=np.float32)
+    return _emotion_runtime.predict(np.expand_dims(np.stack(crops), -1))
+
+
+def _predict_emotions_reusing(crops, near_duplicates):
+    """``_predict_emotions``, reusing scores of crops within dHash distance of ones already classified.
+
+    Crops are matched against ``near_duplicates`` (earlier requests of the
+    session) and against earlier crops of the same batch; only the rest go
+    through the model, and their scores are added to ``near_duplicates``.
+    """
+    if near_duplicates is None or not crops:
+        return _predict_emotions(crops)
+    hashes = [dhash(crop) for crop in crops]
+    emotion_predictions = np.empty((len(crops), len(_emotion_labels)), dtype=np.float32)
+    in_batch = NearDuplicateIndex(max_entries=len(crops), max_distance=near_duplicates.max_distance)
+    to_run = []
+    copies = []
+    for index, face_hash in enumerate(hashes):
+        reused = near_duplicates.lookup(face_hash)
+        if reused is not None:
+            emotion_predictions[index] = reused
+            continue
+        first = in_batch.lookup(face_hash)
+        if first is not None:
+            copies.append((index, first))
+            continue
+        in_batch.add(face_hash, index)
+        to_run.append(index)
+
+    if to_run:
+        emotion_predictions[to_run] = _predict_emotions([crops[index] for index in to_run])
+        for index in to_run:
+            near_duplicates.add(hashes[index], emotion_predictions[index].copy())
+    for index, first in copies:
+        emotion_predictions[index] = emotion_predictions[first]
+    near_duplicate_hits.record(len(crops), len(crops) - len(to_run))
+    return emotion_predictions
+
+
+def _build_prediction(face_coordinates, emotion_prediction):
+    emotion_probability = float(np.max(emotion_prediction))
+    emotion_label_arg = int(np.argmax(emotion_prediction))
+    emotion_text = _emotion_labels[emotion_label_arg]
+    confidence_level = _get_confidence_level(emotion_probability)
+    profile = _get_emotion_profile(emotion_text)
+
+    box = None
+    if face_coordinates is not None:
+        x, y, w, h = [int(v) for v in face_coordinates]
+        box = {'x': x, 'y': y, 'w': w, 'h': h}
+    return {
+        'emotion': emotion_text,
+        'confidence': emotion_probability,
+        'derived_confidence': round(profile['confidence'], 2),
+        'confidence_percent': round(emotion_probability * 100, 2),
+        'confidence_level': confidence_level,
+        'stress_level': profile['stress_level'],
+        'interpretation': profile['interpretation'],
+        'box': box
+    }
 
-        draw_bounding_box(face_coordinates, rgb_image, color)
-        draw_text(face_coordinates, rgb_image, emotion_text, color, 0, -20, 1, 2)
-        draw_text(face_coordinates, rgb_image,
-                  'Conf: {:.0f}% ({})'.format(emotion_probability * 100,
-                                              confidence_level),
-                  color, 0, 20, 0.7, 2)
 
-        x, y, w, h = [int(v) for v in face_coordinates]
-        predictions.append({
-            'emotion': emotion_text,
-            'confidence': emotion_probability,
-            'derived_confidence': round(profile['confidence'], 2),
-            'confidence_percent': round(emotion_probability * 100, 2),
-            'confidence_level': confidence_level,
-            'stress_level': profile['stress_level'],
-            'interpretation': profile['interpretation'],
-            'box': {'x': x, 'y': y, 'w': w, 'h': h}
-        })
+def _annotate(bgr_image, face_coordinates, prediction):
+    emotion_text = prediction['emotion']
+    emotion_probability = prediction['confidence']
 
-    annotated_bgr_image = cv2.cvtColor(rgb_image, cv2.COLOR_RGB2BGR)
-    ok, encoded = cv2.imencode('.png', annotated_bgr_image)
+    if emotion_text == 'angry':
+        color = emotion_probability * np.asarray((255, 0, 0))
+    elif emotion_text == 'sad':
+        color = emotion_probability * np.asarray((0, 0, 255))
+    elif emotion_text == 'happy':
+        color = emotion_probability * np.asarray((255, 255, 0))
+    elif emotion_text == 'surprise':
+        color = emotion_probability * np.asarray((0, 255, 255))
+    else:
+        color = emotion_probability * np.asarray((0, 255, 0))
+    # Colors above are RGB; draw straight onto the BGR frame instead of
+    # converting the whole image to RGB and back.
+    color = color.astype(int).tolist()[::-1]
+
+    draw_bounding_box(face_coordinates, bgr_image, color)
+    draw_text(face_coordinates, bgr_image, emotion_text, color, 0, -20, 1, 2)
+    draw_text(face_coordinates, bgr_image,
+              'Conf: {:.0f}% ({})'.format(emotion_probability * 100,
+                                          prediction['confidence_level']),
+              color, 0, 20, 0.7, 2)
+
+
+def _check_image_format(image_format):
+    if image_format not in IMAGE_ENCODERS:
+        raise ValueError('image_format must be one of: {}.'.format(', '.join(sorted(IMAGE_ENCODERS))))
+
+
+def encode_image(bgr_image, image_format='png', image_quality=None):
+    """Encode a BGR image; returns ``(bytes, mime_type)``."""
+    _check_image_format(image_format)
+    extension, mime_type, quality_flag = IMAGE_ENCODERS[image_format]
+    params = []
+    if quality_flag is not None:
+        quality = DEFAULT_IMAGE_QUALITY if image_quality is None else int(image_quality)
+        if quality < 1 or quality > 100:
+            raise ValueError('image_quality must be in [1,100].')
+        params = [quality_flag, quality]
+
+    ok, encoded = cv2.imencode(extension, bgr_image, params)
     if not ok:
         raise RuntimeError('Failed to encode annotated image.')
+    return encoded.tobytes(), mime_type
 
-    return {
+
+def classify_image(image_bytes, annotate=True, image_format='png', image_quality=None, session_token=None):
+    """Detect and classify every face in one image.
+
+    Boxes and labels are drawn and the image encoded only when ``annotate``
+    is set. Otherwise ``annotated_image_bytes`` is None, the call stops after
+    inference, and the upload is decoded straight to grayscale, reduced for
+    large JPEGs (see ``_decode_gray``). Boxes are always in the coordinates of
+    the uploaded frame. A frame already seen byte for byte reuses its cached
+    faces and scores. With ``session_token`` detection starts around the
+    faces found in the session's previous frame, and faces that look like
+    ones the session sent recently reuse their scores.
+    """
+    _load_resources()
+    if annotate:
+        _check_image_format(image_format)
+        bgr_image = _decode_image(image_bytes)
+
+    key = result_cache.key(image_bytes)
+    cached = result_cache.get(key)
+    if cached is None:
+        if annotate:
+            gray_image, factor = cv2.cvtColor(bgr_image, cv2.COLOR_BGR2GRAY), 1
+        else:
+            gray_image, factor = _decode_gray(image_bytes)
+        faces, crops = _extract_faces(gray_image, _tracker_for(session_token, within_request=False), factor)
+        cached = (_scale_boxes(faces, factor),
+                  _predict_emotions_reusing(crops, _near_duplicates_for(session_token, within_request=False)))
+        result_cache.put(key, cached)
+    faces, emotion_predictions = cached
+    predictions = [
+        _build_prediction(face_coordinates, emotion_prediction)
+        for face_coordinates, emotion_prediction in zip(faces, emotion_predictions)
+    ]
+
+    result = {
         'faces_detected': len(predictions),
         'predictions': predictions,
-        'annotated_image_bytes': encoded.tobytes()
+        'annotated_image_bytes': None,
+        'annotated_image_mime_type': None
     }
+    if not annotate:
+        return result
+
+    for face_coordinates, prediction in zip(faces, predictions):
+        _annotate(bgr_image, face_coordinates, prediction)
+    result['annotated_image_bytes'], result['annotated_image_mime_type'] = encode_image(
+        bgr_image, image_format, image_quality)
+    return result
+
+
+def _is_encoded_image(data):
+    """True if ``data`` starts like a PNG, JPEG, WebP, BMP or GIF file."""
+    return (data.startswith((b'\x89PNG\r\n\x1a\n', b'\xff\xd8\xff', b'BM', b'GIF8')) or
+            (data[:4] == b'RIFF' and data[8:12] == b'WEBP'))
+
+
+def _decode_face_patch(patch_bytes):
+    """One grayscale face patch: raw uint8 pixels at the model input size, or an encoded image.
+
+    Encoded images are recognized by their signature first, so an encoded
+    patch that happens to be exactly ``height * width`` bytes is not read as
+    raw pixels.
+    """
+    height, width = _emotion_target_size
+    if len(patch_bytes) == height * width and not _is_encoded_image(patch_bytes):
+        return np.frombuffer(patch_bytes, np.uint8).reshape(height, width)
+    patch = cv2.imdecode(np.frombuffer(patch_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+    if patch is None:
+        raise ValueError('Face patches must be {0}x{1} raw uint8 grayscale or an encoded image.'.format(
+            width, height))
+    if patch.shape != (height, width):
+        patch = cv2.resize(patch, (width, height))
+    return patch
+
+
+def _clip_box(box, frame_shape):
+    frame_height, frame_width = frame_shape[:2]
+    try:
+        x, y, w, h = [int(round(float(v))) for v in box]
+    except (TypeError, ValueError):
+        raise ValueError('Boxes must be [x, y, w, h] lists of numbers.')
+    x1, y1 = max(0, x), max(0, y)
+    x2, y2 = min(frame_width, x + w), min(frame_height, y + h)
+    if x2 <= x1 or y2 <= y1:
+        raise ValueError('Box {0} does not overlap the image.'.format(list(box)))
+    return [x1, y1, x2 - x1, y2 - y1]
+
+
+def _summarize_faces(predictions, belief_confidence):
+    return {
+        'faces_classified': len(predictions),
+        'predictions': predictions,
+        'final': get_primary_prediction(predictions, belief_confidence=belief_confidence)
+    }
+
+
+def classify_face_patches(patches, belief_confidence=None):
+    """Classify face crops the client already cut out; no decoding of frames, no detection."""
+    _load_resources()
+    if len(patches) > MAX_FACES_PER_REQUEST:
+        raise ValueError('At most {0} faces per request.'.format(MAX_FACES_PER_REQUEST))
+    crops = [preprocess_input(_decode_face_patch(patch), True) for patch in patches]
+    predictions = [
+        _build_prediction(None, emotion_prediction)
+        for emotion_prediction in _predict_emotions(crops)
+    ]
+    return _summarize_faces(predictions, belief_confidence)
+
+
+def classify_face_boxes(image_bytes, boxes, belief_confidence=None):
+    """Classify the faces at client-provided ``[x, y, w, h]`` boxes of one frame, without detection."""
+    _load_resources()
+    if len(boxes) > MAX_FACES_PER_REQUEST:
+        raise ValueError('At most {0} faces per request.'.format(MAX_FACES_PER_REQUEST))
+    gray_image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+    if gray_image is None:
+        raise ValueError('Invalid image payload.')
+    faces, crops = _crop_faces(gray_image, [_clip_box(box, gray_image.shape) for box in boxes])
+    predictions = [
+        _build_prediction(face_coordinates, emotion_prediction)
+        for face_coordinates, emotion_prediction in zip(faces, _predict_emotions(crops))
+    ]
+    return _summarize_faces(predictions, belief_confidence)
 
 
 def process_image(image_bytes):
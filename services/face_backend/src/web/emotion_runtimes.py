@@ -0,0 +1,164 @@
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+EMOTION_MODEL_PATH = BASE_DIR / 'trained_models' / 'emotion_models' / 'fer2013_mini_XCEPTION.102-0.66.hdf5'
+# Post-training quantization variants written by ``src.export_emotion_model``.
+QUANTIZATIONS = ('none', 'float16', 'dynamic', 'int8')
+RUNTIME_SUFFIXES = {'keras': '.hdf5', 'tflite': '.tflite', 'onnx': '.onnx'}
+
+
+def _env_int(name, default):
+    raw_value = os.getenv(name, '').strip()
+    return int(raw_value) if raw_value else default
+
+
+def exported_model_path(runtime, quantization='none', keras_path=EMOTION_MODEL_PATH):
+    """Where the export CLI writes ``keras_path`` for ``runtime``, e.g. ``<name>.float16.tflite``."""
+    if runtime == 'keras':
+        return Path(keras_path)
+    stem = Path(keras_path).with_suffix('')
+    if quantization and quantization != 'none':
+        stem = stem.with_name('{}.{}'.format(stem.name, quantization))
+    return stem.with_name(stem.name + RUNTIME_SUFFIXES[runtime])
+
+
+class KerasRuntime(object):
+    """The .hdf5 model through Keras, via ``BucketedPredictor`` or plain ``model.predict``.
+
+    ``mode`` is ``compiled`` (traced direct calls, see ``compiled_inference``)
+    or ``predict`` (reference / fallback).
+    """
+
+    name = 'keras'
+
+    def __init__(self, model_path=EMOTION_MODEL_PATH, mode='compiled'):
+        from keras.models import load_model
+        self.model_path = Path(model_path)
+        self.model = load_model(str(self.model_path), compile=False)
+        self.input_shape = tuple(self.model.input_shape[1:])
+        self._predictor = None
+        if mode == 'compiled':
+            try:
+                from .compiled_inference import BucketedPredictor
+            except ImportError:
+                from web.compiled_inference import BucketedPredictor
+            self._predictor = BucketedPredictor(self.model)
+
+    def predict(self, batch):
+        if self._predictor is not None:
+            return self._predictor.predict(batch)
+        return self.model.predict(batch, batch_size=len(batch), verbose=0)
+
+
+class TfliteRuntime(object):
+    """A .tflite export through ``tflite_runtime`` (or ``tf.lite`` when only TensorFlow is installed).
+
+    Interpreters are not thread-safe, so each thread gets its own, resized to
+    the batch size of its last call. Quantized inputs/outputs (full int8
+    models) are converted with the tensor's scale and zero point.
+    """
+
+    name = 'tflite'
+
+    def __init__(self, model_path, threads=None):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+        self._interpreter_class = Interpreter
+        self.model_path = Path(model_path)
+        self._model_content = self.model_path.read_bytes()
+        self.threads = threads
+        self._local = threading.local()
+        interpreter = self._interpreter()
+        self.input_shape = tuple(int(v) for v in interpreter.get_input_details()[0]['shape'][1:])
+
+    def _interpreter(self):
+        interpreter = getattr(self._local, 'interpreter', None)
+        if interpreter is None:
+            interpreter = self._interpreter_class(model_content=self._model_content, num_threads=self.threads)
+            interpreter.allocate_tensors()
+            self._local.interpreter = interpreter
+            self._local.batch_size = int(interpreter.get_input_details()[0]['shape'][0])
+        return interpreter
+
+    def predict(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        interpreter = self._interpreter()
+        input_details = interpreter.get_input_details()[0]
+        if self._local.batch_size != len(batch):
+            interpreter.resize_tensor_input(input_details['index'], (len(batch),) + self.input_shape)
+            interpreter.allocate_tensors()
+            self._local.batch_size = len(batch)
+
+        scale, zero_point = input_details['quantization']
+        if input_details['dtype'] != np.float32 and scale:
+            batch = np.round(batch / scale + zero_point).astype(input_details['dtype'])
+        interpreter.set_tensor(input_details['index'], batch)
+        interpreter.invoke()
+
+        output_details = interpreter.get_output_details()[0]
+        output = interpreter.get_tensor(output_details['index'])
+        scale, zero_point = output_details['quantization']
+        if output_details['dtype'] != np.float32 and scale:
+            output = (output.astype(np.float32) - zero_point) * scale
+        return np.array(output, dtype=np.float32)
+
+
+class OnnxRuntime(object):
+    """An .onnx export through ONNX Runtime on the CPU execution provider (sessions are thread-safe)."""
+
+    name = 'onnx'
+
+    def __init__(self, model_path, threads=None):
+        import onnxruntime
+        self.model_path = Path(model_path)
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.session = onnxruntime.InferenceSession(str(self.model_path), sess_options=options,
+                                                    providers=['CPUExecutionProvider'])
+        model_input = self.session.get_inputs()[0]
+        self._input_name = model_input.name
+        self.input_shape = tuple(int(v) for v in model_input.shape[1:])
+
+    def predict(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        return self.session.run(None, {self._input_name: batch})[0]
+
+
+EMOTION_RUNTIMES = {
+    'keras': KerasRuntime,
+    'tflite': TfliteRuntime,
+    'onnx': OnnxRuntime,
+}
+
+
+def create_runtime(name=None, quantization=None, model_path=None, threads=None):
+    """Load the emotion model for the runtime named by ``name`` or ``FACE_EMOTION_RUNTIME`` (default ``keras``).
+
+    The model file is ``model_path``, else ``FACE_EMOTION_MODEL``, else the
+    export of the default model for ``quantization`` /
+    ``FACE_EMOTION_QUANTIZATION`` (see ``exported_model_path``).
+    """
+    name = (name or os.getenv('FACE_EMOTION_RUNTIME', 'keras')).strip().lower()
+    if name not in EMOTION_RUNTIMES:
+        raise ValueError('FACE_EMOTION_RUNTIME must be one of: {}.'.format(', '.join(sorted(EMOTION_RUNTIMES))))
+    quantization = (quantization or os.getenv('FACE_EMOTION_QUANTIZATION', 'none')).strip().lower()
+    if quantization not in QUANTIZATIONS:
+        raise ValueError('FACE_EMOTION_QUANTIZATION must be one of: {}.'.format(', '.join(QUANTIZATIONS)))
+    model_path = model_path or os.getenv('FACE_EMOTION_MODEL', '').strip() or exported_model_path(name, quantization)
+    if not Path(model_path).is_file():
+        raise IOError('Emotion model not found: {}. Export it with "python -m src.export_emotion_model".'.format(
+            model_path))
+    threads = threads or _env_int('FACE_RUNTIME_THREADS', None)
+    if name == 'keras':
+        return KerasRuntime(model_path, mode=os.getenv('FACE_INFERENCE_MODE', 'compiled').strip().lower())
+    return EMOTION_RUNTIMES[name](model_path, threads=threads)
@@ -0,0 +1,224 @@
+import math
+import os
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+try:
+    from ..utils.inference import load_detection_model
+except ImportError:
+    from utils.inference import load_detection_model
+
+DETECTION_MODELS_DIR = Path(__file__).resolve().parents[2] / 'trained_models' / 'detection_models'
+HAAR_MODEL_PATH = DETECTION_MODELS_DIR / 'haarcascade_frontalface_default.xml'
+# OpenCV's res10 SSD face detector (Caffe), see README for where to get the files.
+DNN_CONFIG_PATH = DETECTION_MODELS_DIR / 'deploy.prototxt'
+DNN_WEIGHTS_PATH = DETECTION_MODELS_DIR / 'res10_300x300_ssd_iter_140000.caffemodel'
+DNN_INPUT_SIZE = 300
+DNN_MEAN = (104.0, 177.0, 123.0)
+
+# (scale_factor, min_neighbors) passes, coarse and strict first.
+DETECTOR_LADDER = ((1.3, 5), (1.2, 5), (1.1, 4), (1.05, 3))
+# Side of the training window of the frontal-face Haar cascade.
+HAAR_WINDOW = 24
+
+
+def _env_float(name, default):
+    raw_value = os.getenv(name, '').strip()
+    return float(raw_value) if raw_value else default
+
+
+class DetectionStrategy(object):
+    """Bounded multi-pass face detection on a grayscale frame.
+
+    The first ladder runs on a copy downscaled so its longer side is at most
+    ``max_side``. Faces are searched between ``min_face_ratio`` and
+    ``max_face_ratio`` of the shorter side. If nothing is found, the ladder
+    repeats at twice that scale, capped at 2x the original frame. That
+    matches the old upscale fallback for small frames.
+
+    The first hit ends the search. Before each further pass, its cost is
+    extrapolated from the previous one. The pass is skipped if it would
+    overrun ``budget_ms`` for the frame. The very first pass always runs.
+    """
+
+    def __init__(self, max_side=640, min_face_ratio=0.05, max_face_ratio=1.0,
+                 budget_ms=150.0, ladder=DETECTOR_LADDER):
+        self.max_side = int(max_side)
+        self.min_face_ratio = float(min_face_ratio)
+        self.max_face_ratio = float(max_face_ratio)
+        self.budget_ms = float(budget_ms)
+        self.ladder = tuple(ladder)
+        # detect() runs on inference pool threads; the counters are shared.
+        self._lock = threading.Lock()
+        self.frames = 0
+        self.passes = 0
+        self.budget_stops = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(max_side=_env_float('FACE_DETECT_MAX_SIDE', 640),
+                   min_face_ratio=_env_float('FACE_DETECT_MIN_FACE_RATIO', 0.05),
+                   max_face_ratio=_env_float('FACE_DETECT_MAX_FACE_RATIO', 1.0),
+                   budget_ms=_env_float('FACE_DETECT_BUDGET_MS', 150.0))
+
+    def _scales(self, gray_image):
+        longest = max(gray_image.shape[:2])
+        coarse = min(1.0, self.max_side / float(longest)) if self.max_side > 0 else 1.0
+        return coarse, min(2.0, coarse * 2.0)
+
+    def _size_limits(self, image):
+        shortest = min(image.shape[:2])
+        min_size = max(HAAR_WINDOW, int(shortest * self.min_face_ratio))
+        max_size = max(min_size, int(shortest * self.max_face_ratio))
+        return (min_size, min_size), (max_size, max_size)
+
+    @staticmethod
+    def _pass_work(image, scale_factor, min_size, max_size):
+        # Pixels per pyramid level times number of levels.
+        levels = max(1.0, math.log(max_size[0] / float(min_size[0])) / math.log(scale_factor))
+        return image.shape[0] * image.shape[1] * levels
+
+    def detect(self, detector, gray_image):
+        """Return face boxes ``(x, y, w, h)`` in ``gray_image`` coordinates, or ``[]``."""
+        with self._lock:
+            self.frames += 1
+        start = time.perf_counter()
+        budget = self.budget_ms / 1000.0
+        seconds_per_work = None
+
+        for scale in self._scales(gray_image):
+            if scale == 1.0:
+                scaled = gray_image
+            else:
+                interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_CUBIC
+                scaled = cv2.resize(gray_image, None, fx=scale, fy=scale, interpolation=interpolation)
+            equalized = cv2.equalizeHist(scaled)
+            min_size, max_size = self._size_limits(equalized)
+
+            for scale_factor, min_neighbors in self.ladder:
+                work = self._pass_work(equalized, scale_factor, min_size, max_size)
+                elapsed = time.perf_counter() - start
+                if seconds_per_work is not None and elapsed + seconds_per_work * work > budget:
+                    with self._lock:
+                        self.budget_stops += 1
+                    return []
+
+                pass_start = time.perf_counter()
+                faces = detector.detectMultiScale(equalized, scale_factor, min_neighbors,
+                                                  minSize=min_size, maxSize=max_size)
+                seconds_per_work = (time.perf_counter() - pass_start) / work
+                with self._lock:
+                    self.passes += 1
+                if len(faces) > 0:
+                    if scale == 1.0:
+                        return np.asarray(faces)
+                    return np.asarray([
+                        [int(x / scale), int(y / scale), int(w / scale), int(h / scale)]
+                        for (x, y, w, h) in faces
+                    ])
+        return []
+
+    def metrics(self):
+        with self._lock:
+            return {
+                'frames': self.frames,
+                'passes': self.passes,
+                'budget_stops': self.budget_stops,
+            }
+
+
+class HaarDetector(object):
+    """Haar cascade driven by a ``DetectionStrategy``.
+
+    Cascades keep per-image scratch state, so every thread loads its own.
+    """
+
+    name = 'haar'
+
+    def __init__(self, model_path=HAAR_MODEL_PATH, strategy=None):
+        self.model_path = Path(model_path)
+        if not self.model_path.exists():
+            raise FileNotFoundError('Haar cascade not found: {}'.format(self.model_path))
+        self.strategy = strategy or DetectionStrategy.from_env()
+        self._local = threading.local()
+
+    def cascade(self):
+        cascade = getattr(self._local, 'cascade', None)
+        if cascade is None:
+            cascade = load_detection_model(str(self.model_path))
+            self._local.cascade = cascade
+        return cascade
+
+    def detect(self, gray_image):
+        """Return face boxes ``(x, y, w, h)`` for a grayscale frame."""
+        return self.strategy.detect(self.cascade(), gray_image)
+
+
+class DnnDetector(object):
+    """OpenCV DNN res10 SSD face detector on CPU.
+
+    The network sees the whole frame resized to 300x300, so its cost does
+    not depend on the frame size. Grayscale frames are replicated to three
+    channels. ``cv2.dnn.Net`` is not safe to share, so each thread gets its
+    own copy.
+    """
+
+    name = 'dnn'
+
+    def __init__(self, config_path=DNN_CONFIG_PATH, weights_path=DNN_WEIGHTS_PATH, confidence=0.5):
+        self.config_path = Path(config_path)
+        self.weights_path = Path(weights_path)
+        for path in (self.config_path, self.weights_path):
+            if not path.exists():
+                raise FileNotFoundError('DNN face detector file not found: {}'.format(path))
+        self.confidence = float(confidence)
+        self._local = threading.local()
+
+    def net(self):
+        net = getattr(self._local, 'net', None)
+        if net is None:
+            net = cv2.dnn.readNetFromCaffe(str(self.config_path), str(self.weights_path))
+            net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+            net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+            self._local.net = net
+        return net
+
+    def detect(self, gray_image):
+        """Return face boxes ``(x, y, w, h)`` for a grayscale frame."""
+        height, width = gray_image.shape[:2]
+        resized = cv2.resize(gray_image, (DNN_INPUT_SIZE, DNN_INPUT_SIZE), interpolation=cv2.INTER_AREA)
+        blob = cv2.dnn.blobFromImage(cv2.cvtColor(resized, cv2.COLOR_GRAY2BGR), 1.0,
+                                     (DNN_INPUT_SIZE, DNN_INPUT_SIZE), DNN_MEAN)
+        net = self.net()
+        net.setInput(blob)
+        # Shape (1, 1, N, 7): [image_id, label, confidence, x1, y1, x2, y2], coordinates in [0, 1].
+        detections = net.forward()[0, 0]
+        detections = detections[detections[:, 2] >= self.confidence]
+
+        faces = []
+        for x1, y1, x2, y2 in detections[:, 3:7]:
+            x1 = int(max(0.0, x1) * width)
+            y1 = int(max(0.0, y1) * height)
+            x2 = int(min(1.0, x2) * width)
+            y2 = int(min(1.0, y2) * height)
+            if x2 > x1 and y2 > y1:
+                faces.append([x1, y1, x2 - x1, y2 - y1])
+        return np.asarray(faces) if faces else []
+
+
+DETECTOR_BACKENDS = {
+    'haar': HaarDetector,
+    'dnn': lambda: DnnDetector(confidence=_env_float('FACE_DNN_CONFIDENCE', 0.5)),
+}
+
+
+def create_detector(name=None):
+    """Build the detector named by ``name`` or ``FACE_DETECTOR`` (default ``haar``)."""
+    name = (name or os.getenv('FACE_DETECTOR', 'haar')).strip().lower()
+    if name not in DETECTOR_BACKENDS:
+        raise ValueError('FACE_DETECTOR must be one of: {}.'.format(', '.join(sorted(DETECTOR_BACKENDS))))
+    return DETECTOR_BACKENDS[name]()
@@ -0,0 +1,167 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+def _env_float(name, default):
+    raw_value = os.getenv(name, '').strip()
+    return float(raw_value) if raw_value else default
+
+
+def _overlaps(a, b, threshold=0.3):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = ix * iy
+    return inter > threshold * (aw * ah + bw * bh - inter)
+
+
+class FaceTracker(object):
+    """Re-detect faces near where they were in the previous frame.
+
+    After a successful detection, each previous face gets its own search
+    region on the next frame: the box grown by ``margin`` times its size per
+    side, scaled so the face is about ``face_size`` px wide. Regions that
+    find a face replace the previous boxes. The full frame is searched again
+    in three cases:
+    - any region comes back empty,
+    - more than ``max_faces`` faces are being tracked,
+    - ``refresh_every`` frames have passed (picks up faces that entered
+      elsewhere).
+    ``detector`` is any object with ``detect(gray_image)``. Tracked boxes
+    are kept in upload coordinates, so a session can mix frames decoded at
+    reduced size with full-size ones (see ``detect``).
+    """
+
+    def __init__(self, margin=0.5, face_size=64, max_faces=4, refresh_every=10):
+        self.margin = float(margin)
+        self.face_size = int(face_size)
+        self.max_faces = int(max_faces)
+        self.refresh_every = int(refresh_every)
+        self._boxes = None
+        self._frames_since_full = 0
+        self._lock = threading.Lock()
+        self.roi_hits = 0
+        self.roi_misses = 0
+        self.full_detections = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(margin=_env_float('FACE_TRACK_MARGIN', 0.5),
+                   face_size=_env_float('FACE_TRACK_FACE_SIZE', 64),
+                   max_faces=_env_float('FACE_TRACK_MAX_FACES', 4),
+                   refresh_every=_env_float('FACE_TRACK_REFRESH_EVERY', 10))
+
+    def _detect_near(self, detector, gray_image, box):
+        height, width = gray_image.shape[:2]
+        x, y, w, h = [int(v) for v in box]
+        dx, dy = int(w * self.margin), int(h * self.margin)
+        x1, y1 = max(0, x - dx), max(0, y - dy)
+        x2, y2 = min(width, x + w + dx), min(height, y + h + dy)
+        region = gray_image[y1:y2, x1:x2]
+        scale = min(1.0, self.face_size / float(max(1, w)))
+        if scale < 1.0:
+            region = cv2.resize(region, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return [
+            [x1 + int(fx / scale), y1 + int(fy / scale), int(fw / scale), int(fh / scale)]
+            for (fx, fy, fw, fh) in detector.detect(region)
+        ]
+
+    def _track(self, detector, gray_image, scale):
+        """Faces found around the previous boxes, or None if any of them was lost."""
+        faces = []
+        for box in self._boxes / float(scale):
+            found = self._detect_near(detector, gray_image, box)
+            if not found:
+                return None
+            # Neighbouring regions can overlap and find the same face twice.
+            faces.extend(face for face in found if not any(_overlaps(face, other) for other in faces))
+        return faces
+
+    def detect(self, detector, gray_image, scale=1):
+        """Return face boxes ``(x, y, w, h)`` in ``gray_image`` coordinates, or ``[]``.
+
+        ``gray_image`` is the upload reduced ``scale`` times (the ``factor``
+        of ``_decode_gray``); boxes are multiplied by it before being kept.
+        """
+        with self._lock:
+            if (self._boxes is not None and len(self._boxes) <= self.max_faces and
+                    self._frames_since_full < self.refresh_every):
+                faces = self._track(detector, gray_image, scale)
+                if faces is not None:
+                    self.roi_hits += 1
+                    self._frames_since_full += 1
+                    faces = np.asarray(faces)
+                    self._boxes = faces * scale
+                    return faces
+                self.roi_misses += 1
+
+            self.full_detections += 1
+            faces = detector.detect(gray_image)
+            self._frames_since_full = 0
+            self._boxes = np.asarray(faces) * scale if len(faces) > 0 else None
+            return faces
+
+    def metrics(self):
+        return {
+            'roi_hits': self.roi_hits,
+            'roi_misses': self.roi_misses,
+            'full_detections': self.full_detections,
+        }
+
+
+class SessionStore(object):
+    """Bounded, TTL-evicting map of session token -> per-session state built by ``factory``.
+
+    State lives in the process that created it. With the process executor a
+    session may land on another worker, which then starts from scratch (for
+    a tracker: a full detection).
+    """
+
+    def __init__(self, factory, max_sessions=1024, ttl_seconds=300.0):
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.evicted = 0
+
+    def _evict(self, now):
+        while self._states:
+            token, (last_used, _) = next(iter(self._states.items()))
+            if len(self._states) <= self.max_sessions and now - last_used <= self.ttl_seconds:
+                break
+            del self._states[token]
+            self.evicted += 1
+
+    def get(self, session_token):
+        """Return the session's state, creating it on first use."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._states.pop(session_token, None)
+            state = entry[1] if entry is not None else None
+            if state is None:
+                state = self.factory()
+                self.created += 1
+            self._states[session_token] = (now, state)
+            self._evict(now)
+            return state
+
+    def metrics(self):
+        with self._lock:
+            return {
+                'sessions': len(self._states),
+                'created': self.created,
+                'evicted': self.evicted,
+            }
+
+
+tracker_store = SessionStore(FaceTracker.from_env,
+                             max_sessions=int(_env_float('FACE_TRACKER_MAX_SESSIONS', 1024)),
+                             ttl_seconds=_env_float('FACE_TRACKER_TTL_SECONDS', 300))
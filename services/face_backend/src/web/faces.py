@@ -1,4 +1,5 @@
 import base64
+import json
 import logging
 from typing import List, Optional
 
@@ -7,6 +8,9 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, Response
 
 from . import emotion_gender_processor as eg_processor
+from . import inference_pool as pool_module
+from .face_tracking import tracker_store
+from .result_cache import near_duplicate_hits, result_cache
 
 app = FastAPI(title='face-classification-api')
 
@@ -24,6 +28,25 @@ app.add_middleware(
 )
 
 
+@app.on_event('startup')
+def start_inference_pool():
+    pool_module.inference_pool.start()
+
+
+@app.on_event('shutdown')
+def stop_inference_pool():
+    pool_module.inference_pool.shutdown()
+
+
+async def _run_inference(func, *args, **kwargs):
+    """Run a blocking classification call on the inference pool; 503 when it is saturated."""
+    try:
+        return await pool_module.inference_pool.run(func, *args, **kwargs)
+    except pool_module.PoolSaturated as err:
+        raise HTTPException(status_code=503, detail=str(err),
+                            headers={'Retry-After': str(pool_module.RETRY_AFTER_SECONDS)})
+
+
 def _parse_belief_confidence(raw_value):
     if raw_value is None or raw_value == '':
         return None
@@ -41,27 +64,44 @@ def index():
         'service': 'face-classification-api',
         'status': 'ok',
         'framework': 'fastapi',
-        'endpoints': ['/api/health', '/api/classify', '/api/classify/frames', '/classifyImage', '/docs']
+        'endpoints': ['/api/health', '/api/classify', '/api/classify/frames', '/api/classify/faces',
+                      '/classifyImage', '/docs']
     }
 
 
 @app.get('/api/health')
 def health():
-    return {'status': 'ok'}
+    return {
+        'status': 'ok',
+        'inference': pool_module.inference_pool.metrics(),
+        'tracking': tracker_store.metrics(),
+        'result_cache': {
+            'exact': result_cache.metrics(),
+            'near_duplicates': near_duplicate_hits.metrics()
+        }
+    }
 
 
 @app.post('/api/classify')
 async def classify(
     image: UploadFile = File(...),
     belief_confidence: Optional[str] = Form(None),
+    session_token: Optional[str] = Form(None),
     include_image: bool = Query(False),
     detailed: bool = Query(False),
+    image_format: str = Query('png'),
+    image_quality: Optional[int] = Query(None, ge=1, le=100),
 ):
     try:
         image_bytes = await image.read()
         parsed_belief_confidence = _parse_belief_confidence(belief_confidence)
 
-        result = eg_processor.classify_image(image_bytes)
+        # Annotation and encoding are only paid for when the image is returned.
+        result = await _run_inference(eg_processor.classify_image, image_bytes,
+                                      annotate=include_image,
+                                      image_format=image_format,
+                                      image_quality=image_quality,
+                                      session_token=session_token)
         if detailed:
             response = {
                 'faces_detected': result['faces_detected'],
@@ -74,10 +114,13 @@ async def classify(
         if include_image:
             response['annotated_image_base64'] = base64.b64encode(
                 result['annotated_image_bytes']).decode('utf-8')
+            response['annotated_image_mime_type'] = result['annotated_image_mime_type']
 
         return response
     except ValueError as err:
         raise HTTPException(status_code=400, detail=str(err))
+    except HTTPException:
+        raise
     except Exception as err:
         logging.error('An error has occurred whilst processing the file: "{0}"'.format(err))
         raise HTTPException(status_code=400, detail='We cannot process the file sent in the request.')
@@ -88,6 +131,7 @@ async def classify_frames(
     images: Optional[List[UploadFile]] = File(None),
     image: Optional[List[UploadFile]] = File(None),
     belief_confidence: Optional[str] = Form(None),
+    session_token: Optional[str] = Form(None),
 ):
     try:
         files = images or image or []
@@ -105,8 +149,9 @@ async def classify_frames(
         if not image_payloads:
             raise HTTPException(status_code=400, detail='No valid image payloads provided.')
 
-        return eg_processor.classify_images(image_payloads,
-                                            belief_confidence=parsed_belief_confidence)
+        return await _run_inference(eg_processor.classify_images, image_payloads,
+                                    belief_confidence=parsed_belief_confidence,
+                                    session_token=session_token)
     except ValueError as err:
         raise HTTPException(status_code=400, detail=str(err))
     except HTTPException:
@@ -116,16 +161,61 @@ async def classify_frames(
         raise HTTPException(status_code=400, detail='We cannot process the file sent in the request.')
 
 
+@app.post('/api/classify/faces')
+async def classify_faces(
+    faces: Optional[List[UploadFile]] = File(None),
+    image: Optional[UploadFile] = File(None),
+    boxes: Optional[str] = Form(None),
+    belief_confidence: Optional[str] = Form(None),
+):
+    try:
+        parsed_belief_confidence = _parse_belief_confidence(belief_confidence)
+        if faces:
+            patches = [await uploaded_file.read() for uploaded_file in faces]
+            return await _run_inference(eg_processor.classify_face_patches, patches,
+                                        belief_confidence=parsed_belief_confidence)
+
+        if image is None or not boxes:
+            raise HTTPException(status_code=400,
+                                detail='Send face patches as "faces", or an "image" with "boxes" '
+                                       '(JSON list of [x, y, w, h]).')
+        try:
+            parsed_boxes = json.loads(boxes)
+        except ValueError:
+            raise ValueError('boxes must be a JSON list of [x, y, w, h].')
+        if not isinstance(parsed_boxes, list):
+            raise ValueError('boxes must be a JSON list of [x, y, w, h].')
+        image_bytes = await image.read()
+        return await _run_inference(eg_processor.classify_face_boxes, image_bytes, parsed_boxes,
+                                    belief_confidence=parsed_belief_confidence)
+    except ValueError as err:
+        raise HTTPException(status_code=400, detail=str(err))
+    except HTTPException:
+        raise
+    except Exception as err:
+        logging.error('An error has occurred whilst processing face files: "{0}"'.format(err))
+        raise HTTPException(status_code=400, detail='We cannot process the file sent in the request.')
+
+
 @app.post('/classifyImage')
-async def upload(image: UploadFile = File(...)):
+async def upload(
+    image: UploadFile = File(...),
+    image_format: str = Query('png'),
+    image_quality: Optional[int] = Query(None, ge=1, le=100),
+):
     try:
         image_bytes = await image.read()
-        result = eg_processor.classify_image(image_bytes)
+        result = await _run_inference(eg_processor.classify_image, image_bytes,
+                                      image_format=image_format,
+                                      image_quality=image_quality)
+        extension = eg_processor.IMAGE_ENCODERS[image_format][0]
         return Response(
             content=result['annotated_image_bytes'],
-            media_type='image/png',
-            headers={'Content-Disposition': 'attachment; filename=predicted_image.png'}
+            media_type=result['annotated_image_mime_type'],
+            headers={'Content-Disposition': 'attachment; filename=predicted_image{}'.format(extension)}
         )
+    except HTTPException:
+        raise
     except Exception as err:
         logging.error('An error has occurred whilst processing the file: "{0}"'.format(err))
         raise HTTPException(status_code=400, detail='We cannot process the file sent in the request.')
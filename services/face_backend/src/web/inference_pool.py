@@ -0,0 +1,179 @@
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import cv2
+
+from . import emotion_gender_processor as eg_processor
+
+# "thread": one process, N threads sharing the loaded models;
+# "process": N spawned workers, each loading its own models;
+# "inline": run on the event loop (previous behaviour, for comparison only).
+EXECUTOR_KINDS = ('thread', 'process', 'inline')
+DEFAULT_MAX_WORKERS = 4
+RETRY_AFTER_SECONDS = 1
+
+
+class PoolSaturated(Exception):
+    """Raised when every worker is busy and the wait queue is full."""
+
+
+def _env_int(name, default):
+    raw_value = os.getenv(name, '').strip()
+    return int(raw_value) if raw_value else default
+
+
+def _configure_threads(cv_threads, tf_intra_op_threads, tf_inter_op_threads):
+    """Cap OpenCV and TensorFlow thread pools so workers do not oversubscribe the CPUs."""
+    cv2.setNumThreads(cv_threads)
+    try:
+        import tensorflow as tf
+    except ImportError:
+        # TFLite / ONNX Runtime deployments may not ship TensorFlow at all.
+        return
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(tf_intra_op_threads)
+        tf.config.threading.set_inter_op_parallelism_threads(tf_inter_op_threads)
+    except RuntimeError as err:
+        # RuntimeError: the TF runtime is already initialized in this process.
+        logging.error('Could not configure TensorFlow threads: "{0}"'.format(err))
+
+
+def _init_process_worker(threads_per_worker):
+    _configure_threads(threads_per_worker, threads_per_worker, 1)
+    eg_processor._load_resources()
+
+
+def _warm_up():
+    eg_processor._load_resources()
+    return os.getpid()
+
+
+class InferencePool(object):
+    """Runs blocking classification calls off the event loop with bounded admission.
+
+    At most ``queue_size`` calls are admitted at once (running plus waiting
+    for a worker); further calls raise ``PoolSaturated`` immediately so the
+    endpoint can answer 503 instead of piling up requests. A slot is released
+    when the worker finishes, not when the caller stops waiting, so abandoned
+    requests still count until their work is done.
+    """
+
+    def __init__(self, kind='thread', workers=None, queue_size=None, threads_per_worker=None):
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError('executor must be one of: {}.'.format(', '.join(EXECUTOR_KINDS)))
+        cpu_count = os.cpu_count() or 1
+        self.kind = kind
+        self.workers = 1 if kind == 'inline' else (workers or min(DEFAULT_MAX_WORKERS, cpu_count))
+        self.queue_size = queue_size or self.workers * 4
+        self.threads_per_worker = threads_per_worker or max(1, cpu_count // self.workers)
+
+        self._executor = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(kind=os.getenv('FACE_EXECUTOR', 'thread').strip().lower(),
+                   workers=_env_int('FACE_WORKERS', None),
+                   queue_size=_env_int('FACE_QUEUE_SIZE', None),
+                   threads_per_worker=_env_int('FACE_THREADS_PER_WORKER', None))
+
+    def start(self):
+        """Create the executor and load the models before the first request."""
+        if self.kind == 'inline':
+            eg_processor._load_resources()
+            return
+        if self._executor is not None:
+            return
+        if self.kind == 'thread':
+            # Each request thread runs OpenCV with threads_per_worker threads;
+            # TensorFlow's intra-op pool is shared by all of them.
+            _configure_threads(self.threads_per_worker,
+                               self.threads_per_worker * self.workers,
+                               self.workers)
+            eg_processor._load_resources()
+            self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                thread_name_prefix='face-inference')
+        else:
+            # Spawned, not forked: TensorFlow does not survive fork once its
+            # runtime threads exist.
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context('spawn'),
+                                                 initializer=_init_process_worker,
+                                                 initargs=(self.threads_per_worker,))
+            warm_ups = [self._executor.submit(_warm_up) for _ in range(self.workers)]
+            for future in warm_ups:
+                future.result()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def _acquire(self):
+        with self._lock:
+            if self.in_flight >= self.queue_size:
+                self.rejected += 1
+                raise PoolSaturated('Inference queue is full ({0} in flight).'.format(self.in_flight))
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _release(self, future):
+        self._finish(failed=future.cancelled() or future.exception() is not None)
+
+    def _finish(self, failed):
+        with self._lock:
+            self.in_flight -= 1
+            if failed:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    async def run(self, func, *args, **kwargs):
+        """Run ``func(*args, **kwargs)`` on a worker; ``func`` must be picklable in process mode."""
+        if self.kind == 'inline':
+            self._acquire()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                self._finish(failed=True)
+                raise
+            self._finish(failed=False)
+            return result
+
+        if self._executor is None:
+            self.start()
+        self._acquire()
+        try:
+            future = self._executor.submit(functools.partial(func, *args, **kwargs))
+        except Exception:
+            self._finish(failed=True)
+            raise
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def metrics(self):
+        with self._lock:
+            return {
+                'executor': self.kind,
+                'workers': self.workers,
+                'threads_per_worker': self.threads_per_worker,
+                'queue_size': self.queue_size,
+                'in_flight': self.in_flight,
+                'peak_in_flight': self.peak_in_flight,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+            }
+
+
+inference_pool = InferencePool.from_env()
@@ -0,0 +1,174 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+try:
+    from .face_tracking import SessionStore
+except ImportError:
+    from web.face_tracking import SessionStore
+
+# popcount for every byte value, for Hamming distances between 64-bit hashes.
+_POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+
+def _env_float(name, default):
+    raw_value = os.getenv(name, '').strip()
+    return float(raw_value) if raw_value else default
+
+
+def dhash(gray_face):
+    """64-bit difference hash of a face crop: brighter-than-right-neighbour bits on a 9x8 thumbnail."""
+    thumbnail = cv2.resize(np.asarray(gray_face, dtype=np.float32), (9, 8), interpolation=cv2.INTER_AREA)
+    bits = thumbnail[:, 1:] > thumbnail[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+class ResultCache(object):
+    """Exact cache of per-frame detection + classification results, keyed by upload bytes.
+
+    A retried upload with the same bytes reuses the stored faces and emotion
+    scores. Entries expire after ``ttl_seconds``; the least recently used
+    entry is dropped beyond ``max_entries``.
+    """
+
+    def __init__(self, max_entries=1024, ttl_seconds=60.0):
+        self.max_entries = int(max_entries)
+        self.ttl_seconds = float(ttl_seconds)
+        self.enabled = self.max_entries > 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+
+    @staticmethod
+    def key(image_bytes):
+        return hashlib.blake2b(image_bytes, digest_size=16).digest()
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evicted += 1
+
+    def metrics(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / float(lookups), 4) if lookups else 0.0,
+                'expired': self.expired,
+                'evicted': self.evicted,
+            }
+
+
+class NearDuplicateIndex(object):
+    """Emotion scores of recent face crops, looked up by dHash within ``max_distance`` bits.
+
+    Entries older than ``ttl_seconds`` are ignored, so a face that holds
+    still for a long time is still re-classified now and then. A negative
+    ``max_distance`` disables the index.
+    """
+
+    def __init__(self, max_entries=64, max_distance=3, ttl_seconds=10.0):
+        self.max_entries = int(max_entries)
+        self.max_distance = int(max_distance)
+        self.ttl_seconds = float(ttl_seconds)
+        self._hashes = []
+        self._added = []
+        self._values = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(max_entries=_env_float('FACE_NEAR_DUP_MAX_ENTRIES', 64),
+                   max_distance=_env_float('FACE_NEAR_DUP_DISTANCE', 3),
+                   ttl_seconds=_env_float('FACE_NEAR_DUP_TTL_SECONDS', 10))
+
+    def lookup(self, face_hash):
+        """The value stored for the closest hash within ``max_distance``, or None."""
+        if self.max_distance < 0:
+            return None
+        with self._lock:
+            if not self._hashes:
+                return None
+            stored = np.asarray(self._hashes, dtype=np.uint64)
+            distances = _POPCOUNT[(stored ^ np.uint64(face_hash)).view(np.uint8)].reshape(-1, 8).sum(axis=1)
+            expired = np.asarray(self._added) < time.monotonic() - self.ttl_seconds
+            distances[expired] = 255
+            best = int(np.argmin(distances))
+            if distances[best] > self.max_distance:
+                return None
+            return self._values[best]
+
+    def add(self, face_hash, value):
+        if self.max_distance < 0:
+            return
+        with self._lock:
+            self._hashes.append(face_hash)
+            self._added.append(time.monotonic())
+            self._values.append(value)
+            if len(self._hashes) > self.max_entries:
+                del self._hashes[0]
+                del self._added[0]
+                del self._values[0]
+
+
+class HitCounter(object):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+
+    def record(self, lookups, hits):
+        with self._lock:
+            self.lookups += lookups
+            self.hits += hits
+
+    def metrics(self):
+        with self._lock:
+            return {
+                'lookups': self.lookups,
+                'hits': self.hits,
+                'hit_rate': round(self.hits / float(self.lookups), 4) if self.lookups else 0.0,
+            }
+
+
+result_cache = ResultCache(max_entries=_env_float('FACE_RESULT_CACHE_SIZE', 1024),
+                           ttl_seconds=_env_float('FACE_RESULT_CACHE_TTL_SECONDS', 60))
+near_duplicate_store = SessionStore(NearDuplicateIndex.from_env,
+                                    max_sessions=int(_env_float('FACE_TRACKER_MAX_SESSIONS', 1024)),
+                                    ttl_seconds=_env_float('FACE_TRACKER_TTL_SECONDS', 300))
+near_duplicate_hits = HitCounter()
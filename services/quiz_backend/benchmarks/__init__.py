@@ -0,0 +1 @@
+"""Microbenchmarks for the quiz backend (run as modules, not collected as tests)."""
@@ -0,0 +1,98 @@
+"""
+Microbenchmark: legacy dict sessions vs indexed QuizSession.
+
+Run from the repository root:
+
+    python -m services.quiz_backend.benchmarks.session_model
+"""
+import random
+import timeit
+from uuid import uuid4
+
+from ..core.session import QuizSession
+from ..main import analyze_behavioral_data, calculate_dunning_kruger
+
+QUIZ_SIZES = (10, 100, 1000)
+
+
+def _make_questions(n: int) -> list[dict]:
+    return [
+        {
+            "id": str(uuid4()),
+            "question": f"Question {i}",
+            "options": ["A", "B", "C", "D"],
+            "correct_answer": i % 4,
+            "explanation": "",
+        }
+        for i in range(n)
+    ]
+
+
+def _make_behavior(questions: list[dict], rng: random.Random) -> dict:
+    return {
+        q["id"]: {
+            "blink_rate": rng.uniform(5, 40),
+            "head_movement_score": rng.uniform(0, 8),
+            "gaze_stability": rng.uniform(0.3, 1.0),
+            "answer_changes": rng.randint(0, 3),
+        }
+        for q in questions
+    }
+
+
+def _submit_all_legacy(questions: list[dict], answers: list[int]) -> None:
+    session = {"questions": questions, "score": 0, "answered": [], "user_answers_data": {}}
+    for q, answer in zip(questions, answers):
+        qid = q["id"]
+        question = next((item for item in session["questions"] if item["id"] == qid), None)
+        if qid in session["answered"]:
+            continue
+        if answer == question["correct_answer"]:
+            session["score"] += 1
+        session["answered"].append(qid)
+        session["user_answers_data"][qid] = answer
+
+
+def _submit_all_indexed(questions: list[dict], answers: list[int]) -> None:
+    session = QuizSession(questions=questions)
+    for q, answer in zip(questions, answers):
+        qid = q["id"]
+        question = session.get_question(qid)
+        if session.is_answered(qid):
+            continue
+        if answer == question["correct_answer"]:
+            session.score += 1
+        session.mark_answered(qid)
+        session.user_answers_data[qid] = answer
+
+
+def _best_of(stmt, number: int) -> float:
+    """Best per-call time in microseconds."""
+    return min(timeit.repeat(stmt, number=number, repeat=5)) / number * 1e6
+
+
+def main() -> None:
+    rng = random.Random(42)
+    print(f"{'questions':>9} | {'submit legacy':>14} | {'submit indexed':>14} | "
+          f"{'dunning-kruger':>14} | {'behavioral':>14} | {'to/from dict':>14}")
+    for n in QUIZ_SIZES:
+        questions = _make_questions(n)
+        answers = [rng.randint(0, 3) for _ in questions]
+        behavior = _make_behavior(questions, rng)
+        answers_data = {q["id"]: a for q, a in zip(questions, answers)}
+        session = QuizSession(questions=questions, user_answers_data=answers_data,
+                              answered=list(answers_data), behavioral_data=behavior)
+        number = max(1, 2000 // n)
+
+        legacy = _best_of(lambda: _submit_all_legacy(questions, answers), number)
+        indexed = _best_of(lambda: _submit_all_indexed(questions, answers), number)
+        dk = _best_of(lambda: calculate_dunning_kruger(55.0, 60.0, answers_data, questions, behavior), number)
+        behavioral = _best_of(lambda: analyze_behavioral_data(behavior, 60.0, answers_data, questions), number)
+        roundtrip = _best_of(lambda: QuizSession.from_dict(session.to_dict()), number)
+
+        print(f"{n:>9} | {legacy:>11.1f} us | {indexed:>11.1f} us | "
+              f"{dk:>11.1f} us | {behavioral:>11.1f} us | {roundtrip:>11.1f} us")
+
+
+if __name__ == "__main__":
+    main()
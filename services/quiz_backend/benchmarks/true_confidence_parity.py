@@ -0,0 +1,185 @@
+"""
+Parity check and latency comparison: embedded vs remote SIMCO Logic.
+
+Starts the confidence backend on a free local port (or uses ``--remote-url``),
+sends the same random payloads to it and to the in-process model, and exits
+non-zero if:
+
+- any single or batch prediction differs by more than the tolerance
+- an out-of-range payload is rejected by one path but not the other
+
+It also prints latency percentiles for both paths. Run from the repository
+root; it needs no running services:
+
+    python -m services.quiz_backend.benchmarks.true_confidence_parity
+    python -m services.quiz_backend.benchmarks.true_confidence_parity --remote-url http://localhost:8010
+"""
+import argparse
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+import requests
+
+from ..core import embedded_confidence
+
+CONFIDENCE_BACKEND_DIR = Path(__file__).resolve().parents[2] / "confidence_backend"
+STARTUP_TIMEOUT = 60
+
+# Inputs the service rejects with a 422; embedded mode must reject them too.
+INVALID_PAYLOADS = [
+    {"self_confidence": 1.5, "face_confidence_per_question": [0.5]},
+    {"self_confidence": -0.1, "face_confidence_per_question": []},
+    {"self_confidence": 0.5, "face_confidence_per_question": [0.2, 1.2]},
+    {"self_confidence": 0.5, "face_confidence_per_question": [-0.01]},
+    {"self_confidence": 0.5, "face_confidence_per_question": [60.0, 70.0]},
+    {"face_confidence_per_question": [0.5]},
+]
+
+
+def _random_payload(rng: random.Random) -> dict:
+    n_questions = rng.choice([0, 1, 5, 10, 20, 30])
+    return {
+        "self_confidence": round(rng.random(), 2),
+        "face_confidence_per_question": [round(rng.random(), 2) for _ in range(n_questions)],
+    }
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _summary(name: str, samples_ms: list[float]) -> str:
+    return (f"{name:>9}: p50={_percentile(samples_ms, 50):8.3f} ms  "
+            f"p99={_percentile(samples_ms, 99):8.3f} ms  mean={statistics.mean(samples_ms):8.3f} ms")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def _remote_service(remote_url: Optional[str]) -> Iterator[str]:
+    """Yield the base URL of a confidence backend, starting one unless ``remote_url`` is given."""
+    if remote_url:
+        yield remote_url.rstrip("/")
+        return
+
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    # Compare the model itself, not the service's quantized-input prediction cache.
+    env = {**os.environ, "SIMCO_PREDICTION_CACHE": "0"}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=CONFIDENCE_BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+    try:
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"confidence backend exited early:\n{process.stderr.read().decode()}")
+            try:
+                if requests.get(f"{base_url}/health", timeout=1).ok:
+                    break
+            except requests.RequestException:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"confidence backend did not start within {STARTUP_TIMEOUT} s")
+            time.sleep(0.2)
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def _embedded_rejects(payload: dict) -> bool:
+    try:
+        embedded_confidence.predict(payload)
+    except embedded_confidence.InvalidPayload:
+        return True
+    return False
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--remote-url", default=None,
+                        help="Compare against a running service instead of starting one")
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--tolerance", type=float, default=1e-4)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    payloads = [_random_payload(rng) for _ in range(args.samples)]
+    failures = []
+
+    start = time.perf_counter()
+    embedded_confidence.warm_up()
+    print(f"embedded model load: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    with _remote_service(args.remote_url) as base_url, requests.Session() as http:
+        url = f"{base_url}/analyze/true-confidence"
+        # Warm the remote too so a cold host does not skew the comparison.
+        http.post(url, json=payloads[0], timeout=60).raise_for_status()
+
+        embedded_ms, remote_ms = [], []
+        for payload in payloads:
+            start = time.perf_counter()
+            local = embedded_confidence.predict(payload)
+            embedded_ms.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            response = http.post(url, json=payload, timeout=10)
+            remote_ms.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+            remote = response.json()
+
+            if abs(local["true_confidence_normalized"] - remote["true_confidence_normalized"]) > args.tolerance:
+                failures.append(f"single: embedded={local['true_confidence_normalized']} "
+                                f"remote={remote['true_confidence_normalized']} payload={payload}")
+
+        response = http.post(f"{url}/batch", json={"sessions": payloads}, timeout=60)
+        response.raise_for_status()
+        for payload, local, remote in zip(payloads, embedded_confidence.predict_batch(payloads),
+                                          response.json()["results"]):
+            if abs(local["true_confidence_normalized"] - remote["true_confidence_normalized"]) > args.tolerance:
+                failures.append(f"batch: embedded={local['true_confidence_normalized']} "
+                                f"remote={remote['true_confidence_normalized']} payload={payload}")
+
+        for payload in INVALID_PAYLOADS:
+            remote_rejects = http.post(url, json=payload, timeout=10).status_code == 422
+            if remote_rejects != _embedded_rejects(payload):
+                failures.append(f"validation: remote rejects={remote_rejects} "
+                                f"embedded rejects={not remote_rejects} payload={payload}")
+
+    print(_summary("embedded", embedded_ms))
+    print(_summary("remote", remote_ms))
+    if failures:
+        print(f"PARITY FAILED: {len(failures)} mismatches")
+        for failure in failures[:10]:
+            print(f"  {failure}")
+        return 1
+    print(f"parity OK: {len(payloads)} single and batch predictions within {args.tolerance}, "
+          f"{len(INVALID_PAYLOADS)} invalid payloads rejected by both")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
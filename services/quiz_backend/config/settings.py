@@ -60,9 +60,19 @@ class Settings(BaseSettings):
 
     # SIMCO Logic (neural confidence service)
     SIMCO_LOGIC_BASE_URL: str = "https://confidence-backend-v68b.onrender.com"
+    # "remote" calls SIMCO_LOGIC_BASE_URL; "embedded" runs the model in-process
+    # (needs numpy and services/confidence_backend importable from the repo root).
+    SIMCO_LOGIC_MODE: str = "remote"
+    # Remote call budget (seconds) and circuit breaker tuning
+    SIMCO_LOGIC_TIMEOUT: float = 0.8
+    SIMCO_LOGIC_BREAKER_FAILURES: int = 5
+    SIMCO_LOGIC_BREAKER_RESET_SECONDS: float = 30.0
 
     # Session Management
     SESSION_TIMEOUT: int = 3600  # 1 hour in seconds
+
+    # Cached /quiz-results payloads (one entry per session)
+    RESULTS_CACHE_MAX_ENTRIES: int = 1024
     
     # Quiz Settings
     DEFAULT_QUIZ_LENGTH: int = 10
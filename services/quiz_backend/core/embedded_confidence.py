@@ -0,0 +1,115 @@
+"""
+In-process SIMCO Logic engine.
+
+Runs the confidence backend's NumPy model inside the quiz backend instead of
+calling it over HTTP. The model module is imported lazily so the default
+remote mode does not need NumPy installed.
+
+Inputs are checked like the service's request models: anything the HTTP API
+would reject with a 422 raises ``InvalidPayload`` here instead of being
+clamped by the model.
+"""
+import importlib
+import math
+import threading
+from typing import Any
+
+_MODEL_MODULE = "services.confidence_backend.app.ml.confidence_model"
+_STREAMING_MODULE = "services.confidence_backend.app.ml.streaming"
+
+_module = None
+_streaming = None
+_lock = threading.Lock()
+
+
+class InvalidPayload(ValueError):
+    """Input that ``POST /analyze/true-confidence*`` would reject with a 422."""
+
+
+def _unit_interval(name: str, value: Any) -> float:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise InvalidPayload(f"{name} must be a number") from None
+    if math.isnan(number) or not 0.0 <= number <= 1.0:
+        raise InvalidPayload(f"{name} must be normalized in [0,1]")
+    return number
+
+
+def _checked_session(payload: dict[str, Any], name: str = "") -> tuple[float, list[float]]:
+    if payload.get("self_confidence") is None:
+        raise InvalidPayload(f"{name}self_confidence is required")
+    self_confidence = _unit_interval(f"{name}self_confidence", payload["self_confidence"])
+    faces = payload.get("face_confidence_per_question") or []
+    if not isinstance(faces, (list, tuple)):
+        raise InvalidPayload(f"{name}face_confidence_per_question must be a list")
+    return self_confidence, [
+        _unit_interval(f"{name}face_confidence_per_question", value) for value in faces
+    ]
+
+
+def _load_module():
+    global _module
+    if _module is None:
+        with _lock:
+            if _module is None:
+                _module = importlib.import_module(_MODEL_MODULE)
+    return _module
+
+
+def _load_streaming():
+    global _streaming
+    if _streaming is None:
+        with _lock:
+            if _streaming is None:
+                _streaming = importlib.import_module(_STREAMING_MODULE)
+    return _streaming
+
+
+def validate(payload: dict[str, Any]) -> None:
+    """Raise ``InvalidPayload`` if ``POST /analyze/true-confidence`` would reject ``payload``.
+
+    Needs no model, so it also screens input bound for the remote service.
+    """
+    _checked_session(payload)
+
+
+def warm_up() -> None:
+    """Import and train/load the model so the first request does not pay for it."""
+    module = _load_module()
+    module._get_model()
+
+
+def predict(payload: dict[str, Any]) -> dict[str, Any]:
+    """Same input/output contract as ``POST /analyze/true-confidence``."""
+    self_confidence, faces = _checked_session(payload)
+    module = _load_module()
+    return module.predict_true_confidence(
+        self_confidence=self_confidence,
+        face_confidence_per_question=faces,
+    )
+
+
+def predict_batch(sessions: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Same contract as ``POST /analyze/true-confidence/batch`` (the ``results`` list)."""
+    checked = [_checked_session(item, f"sessions[{index}].") for index, item in enumerate(sessions)]
+    module = _load_module()
+    return module.predict_true_confidence_batch(
+        [self_confidence for self_confidence, _ in checked],
+        [faces for _, faces in checked],
+    )
+
+
+def update_stream(session_id: str, payload: dict[str, Any]) -> dict[str, Any]:
+    """Same contract as ``POST /analyze/true-confidence/stream/{session_id}``."""
+    values = {
+        name: None if payload.get(name) is None else _unit_interval(name, payload[name])
+        for name in ("self_confidence", "face_confidence")
+    }
+    return _load_streaming().stream_store.update(session_id, **values)
+
+
+def replace_stream(session_id: str, payload: dict[str, Any]) -> dict[str, Any]:
+    """Same contract as ``PUT /analyze/true-confidence/stream/{session_id}``."""
+    self_confidence, faces = _checked_session(payload)
+    return _load_streaming().stream_store.replace(session_id, self_confidence, faces)
@@ -0,0 +1,280 @@
+"""
+Storage for offline re-scoring runs (see ``services.quiz_backend.rescore``).
+
+Sessions are streamed out of ``quiz_sessions`` in ``session_id`` order and
+results are written to ``quiz_session_rescores``, keyed by run. Each chunk's
+results and the run checkpoint in ``quiz_rescore_runs`` are committed in one
+transaction, so an interrupted run resumes after the last committed session.
+
+Unlike ``session_store`` this module does not swallow errors: a batch job
+should stop loudly rather than silently skip rows.
+"""
+import json
+import sqlite3
+from typing import Any, Iterator, Optional
+
+from .session_store import _sqlite_path, _use_postgres, psycopg2
+from ..config import settings
+
+
+_PG_TABLES_SQL = """
+CREATE TABLE IF NOT EXISTS quiz_rescore_runs (
+    run_id TEXT PRIMARY KEY,
+    simco_mode TEXT,
+    last_session_id TEXT,
+    rows_done INTEGER NOT NULL DEFAULT 0,
+    started_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    finished_at TIMESTAMPTZ
+);
+CREATE TABLE IF NOT EXISTS quiz_session_rescores (
+    run_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    model_version TEXT,
+    percentage DOUBLE PRECISION,
+    self_confidence DOUBLE PRECISION,
+    true_confidence DOUBLE PRECISION,
+    true_confidence_normalized DOUBLE PRECISION,
+    dk_zone TEXT,
+    dk_index DOUBLE PRECISION,
+    result_data JSONB NOT NULL,
+    rescored_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (run_id, session_id)
+);
+"""
+
+_SQLITE_TABLES_SQL = """
+CREATE TABLE IF NOT EXISTS quiz_rescore_runs (
+    run_id TEXT PRIMARY KEY,
+    simco_mode TEXT,
+    last_session_id TEXT,
+    rows_done INTEGER NOT NULL DEFAULT 0,
+    started_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    finished_at TEXT
+);
+CREATE TABLE IF NOT EXISTS quiz_session_rescores (
+    run_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    model_version TEXT,
+    percentage REAL,
+    self_confidence REAL,
+    true_confidence REAL,
+    true_confidence_normalized REAL,
+    dk_zone TEXT,
+    dk_index REAL,
+    result_data TEXT NOT NULL,
+    rescored_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (run_id, session_id)
+);
+"""
+
+_RESULT_COLUMNS = (
+    "model_version",
+    "percentage",
+    "self_confidence",
+    "true_confidence",
+    "true_confidence_normalized",
+    "dk_zone",
+    "dk_index",
+)
+
+
+def _result_params(run_id: str, row: dict[str, Any]) -> tuple:
+    return (
+        run_id,
+        row["session_id"],
+        *(row.get(column) for column in _RESULT_COLUMNS),
+        json.dumps(row, ensure_ascii=False),
+    )
+
+
+def _run_dict(row) -> Optional[dict[str, Any]]:
+    if row is None:
+        return None
+    run_id, simco_mode, last_session_id, rows_done, finished_at = row
+    return {
+        "run_id": run_id,
+        "simco_mode": simco_mode,
+        "last_session_id": last_session_id,
+        "rows_done": rows_done,
+        "finished": finished_at is not None,
+    }
+
+
+class _PostgresRescoreStore:
+    backend = "postgres"
+
+    def __init__(self):
+        # Reads hold a named cursor open inside a transaction on their own
+        # connection, so writes and checkpoints commit independently.
+        self._read_conn = psycopg2.connect(settings.DATABASE_URL, connect_timeout=5)
+        self._write_conn = psycopg2.connect(settings.DATABASE_URL, connect_timeout=5)
+        with self._write_conn, self._write_conn.cursor() as cur:
+            cur.execute(_PG_TABLES_SQL)
+
+    def get_run(self, run_id: str) -> Optional[dict[str, Any]]:
+        with self._write_conn, self._write_conn.cursor() as cur:
+            cur.execute(
+                "SELECT run_id, simco_mode, last_session_id, rows_done, finished_at "
+                "FROM quiz_rescore_runs WHERE run_id = %s",
+                (run_id,),
+            )
+            return _run_dict(cur.fetchone())
+
+    def create_run(self, run_id: str, simco_mode: str) -> None:
+        with self._write_conn, self._write_conn.cursor() as cur:
+            cur.execute(
+                "INSERT INTO quiz_rescore_runs (run_id, simco_mode) VALUES (%s, %s)",
+                (run_id, simco_mode),
+            )
+
+    def iter_sessions(self, after: Optional[str], page_size: int) -> Iterator[list[tuple[str, dict]]]:
+        """Yield pages of ``(session_id, session_data)`` from a server-side cursor."""
+        with self._read_conn.cursor(name="rescore_sessions") as cur:
+            cur.itersize = page_size
+            cur.execute(
+                "SELECT session_id, session_data FROM quiz_sessions "
+                "WHERE %s IS NULL OR session_id > %s ORDER BY session_id",
+                (after, after),
+            )
+            while True:
+                rows = cur.fetchmany(page_size)
+                if not rows:
+                    break
+                yield [(sid, json.loads(data) if isinstance(data, str) else data) for sid, data in rows]
+        self._read_conn.rollback()
+
+    def write_chunk(self, run_id: str, rows: list[dict[str, Any]], last_session_id: str, processed: int) -> None:
+        with self._write_conn, self._write_conn.cursor() as cur:
+            if rows:
+                cur.executemany(
+                    """
+                    INSERT INTO quiz_session_rescores (
+                        run_id, session_id, model_version, percentage, self_confidence,
+                        true_confidence, true_confidence_normalized, dk_zone, dk_index, result_data
+                    )
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s::jsonb)
+                    ON CONFLICT (run_id, session_id) DO UPDATE SET
+                        model_version = EXCLUDED.model_version,
+                        percentage = EXCLUDED.percentage,
+                        self_confidence = EXCLUDED.self_confidence,
+                        true_confidence = EXCLUDED.true_confidence,
+                        true_confidence_normalized = EXCLUDED.true_confidence_normalized,
+                        dk_zone = EXCLUDED.dk_zone,
+                        dk_index = EXCLUDED.dk_index,
+                        result_data = EXCLUDED.result_data,
+                        rescored_at = NOW();
+                    """,
+                    [_result_params(run_id, row) for row in rows],
+                )
+            cur.execute(
+                "UPDATE quiz_rescore_runs SET last_session_id = %s, rows_done = rows_done + %s, "
+                "updated_at = NOW() WHERE run_id = %s",
+                (last_session_id, processed, run_id),
+            )
+
+    def finish_run(self, run_id: str) -> None:
+        with self._write_conn, self._write_conn.cursor() as cur:
+            cur.execute("UPDATE quiz_rescore_runs SET finished_at = NOW() WHERE run_id = %s", (run_id,))
+
+    def close(self) -> None:
+        self._read_conn.close()
+        self._write_conn.close()
+
+
+class _SqliteRescoreStore:
+    backend = "sqlite"
+
+    def __init__(self):
+        self._conn = sqlite3.connect(str(_sqlite_path()))
+        self._conn.executescript(_SQLITE_TABLES_SQL)
+        self._conn.commit()
+
+    def get_run(self, run_id: str) -> Optional[dict[str, Any]]:
+        cur = self._conn.execute(
+            "SELECT run_id, simco_mode, last_session_id, rows_done, finished_at "
+            "FROM quiz_rescore_runs WHERE run_id = ?",
+            (run_id,),
+        )
+        return _run_dict(cur.fetchone())
+
+    def create_run(self, run_id: str, simco_mode: str) -> None:
+        with self._conn:
+            self._conn.execute(
+                "INSERT INTO quiz_rescore_runs (run_id, simco_mode) VALUES (?, ?)",
+                (run_id, simco_mode),
+            )
+
+    def iter_sessions(self, after: Optional[str], page_size: int) -> Iterator[list[tuple[str, dict]]]:
+        """Yield pages of ``(session_id, session_data)`` by keyset pagination.
+
+        SQLite has no server-side cursors, and an open read transaction would
+        block the checkpoint writes, so each page is its own short query.
+        """
+        while True:
+            if after is None:
+                cur = self._conn.execute(
+                    "SELECT session_id, session_data FROM quiz_sessions ORDER BY session_id LIMIT ?",
+                    (page_size,),
+                )
+            else:
+                cur = self._conn.execute(
+                    "SELECT session_id, session_data FROM quiz_sessions "
+                    "WHERE session_id > ? ORDER BY session_id LIMIT ?",
+                    (after, page_size),
+                )
+            rows = cur.fetchall()
+            if not rows:
+                return
+            after = rows[-1][0]
+            yield [(sid, json.loads(data)) for sid, data in rows]
+
+    def write_chunk(self, run_id: str, rows: list[dict[str, Any]], last_session_id: str, processed: int) -> None:
+        with self._conn:
+            if rows:
+                self._conn.executemany(
+                    """
+                    INSERT INTO quiz_session_rescores (
+                        run_id, session_id, model_version, percentage, self_confidence,
+                        true_confidence, true_confidence_normalized, dk_zone, dk_index, result_data
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(run_id, session_id) DO UPDATE SET
+                        model_version = excluded.model_version,
+                        percentage = excluded.percentage,
+                        self_confidence = excluded.self_confidence,
+                        true_confidence = excluded.true_confidence,
+                        true_confidence_normalized = excluded.true_confidence_normalized,
+                        dk_zone = excluded.dk_zone,
+                        dk_index = excluded.dk_index,
+                        result_data = excluded.result_data,
+                        rescored_at = CURRENT_TIMESTAMP
+                    """,
+                    [_result_params(run_id, row) for row in rows],
+                )
+            self._conn.execute(
+                "UPDATE quiz_rescore_runs SET last_session_id = ?, rows_done = rows_done + ?, "
+                "updated_at = CURRENT_TIMESTAMP WHERE run_id = ?",
+                (last_session_id, processed, run_id),
+            )
+
+    def finish_run(self, run_id: str) -> None:
+        with self._conn:
+            self._conn.execute(
+                "UPDATE quiz_rescore_runs SET finished_at = CURRENT_TIMESTAMP WHERE run_id = ?",
+                (run_id,),
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def open_rescore_store():
+    """Open the re-scoring store on the same database as the session store."""
+    if _use_postgres():
+        if psycopg2 is None:
+            print("⚠️ psycopg2 is not installed. Falling back to SQLite session store.")
+        else:
+            return _PostgresRescoreStore()
+    return _SqliteRescoreStore()
@@ -0,0 +1,145 @@
+"""
+Resilience helpers for downstream service calls (SIMCO Logic).
+
+``CircuitBreaker`` stops calling a dependency after repeated failures and
+lets a single probe through once the reset timeout has elapsed.
+``LastGoodCache`` keeps the most recent successful result per key so callers
+can serve a stale value instead of failing outright.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency while its breaker is open."""
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._counters = {
+            "calls": 0,
+            "successes": 0,
+            "failures": 0,
+            "short_circuited": 0,
+            "opened": 0,
+        }
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                self._counters["calls"] += 1
+                return True
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                # Exactly one probe decides whether the dependency is back.
+                self._probe_in_flight = True
+                self._counters["calls"] += 1
+                return True
+            self._counters["short_circuited"] += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._counters["successes"] += 1
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+            self._state = self.CLOSED
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._counters["failures"] += 1
+            self._consecutive_failures += 1
+            was_probe = self._state == self.HALF_OPEN
+            self._probe_in_flight = False
+            if was_probe or self._consecutive_failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._counters["opened"] += 1
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+
+    def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        if not self.allow_request():
+            raise CircuitOpenError("circuit breaker is open")
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def snapshot(self) -> dict[str, Any]:
+        """Breaker state and counters, for health/metrics endpoints."""
+        with self._lock:
+            state = self._current_state()
+            retry_in = 0.0
+            if state == self.OPEN:
+                retry_in = max(0.0, self.reset_timeout - (self._clock() - self._opened_at))
+            return {
+                "state": state,
+                "consecutive_failures": self._consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "reset_timeout_seconds": self.reset_timeout,
+                "retry_in_seconds": round(retry_in, 2),
+                **self._counters,
+            }
+
+
+class LastGoodCache:
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            return value
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,59 @@
+"""
+Cache of computed /quiz-results payloads.
+
+Entries are keyed by session ID and tagged with the session version they were
+computed from. Any mutation bumps ``QuizSession.version``, so a stale entry is
+simply never matched again and gets overwritten on the next computation.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+def compute_etag(payload: dict[str, Any]) -> str:
+    """Strong ETag derived from the payload content."""
+    body = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return '"' + hashlib.sha1(body.encode("utf-8")).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    # Weak comparison, as required for If-None-Match.
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+class ResultsCache:
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[int, str, dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str, version: int) -> Optional[tuple[str, dict[str, Any]]]:
+        """Return ``(etag, payload)`` if cached for this exact session version."""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(session_id)
+            return entry[1], entry[2]
+
+    def put(self, session_id: str, version: int, payload: dict[str, Any]) -> str:
+        etag = compute_etag(payload)
+        with self._lock:
+            current = self._entries.get(session_id)
+            # A slower computation for an older version must not overwrite a newer one.
+            if current is not None and current[0] > version:
+                return etag
+            self._entries[session_id] = (version, etag, payload)
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return etag
+
+    def invalidate(self, session_id: str) -> None:
+        with self._lock:
+            self._entries.pop(session_id, None)
@@ -0,0 +1,151 @@
+"""
+In-memory quiz session model.
+
+Sessions are persisted as plain JSON dicts (see ``session_store``). While a
+session is live we keep it as a ``QuizSession`` so lookups by question ID and
+"already answered?" checks are O(1) instead of list scans.
+"""
+from typing import Any, Optional
+
+
+# Keys with a dedicated slot. Anything else found in a stored session
+# (legacy payloads such as ``confidence_data``) is kept in ``extras`` and
+# written back untouched.
+_KNOWN_KEYS = (
+    "questions",
+    "score",
+    "total_questions",
+    "answered",
+    "user_name",
+    "user_email",
+    "user_info",
+    "user_answers_data",
+    "behavioral_data",
+    "self_confidence",
+    "self_confidence_normalized",
+    "overall_confidence",
+)
+
+
+class QuizSession:
+    __slots__ = (
+        "questions",
+        "score",
+        "total_questions",
+        "answered",
+        "user_name",
+        "user_email",
+        "user_info",
+        "user_answers_data",
+        "behavioral_data",
+        "self_confidence",
+        "self_confidence_normalized",
+        "overall_confidence",
+        "extras",
+        "version",
+        "_question_index",
+        "_answered_ids",
+    )
+
+    def __init__(
+        self,
+        questions: list[dict[str, Any]],
+        score: int = 0,
+        total_questions: Optional[int] = None,
+        answered: Optional[list[str]] = None,
+        user_name: str = "",
+        user_email: str = "",
+        user_info: str = "",
+        user_answers_data: Optional[dict[str, Any]] = None,
+        behavioral_data: Optional[dict[str, Any]] = None,
+        self_confidence: Optional[float] = None,
+        self_confidence_normalized: Optional[float] = None,
+        overall_confidence: Optional[float] = None,
+        extras: Optional[dict[str, Any]] = None,
+    ):
+        self.questions = list(questions)
+        self.score = score
+        self.total_questions = len(self.questions) if total_questions is None else total_questions
+        # Ordered list for serialization, set for membership checks.
+        self.answered = list(answered or [])
+        self.user_name = user_name
+        self.user_email = user_email
+        self.user_info = user_info
+        self.user_answers_data = dict(user_answers_data or {})
+        self.behavioral_data = behavioral_data if isinstance(behavioral_data, dict) else {}
+        self.self_confidence = self_confidence
+        self.self_confidence_normalized = self_confidence_normalized
+        self.overall_confidence = overall_confidence
+        self.extras = dict(extras or {})
+        # In-memory only: bumped on every mutation so cached results can be
+        # told apart from the current state. Not persisted.
+        self.version = 0
+        self._question_index = {q.get("id"): i for i, q in enumerate(self.questions)}
+        self._answered_ids = set(self.answered)
+
+    def get_question(self, question_id: str) -> Optional[dict[str, Any]]:
+        index = self._question_index.get(question_id)
+        return None if index is None else self.questions[index]
+
+    def question_position(self, question_id: str) -> Optional[int]:
+        """Zero-based position of a question in the quiz, or None."""
+        return self._question_index.get(question_id)
+
+    def is_answered(self, question_id: str) -> bool:
+        return question_id in self._answered_ids
+
+    def is_complete(self) -> bool:
+        return len(self._answered_ids) >= self.total_questions
+
+    def touch(self) -> None:
+        """Mark the session as modified."""
+        self.version += 1
+
+    def mark_answered(self, question_id: str) -> None:
+        if question_id not in self._answered_ids:
+            self._answered_ids.add(question_id)
+            self.answered.append(question_id)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "QuizSession":
+        """Build a session from the persisted JSON shape."""
+        return cls(
+            questions=data.get("questions", []) or [],
+            score=data.get("score", 0),
+            total_questions=data.get("total_questions"),
+            answered=data.get("answered", []) or [],
+            user_name=data.get("user_name", ""),
+            user_email=data.get("user_email", ""),
+            user_info=data.get("user_info", ""),
+            user_answers_data=data.get("user_answers_data"),
+            behavioral_data=data.get("behavioral_data"),
+            self_confidence=data.get("self_confidence"),
+            self_confidence_normalized=data.get("self_confidence_normalized"),
+            overall_confidence=data.get("overall_confidence"),
+            extras={k: v for k, v in data.items() if k not in _KNOWN_KEYS},
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize to the same JSON shape the session store always used."""
+        data: dict[str, Any] = {
+            "questions": self.questions,
+            "score": self.score,
+            "total_questions": self.total_questions,
+            "answered": self.answered,
+            "user_name": self.user_name,
+            "user_email": self.user_email,
+            "user_info": self.user_info,
+        }
+        # Optional keys only appear once they have been set, as before.
+        if self.user_answers_data:
+            data["user_answers_data"] = self.user_answers_data
+        if self.behavioral_data:
+            data["behavioral_data"] = self.behavioral_data
+        if self.self_confidence is not None:
+            data["self_confidence"] = self.self_confidence
+        if self.self_confidence_normalized is not None:
+            data["self_confidence_normalized"] = self.self_confidence_normalized
+        if self.overall_confidence is not None:
+            data["overall_confidence"] = self.overall_confidence
+        data.update(self.extras)
+        return data
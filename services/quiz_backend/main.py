@@ -1,4 +1,4 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import BackgroundTasks, FastAPI, Header, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from typing import Optional, List
@@ -8,6 +8,10 @@ from uuid import uuid4
 
 # Import from organized modules
 from .config import settings
+from .core import embedded_confidence
+from .core.resilience import CircuitBreaker, CircuitOpenError, LastGoodCache
+from .core.results_cache import ResultsCache, compute_etag, etag_matches
+from .core.session import QuizSession
 from .core.session_store import init_session_store, save_session, load_session
 
 app = FastAPI(
@@ -30,26 +34,48 @@ LLM_PROVIDER = (settings.LLM_PROVIDER or "ollama").strip().lower()
 OLLAMA_API_URL = f"{settings.OLLAMA_BASE_URL}/api/generate"
 MISTRAL_CHAT_COMPLETIONS_URL = f"{settings.MISTRAL_API_BASE_URL.rstrip('/')}/chat/completions"
 SIMCO_LOGIC_BASE_URL = settings.SIMCO_LOGIC_BASE_URL
+# SIMCO Logic mode: "remote" (HTTP service) or "embedded" (in-process model)
+SIMCO_LOGIC_MODE = (settings.SIMCO_LOGIC_MODE or "remote").strip().lower()
+
+# SIMCO Logic resilience: fail fast while the service is down and fall back
+# to the last good true confidence computed for the session.
+simco_logic_breaker = CircuitBreaker(
+    failure_threshold=settings.SIMCO_LOGIC_BREAKER_FAILURES,
+    reset_timeout=settings.SIMCO_LOGIC_BREAKER_RESET_SECONDS,
+)
+simco_logic_last_good = LastGoodCache(max_entries=settings.RESULTS_CACHE_MAX_ENTRIES)
+# The per-answer live gauge is updated in the background behind its own breaker,
+# so a slow stream route never delays answers or opens the results breaker.
+simco_stream_breaker = CircuitBreaker(
+    failure_threshold=settings.SIMCO_LOGIC_BREAKER_FAILURES,
+    reset_timeout=settings.SIMCO_LOGIC_BREAKER_RESET_SECONDS,
+)
+live_true_confidences = LastGoodCache(max_entries=settings.RESULTS_CACHE_MAX_ENTRIES)
 
 # Store quiz sessions in memory (in production, use a database)
-quiz_sessions = {}
+quiz_sessions: dict[str, QuizSession] = {}
+results_cache = ResultsCache(max_entries=settings.RESULTS_CACHE_MAX_ENTRIES)
 
 
-def get_session(session_id: str):
+def get_session(session_id: str) -> Optional[QuizSession]:
     session = quiz_sessions.get(session_id)
     if session is not None:
         return session
 
     db_session = load_session(session_id)
-    if db_session is not None:
-        quiz_sessions[session_id] = db_session
-    return db_session
+    if db_session is None:
+        return None
+    session = QuizSession.from_dict(db_session)
+    quiz_sessions[session_id] = session
+    # Versions restart at 0 for a reloaded session; drop anything cached before.
+    results_cache.invalidate(session_id)
+    return session
 
 
 def persist_session(session_id: str) -> None:
     session = quiz_sessions.get(session_id)
     if session is not None:
-        save_session(session_id, session)
+        save_session(session_id, session.to_dict())
 
 
 def normalize_self_confidence(value) -> float:
@@ -143,50 +169,176 @@ def generate_question_text(prompt: str) -> str:
     return response.json().get("response", "")
 
 
-def compute_true_confidence(session: dict, self_confidence_normalized: float) -> dict:
-    """Compute true confidence using only SIMCO Logic neural model."""
-    face_confidence_per_question = []
-    behavioral_data = session.get("behavioral_data", {}) or {}
+def _request_simco_logic(method: str, path: str, payload: dict) -> tuple[int, Optional[dict]]:
+    """One HTTP call to SIMCO Logic; raises on the outcomes the breaker counts as failures."""
+    response = requests.request(
+        method,
+        f"{SIMCO_LOGIC_BASE_URL}{path}",
+        json=payload,
+        timeout=settings.SIMCO_LOGIC_TIMEOUT,
+    )
+    # 4xx means the service is up and rejected the input; only 5xx counts against it.
+    if response.status_code >= 500:
+        raise requests.HTTPError(f"status {response.status_code}", response=response)
+    return response.status_code, response.json() if response.ok else None
+
+
+def _post_simco_logic(
+    path: str,
+    payload: dict,
+    breaker: Optional[CircuitBreaker] = None,
+    method: str = "POST",
+) -> dict:
+    """Call the remote SIMCO Logic service through ``breaker`` (default: ``simco_logic_breaker``)."""
+    breaker = breaker or simco_logic_breaker
+    try:
+        status_code, data = breaker.call(_request_simco_logic, method, path, payload)
+    except CircuitOpenError as exc:
+        raise HTTPException(status_code=503, detail="SIMCO Logic unavailable: circuit breaker open") from exc
+    except (requests.RequestException, ValueError) as exc:
+        raise HTTPException(status_code=503, detail=f"SIMCO Logic unavailable: {exc}") from exc
 
-    for q in session.get("questions", []):
-        qid = q.get("id")
-        q_metrics = behavioral_data.get(qid, {}) if isinstance(behavioral_data, dict) else {}
-        face_conf = q_metrics.get("face_final_confidence")
-        if face_conf is not None:
-            try:
-                face_confidence_per_question.append(float(face_conf))
-            except (TypeError, ValueError):
-                continue
+    if data is None:
+        raise HTTPException(
+            status_code=503,
+            detail=f"SIMCO Logic error: status {status_code}",
+        )
 
+    return data
+
+
+def call_simco_logic(payload: dict) -> dict:
+    """Run a true-confidence inference in the configured SIMCO Logic mode."""
+    if SIMCO_LOGIC_MODE == "embedded":
+        try:
+            return embedded_confidence.predict(payload)
+        except embedded_confidence.InvalidPayload as exc:
+            # Same outcome as the remote service rejecting the input with a 422.
+            raise HTTPException(status_code=503, detail="SIMCO Logic error: status 422") from exc
+        except Exception as exc:
+            raise HTTPException(status_code=503, detail=f"SIMCO Logic (embedded) error: {exc}") from exc
+
+    return _post_simco_logic("/analyze/true-confidence", payload)
+
+
+def update_live_true_confidence(
+    session_id: str,
+    self_confidence_normalized: float,
+    face_confidence: Optional[float],
+) -> Optional[dict]:
+    """Feed one answer (or a new self confidence) into SIMCO Logic's streaming estimate.
+
+    Runs as a background task after ``/submit-answer`` and ``/update-confidence``
+    respond. An update is O(1), but the stream state is rebuilt from the stored
+    session when the quiz is complete or when the returned state does not
+    match it (an earlier update was lost, or the service dropped the session).
+    The estimate is kept in ``live_true_confidences``; None is returned if
+    SIMCO Logic is unavailable, as the gauge is best-effort.
+    """
+    session = get_session(session_id)
+    if session is not None and session.is_complete():
+        return _rebuild_live_stream(session_id, session, self_confidence_normalized)
+
+    result = _send_live_stream(
+        session_id, {"self_confidence": self_confidence_normalized, "face_confidence": face_confidence}
+    )
+    if result is None or session is None:
+        return result
+    if (result.get("questions_count") != len(session_face_confidences(session)) or
+            abs(result.get("self_confidence_normalized", -1.0) - self_confidence_normalized) > 1e-4):
+        return _rebuild_live_stream(session_id, session, self_confidence_normalized)
+    return result
+
+
+def _rebuild_live_stream(session_id: str, session: QuizSession, self_confidence_normalized: float) -> Optional[dict]:
     payload = {
         "self_confidence": self_confidence_normalized,
-        "face_confidence_per_question": face_confidence_per_question,
+        "face_confidence_per_question": session_face_confidences(session),
     }
+    return _send_live_stream(session_id, payload, replace=True)
 
+
+def _send_live_stream(session_id: str, payload: dict, replace: bool = False) -> Optional[dict]:
+    """One streaming update (``replace``: a full rebuild); None if SIMCO Logic is unavailable."""
     try:
-        response = requests.post(
-            f"{SIMCO_LOGIC_BASE_URL}/analyze/true-confidence",
-            json=payload,
-            timeout=5,
-        )
-    except requests.RequestException as exc:
-        raise HTTPException(status_code=503, detail=f"SIMCO Logic unavailable: {exc}") from exc
+        if SIMCO_LOGIC_MODE == "embedded":
+            if replace:
+                result = embedded_confidence.replace_stream(session_id, payload)
+            else:
+                result = embedded_confidence.update_stream(session_id, payload)
+        else:
+            result = _post_simco_logic(
+                f"/analyze/true-confidence/stream/{session_id}",
+                payload,
+                breaker=simco_stream_breaker,
+                method="PUT" if replace else "POST",
+            )
+    except HTTPException as e:
+        print(f"Warning: Live true confidence unavailable for session {session_id}: {e.detail}")
+        return None
+    except Exception as e:
+        print(f"Warning: Live true confidence failed for session {session_id}: {e}")
+        return None
+    live_true_confidences.put(session_id, result)
+    return result
 
-    if not response.ok:
-        raise HTTPException(
-            status_code=503,
-            detail=f"SIMCO Logic error: status {response.status_code}",
-        )
 
-    data = response.json()
-    if "true_confidence" not in data or "true_confidence_normalized" not in data:
-        raise HTTPException(status_code=503, detail="SIMCO Logic returned invalid true confidence payload")
+def face_confidence_value(value) -> Optional[float]:
+    """A stored ``face_final_confidence`` as sent to SIMCO Logic, or None if missing/invalid."""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
 
-    return {
+
+def session_face_confidences(session: QuizSession) -> list[float]:
+    """Per-question webcam confidences in question order (unanswered/invalid skipped)."""
+    face_confidence_per_question = []
+    behavioral_data = session.behavioral_data
+
+    for q in session.questions:
+        qid = q.get("id")
+        q_metrics = behavioral_data.get(qid, {}) or {}
+        face_conf = face_confidence_value(q_metrics.get("face_final_confidence"))
+        if face_conf is not None:
+            face_confidence_per_question.append(face_conf)
+    return face_confidence_per_question
+
+
+def compute_true_confidence(session_id: str, session: QuizSession, self_confidence_normalized: float) -> dict:
+    """
+    Compute true confidence using only SIMCO Logic neural model.
+
+    If SIMCO Logic fails, the last good result for the session is returned
+    with ``degraded``/``stale`` set; without one, the numeric fields are
+    omitted so the results page still renders.
+    """
+    payload = {
+        "self_confidence": self_confidence_normalized,
+        "face_confidence_per_question": session_face_confidences(session),
+    }
+
+    try:
+        data = call_simco_logic(payload)
+        if "true_confidence" not in data or "true_confidence_normalized" not in data:
+            raise HTTPException(status_code=503, detail="SIMCO Logic returned invalid true confidence payload")
+    except HTTPException as exc:
+        print(f"Warning: True confidence degraded for session {session_id}: {exc.detail}")
+        last_good = simco_logic_last_good.get(session_id)
+        if last_good is not None:
+            return {**last_good, "degraded": True, "stale": True, "detail": exc.detail}
+        return {"source": "unavailable", "degraded": True, "stale": False, "detail": exc.detail}
+
+    result = {
         "true_confidence": data.get("true_confidence"),
         "true_confidence_normalized": data.get("true_confidence_normalized"),
-        "source": "simco_logic",
+        "source": "simco_logic_embedded" if SIMCO_LOGIC_MODE == "embedded" else "simco_logic",
+        "degraded": False,
     }
+    simco_logic_last_good.put(session_id, result)
+    return result
 
 class QuestionRequest(BaseModel):
     subject: str
@@ -208,7 +360,7 @@ class TrueConfidenceRequest(BaseModel):
     face_confidence_per_question: List[float] = Field(default_factory=list)
 
 
-def send_quiz_result_notification(session: dict, results_payload: dict) -> dict:
+def send_quiz_result_notification(session: QuizSession, results_payload: dict) -> dict:
     """Notifications disabled in backend; keep response shape stable."""
     return {
         "attempted": False,
@@ -233,33 +385,28 @@ def health_check():
         "llm_provider": LLM_PROVIDER,
         "ollama_url": OLLAMA_API_URL,
         "mistral_url": MISTRAL_CHAT_COMPLETIONS_URL,
+        "simco_logic_mode": SIMCO_LOGIC_MODE,
+        "simco_logic_breaker": simco_logic_breaker.snapshot(),
+        "simco_logic_fallback_cache": simco_logic_last_good.snapshot(),
+        "simco_stream_breaker": simco_stream_breaker.snapshot(),
     }
 
 
 @app.post("/analyze/true-confidence")
 def analyze_true_confidence(payload: TrueConfidenceRequest):
     """Proxy endpoint to SIMCO Logic neural confidence service."""
-    try:
-        response = requests.post(
-            f"{SIMCO_LOGIC_BASE_URL}/analyze/true-confidence",
-            json=payload.model_dump(),
-            timeout=5,
-        )
-    except requests.RequestException as exc:
-        raise HTTPException(status_code=503, detail=f"SIMCO Logic unavailable: {exc}") from exc
-
-    if not response.ok:
-        raise HTTPException(
-            status_code=503,
-            detail=f"SIMCO Logic error: status {response.status_code}",
-        )
-
-    return response.json()
+    return call_simco_logic(payload.model_dump())
 
 
 @app.on_event("startup")
 def startup_event():
     init_session_store()
+    if SIMCO_LOGIC_MODE == "embedded":
+        try:
+            embedded_confidence.warm_up()
+            print("✅ Embedded SIMCO Logic model ready")
+        except Exception as e:
+            print(f"⚠️ Failed to load embedded SIMCO Logic model: {e}")
 
 def parse_quiz_response(text: str) -> Optional[dict]:
     """Parse the generated quiz response to extract structured data"""
@@ -309,7 +456,7 @@ def parse_quiz_response(text: str) -> Optional[dict]:
         return None
 
 @app.post("/submit-answer")
-def submit_answer(submission: AnswerSubmission):
+def submit_answer(submission: AnswerSubmission, background_tasks: BackgroundTasks):
     """Submit an answer and check if it's correct"""
     session = get_session(submission.session_id)
     
@@ -317,45 +464,65 @@ def submit_answer(submission: AnswerSubmission):
         raise HTTPException(status_code=404, detail="Session non trouvée")
     
     # Find the question
-    question = next((q for q in session["questions"] if q["id"] == submission.question_id), None)
+    question = session.get_question(submission.question_id)
     
     if not question:
         raise HTTPException(status_code=404, detail="Question non trouvée")
     
     # Check if already answered
-    if submission.question_id in session["answered"]:
+    if session.is_answered(submission.question_id):
         raise HTTPException(status_code=400, detail="Question déjà répondue")
     
     is_correct = submission.selected_answer == question["correct_answer"]
     
     if is_correct:
-        session["score"] += 1
+        session.score += 1
     
-    session["answered"].append(submission.question_id)
+    session.mark_answered(submission.question_id)
     
     # Store user answer data
-    if "user_answers_data" not in session:
-        session["user_answers_data"] = {}
-    session["user_answers_data"][submission.question_id] = submission.selected_answer
+    session.user_answers_data[submission.question_id] = submission.selected_answer
     
     # Store behavioral data if provided
     if submission.behavioral_data:
-        if "behavioral_data" not in session:
-            session["behavioral_data"] = {}
-        session["behavioral_data"][submission.question_id] = submission.behavioral_data
+        session.behavioral_data[submission.question_id] = submission.behavioral_data
 
+    session.touch()
     persist_session(submission.session_id)
+    # Results depend on the self-confidence the client posts to /update-confidence
+    # after the last answer; warming before then would only be invalidated.
+    if session.is_complete() and session.self_confidence_normalized is not None:
+        background_tasks.add_task(warm_quiz_results, submission.session_id)
+
+    # Same face value the final true confidence will use for this question.
+    face_confidence = face_confidence_value((submission.behavioral_data or {}).get("face_final_confidence"))
+    self_confidence_normalized = session.self_confidence_normalized
+    if self_confidence_normalized is None:
+        self_confidence_normalized = normalize_self_confidence(submission.confidence)
+    background_tasks.add_task(
+        update_live_true_confidence, submission.session_id, self_confidence_normalized, face_confidence
+    )
     
+    # The live estimate is updated after this response; read it from GET /live-true-confidence/{id}.
     return {
         "correct": is_correct,
         "correct_answer": question["correct_answer"],
         "explanation": question["explanation"],
-        "score": session["score"],
-        "total_questions": session["total_questions"]
+        "score": session.score,
+        "total_questions": session.total_questions,
     }
 
+
+@app.get("/live-true-confidence/{session_id}")
+def get_live_true_confidence(session_id: str):
+    """Latest streaming true-confidence estimate, updated after each answer."""
+    result = live_true_confidences.get(session_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="No live true confidence for this session yet")
+    return result
+
 @app.post("/update-confidence")
-async def update_confidence(request: dict):
+async def update_confidence(request: dict, background_tasks: BackgroundTasks):
     """Update the confidence level for all answers in a session"""
     session_id = request.get("session_id")
     self_confidence = request.get("self_confidence")
@@ -374,34 +541,86 @@ async def update_confidence(request: dict):
     self_confidence_percent = round(normalized_self_confidence * 100.0, 2)
     
     # Store one global self-confidence for the whole session
-    session["self_confidence"] = self_confidence_percent
-    session["self_confidence_normalized"] = normalized_self_confidence
+    session.self_confidence = self_confidence_percent
+    session.self_confidence_normalized = normalized_self_confidence
     # Keep backward compatibility key in persisted session
-    session["overall_confidence"] = self_confidence_percent
+    session.overall_confidence = self_confidence_percent
     # Clean old per-question confidence payloads if they exist
-    if "confidence_data" in session:
-        del session["confidence_data"]
+    session.extras.pop("confidence_data", None)
 
+    session.touch()
     persist_session(session_id)
+    if session.is_complete():
+        background_tasks.add_task(warm_quiz_results, session_id)
+    # The live gauge was built on the placeholder confidence sent with each answer.
+    background_tasks.add_task(update_live_true_confidence, session_id, normalized_self_confidence, None)
     
     return {
         "success": True,
         "message": "Self confidence updated successfully",
         "self_confidence": self_confidence_percent,
         "self_confidence_normalized": normalized_self_confidence,
-        "updated_questions": len(session.get("answered", []))
+        "updated_questions": len(session.answered)
     }
 
 @app.get("/quiz-results/{session_id}")
-def get_quiz_results(session_id: str):
+def get_quiz_results(
+    session_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+):
     """Get comprehensive quiz results with analysis and recommendations"""
     session = get_session(session_id)
     
     if not session:
         raise HTTPException(status_code=404, detail="Session non trouvée")
-    
-    score = session["score"]
-    total = session["total_questions"]
+
+    cached = results_cache.get(session_id, session.version)
+    if cached is not None:
+        etag, results_payload = cached
+    else:
+        version = session.version
+        results_payload = build_quiz_results(session_id, session)
+        if results_payload["degraded"]:
+            # Recompute on the next request once SIMCO Logic is back.
+            etag = compute_etag(results_payload)
+        else:
+            etag = results_cache.put(session_id, version, results_payload)
+
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
+    return results_payload
+
+
+def warm_quiz_results(session_id: str) -> None:
+    """Compute and cache results ahead of the first /quiz-results request."""
+    session = get_session(session_id)
+    if session is None:
+        return
+
+    version = session.version
+    if results_cache.get(session_id, version) is not None:
+        return
+
+    try:
+        results_payload = build_quiz_results(session_id, session)
+    except HTTPException as e:
+        print(f"Warning: Failed to precompute results for session {session_id}: {e.detail}")
+        return
+    if not results_payload["degraded"]:
+        results_cache.put(session_id, version, results_payload)
+
+
+def build_quiz_results(session_id: str, session: QuizSession) -> dict:
+    """Compute the full results payload for a session (uncached).
+
+    Only reads the session: the payload is cached under ``session.version``,
+    so anything derived here must not be written back without a ``touch()``.
+    """
+    score = session.score
+    total = session.total_questions
     percentage = (score / total * 100) if total > 0 else 0
     
     # Determine performance level
@@ -424,18 +643,22 @@ def get_quiz_results(session_id: str):
     
     # Collect detailed question results
     question_results = []
-    user_answers_data = session.get("user_answers_data", {})
-    behavioral_data = session.get("behavioral_data", {}) if isinstance(session.get("behavioral_data", {}), dict) else {}
+    user_answers_data = session.user_answers_data
+    behavioral_data = session.behavioral_data
 
     # Global self confidence (single value for the full quiz)
-    global_self_conf = session.get("self_confidence", session.get("overall_confidence", 50))
+    global_self_conf = session.self_confidence
+    if global_self_conf is None:
+        global_self_conf = 50 if session.overall_confidence is None else session.overall_confidence
     try:
         global_self_conf = confidence_to_percent(global_self_conf)
     except Exception:
         global_self_conf = 50.0
-    legacy_confidence_per_question = session.get("confidence_per_question", {}) if isinstance(session.get("confidence_per_question", {}), dict) else {}
+    legacy_confidence_per_question = session.extras.get("confidence_per_question", {})
+    if not isinstance(legacy_confidence_per_question, dict):
+        legacy_confidence_per_question = {}
     
-    for q in session["questions"]:
+    for q in session.questions:
         q_id = q["id"]
         user_answer = user_answers_data.get(q_id)
         is_answered = user_answer is not None
@@ -452,7 +675,7 @@ def get_quiz_results(session_id: str):
             declared_confidence = global_self_conf
 
         # Optional face confidence from webcam pipeline
-        q_behavior = behavioral_data.get(q_id, {}) if isinstance(behavioral_data, dict) else {}
+        q_behavior = behavioral_data.get(q_id, {}) or {}
         raw_face_conf = q_behavior.get("face_final_confidence")
         face_confidence = None
         if raw_face_conf is not None:
@@ -521,34 +744,20 @@ def get_quiz_results(session_id: str):
         ])
     
     # Use one declared confidence value for all answers (user inputs once)
-    self_confidence = session.get("self_confidence")
-    if self_confidence is None:
-        self_confidence = session.get("overall_confidence")
-    if self_confidence is None:
-        # Backward compatibility with older sessions
-        old_conf = session.get("confidence_data", {})
-        if isinstance(old_conf, dict) and old_conf:
-            self_confidence = next(iter(old_conf.values()))
-        else:
-            self_confidence = 50
-
-    # Keep both scales available in backend
-    self_confidence = confidence_to_percent(self_confidence)
+    self_confidence = resolve_self_confidence(session)
     self_confidence_normalized = round(self_confidence / 100.0, 4)
-    session["self_confidence"] = self_confidence
-    session["self_confidence_normalized"] = self_confidence_normalized
 
-    true_confidence = compute_true_confidence(session, self_confidence_normalized)
+    true_confidence = compute_true_confidence(session_id, session, self_confidence_normalized)
 
     # Analyze behavioral data if available
     behavioral_analysis = None
     behavioral_insights = []
-    if "behavioral_data" in session and session["behavioral_data"]:
+    if session.behavioral_data:
         behavioral_analysis = analyze_behavioral_data(
-            session["behavioral_data"],
+            session.behavioral_data,
             self_confidence,
-            session["user_answers_data"],
-            session["questions"]
+            session.user_answers_data,
+            session.questions
         )
         behavioral_insights = behavioral_analysis.get("insights", [])
 
@@ -556,9 +765,9 @@ def get_quiz_results(session_id: str):
     dk_analysis = calculate_dunning_kruger(
         score_percentage=percentage,
         confidence_data=self_confidence,
-        answers_data=session.get("user_answers_data", {}),
-        questions=session.get("questions", []),
-        behavioral_data=session.get("behavioral_data", {})
+        answers_data=session.user_answers_data,
+        questions=session.questions,
+        behavioral_data=session.behavioral_data
     )
     
     results_payload = {
@@ -571,10 +780,11 @@ def get_quiz_results(session_id: str):
         "color": color,
         "question_results": question_results,
         "recommendations": recommendations,
-        "answered_count": len(session["answered"]),
+        "answered_count": len(session.answered),
         "self_confidence": self_confidence,
         "self_confidence_normalized": self_confidence_normalized,
         "true_confidence": true_confidence,
+        "degraded": true_confidence["degraded"],
         "behavioral_analysis": behavioral_analysis,
         "behavioral_insights": behavioral_insights,
         "dunning_kruger": dk_analysis
@@ -585,6 +795,23 @@ def get_quiz_results(session_id: str):
 
     return results_payload
 
+def resolve_self_confidence(session: QuizSession) -> float:
+    """The session's single declared confidence on the [0,100] scale."""
+    self_confidence = session.self_confidence
+    if self_confidence is None:
+        self_confidence = session.overall_confidence
+    if self_confidence is None:
+        # Backward compatibility with older sessions
+        old_conf = session.extras.get("confidence_data", {})
+        if isinstance(old_conf, dict) and old_conf:
+            self_confidence = next(iter(old_conf.values()))
+        else:
+            self_confidence = 50
+
+    # Keep both scales available in backend
+    return confidence_to_percent(self_confidence)
+
+
 def calculate_dunning_kruger(score_percentage, confidence_data, answers_data, questions, behavioral_data=None):
     """
     Calculate Dunning-Kruger effect based on:
@@ -600,7 +827,7 @@ def calculate_dunning_kruger(score_percentage, confidence_data, answers_data, qu
     total_behavioral_confidence = 0
     n = len(questions)
 
-    for q in questions:
+    for index, q in enumerate(questions, start=1):
         qid = q["id"]
         declared_conf = 50 if confidence_data is None else confidence_data
         is_correct = answers_data.get(qid) == q["correct_answer"] if qid in answers_data else None
@@ -636,7 +863,7 @@ def calculate_dunning_kruger(score_percentage, confidence_data, answers_data, qu
             dk_signal = "unanswered"
 
         per_question.append({
-            "question_index": questions.index(q) + 1,
+            "question_index": index,
             "question_id": qid,
             "declared_confidence": declared_conf,
             "behavioral_confidence": round(behavioral_conf, 1),
@@ -756,6 +983,7 @@ def analyze_behavioral_data(behavioral_data, confidence_value, answers_data, que
     count = 0
     
     high_stress_questions = []
+    correct_under_stress = 0
     confidence_mismatches = []
     
     for q in questions:
@@ -770,6 +998,8 @@ def analyze_behavioral_data(behavioral_data, confidence_value, answers_data, que
             # Detect high stress indicators
             if metrics.get("blink_rate", 0) > 25:
                 high_stress_questions.append(qid)
+                if qid in answers_data and answers_data[qid] == q["correct_answer"]:
+                    correct_under_stress += 1
             
             # Check confidence vs performance (single confidence for the whole quiz)
             if qid in answers_data:
@@ -826,10 +1056,6 @@ def analyze_behavioral_data(behavioral_data, confidence_value, answers_data, que
     
     # Correlation with performance
     if len(high_stress_questions) > 0:
-        correct_under_stress = sum(
-            1 for qid in high_stress_questions 
-            if qid in answers_data and answers_data[qid] == next(q["correct_answer"] for q in questions if q["id"] == qid)
-        )
         stress_performance = correct_under_stress / len(high_stress_questions) if len(high_stress_questions) > 0 else 0
         
         if stress_performance < 0.3:
@@ -878,15 +1104,12 @@ Explication: [Brève explication de la réponse]"""
     if not questions:
         raise HTTPException(status_code=500, detail="Impossible de générer des questions")
     
-    quiz_sessions[session_id] = {
-        "questions": questions,
-        "score": 0,
-        "total_questions": len(questions),
-        "answered": [],
-        "user_name": (req.user_name or "").strip(),
-        "user_email": (req.user_email or "").strip(),
-        "user_info": req.user_info,
-    }
+    quiz_sessions[session_id] = QuizSession(
+        questions=questions,
+        user_name=(req.user_name or "").strip(),
+        user_email=(req.user_email or "").strip(),
+        user_info=req.user_info,
+    )
     persist_session(session_id)
     
     # Return questions without correct answers
@@ -0,0 +1,282 @@
+"""
+Offline re-scoring of stored quiz sessions.
+
+Recomputes true confidence, the Dunning-Kruger analysis and the behavioral
+analysis for every session in ``quiz_sessions`` (e.g. after a model or
+threshold change) and writes them to ``quiz_session_rescores`` under a run ID.
+Live results are not touched.
+
+Sessions are streamed in ``session_id`` order (a server-side cursor on
+PostgreSQL, keyset pages on SQLite) and scored in chunks across a process
+pool, with one batched true-confidence call per chunk. Sessions whose stored
+confidences SIMCO Logic would reject (out of [0,1]) are written as failed rows
+with an ``error`` in ``result_data`` and no scores, and the run goes on. Chunks
+are committed
+in order together with the run checkpoint, so ``--resume`` continues after
+the last committed session. Run from the repository root with the same
+environment as the app (``DATABASE_URL`` or ``SQLITE_DB_PATH``):
+
+    python -m services.quiz_backend.rescore --run-id model-v2
+    python -m services.quiz_backend.rescore --run-id model-v2 --resume
+    python -m services.quiz_backend.rescore --simco-mode remote --workers 4 --chunk-size 1000
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+import requests
+
+from .config import settings
+from .core import embedded_confidence
+from .core.rescore_store import open_rescore_store
+from .core.session import QuizSession
+from .main import (
+    analyze_behavioral_data,
+    calculate_dunning_kruger,
+    resolve_self_confidence,
+    session_face_confidences,
+)
+
+REMOTE_BATCH_TIMEOUT = 60
+
+
+def _true_confidences(payloads: list[dict[str, Any]], simco_mode: str, simco_base_url: str) -> list[dict]:
+    if not payloads:
+        return []
+    if simco_mode == "embedded":
+        return embedded_confidence.predict_batch(payloads)
+    response = requests.post(
+        f"{simco_base_url}/analyze/true-confidence/batch",
+        json={"sessions": payloads},
+        timeout=REMOTE_BATCH_TIMEOUT,
+    )
+    response.raise_for_status()
+    return response.json()["results"]
+
+
+def rescore_chunk(
+    records: list[tuple[str, dict]],
+    simco_mode: str,
+    simco_base_url: str,
+) -> list[dict[str, Any]]:
+    """Score one chunk of ``(session_id, session_data)``.
+
+    Sessions without questions are skipped; sessions with invalid stored
+    confidences come back as rows with an ``error`` and no scores.
+    """
+    prepared = []
+    payloads = []
+    rows = []
+    for session_id, data in records:
+        session = QuizSession.from_dict(data)
+        if not session.questions:
+            continue
+        total = session.total_questions
+        percentage = (session.score / total * 100) if total > 0 else 0
+        self_confidence = resolve_self_confidence(session)
+        payload = {
+            "self_confidence": round(self_confidence / 100.0, 4),
+            "face_confidence_per_question": session_face_confidences(session),
+        }
+        try:
+            embedded_confidence.validate(payload)
+        except embedded_confidence.InvalidPayload as exc:
+            rows.append({
+                "session_id": session_id,
+                "percentage": round(percentage, 2),
+                "self_confidence": self_confidence,
+                "error": f"invalid stored confidences: {exc}",
+            })
+            continue
+        prepared.append((session_id, session, percentage, self_confidence))
+        payloads.append(payload)
+
+    true_confidences = _true_confidences(payloads, simco_mode, simco_base_url)
+
+    for (session_id, session, percentage, self_confidence), true_confidence in zip(prepared, true_confidences):
+        behavioral_analysis = None
+        if session.behavioral_data:
+            behavioral_analysis = analyze_behavioral_data(
+                session.behavioral_data,
+                self_confidence,
+                session.user_answers_data,
+                session.questions,
+            )
+        dk_analysis = calculate_dunning_kruger(
+            score_percentage=percentage,
+            confidence_data=self_confidence,
+            answers_data=session.user_answers_data,
+            questions=session.questions,
+            behavioral_data=session.behavioral_data,
+        )
+        rows.append({
+            "session_id": session_id,
+            "model_version": true_confidence.get("model_version"),
+            "percentage": round(percentage, 2),
+            "self_confidence": self_confidence,
+            "true_confidence": true_confidence["true_confidence"],
+            "true_confidence_normalized": true_confidence["true_confidence_normalized"],
+            "dk_zone": dk_analysis["zone"] if dk_analysis else None,
+            "dk_index": dk_analysis["dk_index"] if dk_analysis else None,
+            "dunning_kruger": dk_analysis,
+            "behavioral_analysis": behavioral_analysis,
+        })
+    return rows
+
+
+class _Progress:
+    def __init__(self, every_seconds: float):
+        self.every = every_seconds
+        self.started = time.perf_counter()
+        self.last_report = self.started
+        self.sessions = 0
+        self.written = 0
+        self.failed = 0
+
+    def add(self, sessions: int, rows: list) -> None:
+        self.sessions += sessions
+        self.written += len(rows)
+        self.failed += sum(1 for row in rows if "error" in row)
+        now = time.perf_counter()
+        if now - self.last_report >= self.every:
+            self.last_report = now
+            print(f"  {self.sessions} sessions, {self.written} written ({self.failed} failed), "
+                  f"{self.rate():.0f} rows/s", flush=True)
+
+    def rate(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.sessions / elapsed if elapsed > 0 else 0.0
+
+
+def run(
+    run_id: str,
+    resume: bool = False,
+    chunk_size: int = 500,
+    workers: int = 1,
+    simco_mode: str = "embedded",
+    simco_base_url: Optional[str] = None,
+    limit: Optional[int] = None,
+    progress_every: float = 5.0,
+) -> dict[str, Any]:
+    simco_base_url = simco_base_url or settings.SIMCO_LOGIC_BASE_URL
+    store = open_rescore_store()
+    try:
+        existing = store.get_run(run_id)
+        if existing is not None and not resume:
+            raise SystemExit(f"Run {run_id!r} already exists; pass --resume to continue it.")
+        if existing is not None and existing["finished"]:
+            print(f"Run {run_id!r} already finished ({existing['rows_done']} sessions).")
+            return {**existing, "rows_per_second": 0.0}
+        if existing is None:
+            store.create_run(run_id, simco_mode)
+        after = existing["last_session_id"] if existing else None
+        already_done = existing["rows_done"] if existing else 0
+
+        if simco_mode == "embedded":
+            # Load the model once here so forked workers inherit it.
+            embedded_confidence.warm_up()
+
+        print(f"Re-scoring run {run_id!r} on {store.backend} "
+              f"(simco={simco_mode}, workers={workers}, chunk={chunk_size}"
+              f"{', resuming after ' + after if after else ''})", flush=True)
+        progress = _Progress(progress_every)
+
+        def commit(last_session_id: str, processed: int, rows: list) -> None:
+            store.write_chunk(run_id, rows, last_session_id, processed)
+            progress.add(processed, rows)
+
+        def pages():
+            remaining = limit
+            for page in store.iter_sessions(after, chunk_size):
+                if remaining is not None:
+                    page = page[:remaining]
+                    remaining -= len(page)
+                if page:
+                    yield page
+                if remaining is not None and remaining <= 0:
+                    return
+
+        if workers <= 1:
+            for page in pages():
+                commit(page[-1][0], len(page), rescore_chunk(page, simco_mode, simco_base_url))
+        else:
+            # Bounded and drained in submission order: memory stays flat and the
+            # checkpoint only ever advances past fully committed sessions.
+            in_flight = deque()
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for page in pages():
+                    future = pool.submit(rescore_chunk, page, simco_mode, simco_base_url)
+                    in_flight.append((page[-1][0], len(page), future))
+                    if len(in_flight) >= workers * 2:
+                        last_session_id, processed, future = in_flight.popleft()
+                        commit(last_session_id, processed, future.result())
+                while in_flight:
+                    last_session_id, processed, future = in_flight.popleft()
+                    commit(last_session_id, processed, future.result())
+
+        if limit is None:
+            store.finish_run(run_id)
+        summary = {
+            "run_id": run_id,
+            "sessions": progress.sessions,
+            "written": progress.written,
+            "failed": progress.failed,
+            "skipped": progress.sessions - progress.written,
+            "total_sessions_in_run": already_done + progress.sessions,
+            "seconds": round(time.perf_counter() - progress.started, 2),
+            "rows_per_second": round(progress.rate(), 1),
+            "finished": limit is None,
+        }
+        print(f"Done: {summary['sessions']} sessions ({summary['written']} written, "
+              f"{summary['failed']} of them failed, {summary['skipped']} skipped) in {summary['seconds']} s, "
+              f"{summary['rows_per_second']} rows/s", flush=True)
+        return summary
+    finally:
+        store.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Re-score stored quiz sessions into quiz_session_rescores.")
+    parser.add_argument("--run-id", default=None,
+                        help="Run identifier (default: rescore-<UTC timestamp>); required with --resume")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted run from its checkpoint")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Sessions per chunk / checkpoint")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (1 runs inline)")
+    parser.add_argument("--simco-mode", choices=["embedded", "remote"], default="embedded",
+                        help="True-confidence engine: in-process model or the SIMCO Logic batch endpoint")
+    parser.add_argument("--simco-url", default=None, help="SIMCO Logic base URL (default: SIMCO_LOGIC_BASE_URL)")
+    parser.add_argument("--limit", type=int, default=None,
+                        help="Stop after N sessions and leave the run resumable")
+    parser.add_argument("--progress-every", type=float, default=5.0, help="Seconds between progress lines")
+    args = parser.parse_args()
+
+    if args.resume and not args.run_id:
+        parser.error("--resume requires --run-id")
+    if args.chunk_size < 1 or args.chunk_size > 10000:
+        parser.error("--chunk-size must be between 1 and 10000 (the SIMCO Logic batch limit)")
+    run_id = args.run_id or f"rescore-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}"
+
+    try:
+        run(
+            run_id,
+            resume=args.resume,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            simco_mode=args.simco_mode,
+            simco_base_url=args.simco_url,
+            limit=args.limit,
+            progress_every=args.progress_every,
+        )
+    except KeyboardInterrupt:
+        print(f"\nInterrupted. Continue with: --run-id {run_id} --resume", file=sys.stderr)
+        sys.exit(130)
+
+
+if __name__ == "__main__":
+    main()